@@ -1,3 +1,10 @@
-from .chat_agent import agent
+from .chat_agent import agent as tool_calling_agent
+from .retrieval_agent import retrieval_agent
+from config import base_settings
 
-__all__ = ["agent"]
+if base_settings.rag.AGENT_MODE == "direct_retrieval":
+    agent = retrieval_agent
+else:
+    agent = tool_calling_agent
+
+__all__ = ["agent", "tool_calling_agent", "retrieval_agent"]
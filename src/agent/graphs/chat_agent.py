@@ -1,15 +1,37 @@
 from agent.graphs.states import GraphState, GraphInputState, GraphOutputState
-from agent.graphs.nodes import parse_to_messages, call
+from agent.graphs.nodes import (
+    parse_to_messages,
+    lookup_answer,
+    route_after_lookup,
+    call,
+    route_after_call,
+    answer,
+    store_answer,
+)
 
 from langgraph.graph import StateGraph
 
 workflow = StateGraph(GraphState, input=GraphInputState, output=GraphOutputState)
 
 workflow.add_node(parse_to_messages.__name__, parse_to_messages)
+workflow.add_node(lookup_answer.__name__, lookup_answer)
 workflow.add_node(call.__name__, call)
+workflow.add_node(answer.__name__, answer)
+workflow.add_node(store_answer.__name__, store_answer)
 
 workflow.add_edge("__start__", parse_to_messages.__name__)
-workflow.add_edge(parse_to_messages.__name__, call.__name__)
-workflow.add_edge(call.__name__, "__end__")
+workflow.add_edge(parse_to_messages.__name__, lookup_answer.__name__)
+workflow.add_conditional_edges(
+    lookup_answer.__name__,
+    route_after_lookup,
+    {"answer": call.__name__, "__end__": "__end__"},
+)
+workflow.add_conditional_edges(
+    call.__name__,
+    route_after_call,
+    {"answer": answer.__name__, "store": store_answer.__name__},
+)
+workflow.add_edge(answer.__name__, store_answer.__name__)
+workflow.add_edge(store_answer.__name__, "__end__")
 
 agent = workflow.compile()
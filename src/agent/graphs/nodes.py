@@ -1,9 +1,44 @@
-from agent.rag_components import llm, chat_prompt, tools, tools_map
+from agent.rag_components import (
+    llm,
+    chat_prompt,
+    tools,
+    tools_map,
+    retriever,
+    retrieval_service,
+    answer_cache,
+)
 from agent.graphs.states import GraphState
-
-from langchain_core.messages import HumanMessage, BaseMessage
-
-from typing import Dict, List
+from operations.storages import DBOperations
+from app.core import get_session
+from config import base_settings
+
+from langchain_core.messages import (
+    AIMessage,
+    HumanMessage,
+    BaseMessage,
+    ToolMessage,
+    message_chunk_to_message,
+)
+from langchain_core.callbacks.manager import adispatch_custom_event
+from langchain_core.runnables import RunnableConfig
+
+from typing import Any, Dict, List, Tuple
+
+import asyncio
+import uuid
+import re
+
+_POLITE_PHRASE = r"(?:please|can you|could you|would you)\s+"
+_REQUEST_PHRASE = r"(?:tell me|explain|help me understand)\s+"
+# A greeting is filler only when punctuation or a polite or request phrase follows it,
+# so queries like "hi-fi amplifiers" or "Hello World program" are kept intact.
+_QUERY_FILLER = re.compile(
+    r"^(?:(?:hi|hello|hey)"
+    rf"(?:\s*[,!.]+\s+|\s+(?={_POLITE_PHRASE}|{_REQUEST_PHRASE}))(?=\S))?"
+    rf"(?:{_POLITE_PHRASE})?"
+    rf"(?:{_REQUEST_PHRASE})?",
+    re.IGNORECASE,
+)
 
 
 llm_w_tools = llm.bind_tools(tools, tool_choice="retriever")
@@ -22,23 +57,157 @@ def parse_to_messages(state: GraphState) -> Dict[str, List[BaseMessage]]:
     return {"messages": messages}
 
 
-async def call(state: GraphState) -> Dict[str, List[BaseMessage]]:
+async def _emit_context(
+    tool_messages: List[ToolMessage], config: RunnableConfig
+) -> None:
+    """
+    Emits the retrieved context as a 'retrieved_context' custom event, so streaming
+    clients receive it before the answer is generated.
+    """
+    await adispatch_custom_event(
+        "retrieved_context",
+        {"context": [tool_message.content for tool_message in tool_messages]},
+        config=config,
+    )
+
+
+async def call(
+    state: GraphState, config: RunnableConfig
+) -> Dict[str, List[BaseMessage]]:
     messages = state.messages
 
-    response = await llm_w_tools.ainvoke(messages)
+    response = await llm_w_tools.ainvoke(messages, config=config)
     messages.append(response)
 
-    if tool_calls := response.tool_calls:
-        for tool_call in tool_calls:
-            tool = tools_map.get(tool_call["name"])
-            tool_message = await tool.ainvoke(tool_call)
+    tool_messages = []
+    for tool_call in response.tool_calls:
+        tool = tools_map.get(tool_call["name"])
+        tool_message = await tool.ainvoke(tool_call, config=config)
+
+        if not tool_message.content:
+            tool_message.content = ""
+
+        tool_messages.append(tool_message)
+
+    if tool_messages:
+        messages.extend(tool_messages)
+        await _emit_context(tool_messages=tool_messages, config=config)
+
+    return {"messages": messages}
+
+
+def route_after_call(state: GraphState) -> str:
+    return "answer" if isinstance(state.messages[-1], ToolMessage) else "store"
+
+
+def _rewrite_query(query: str) -> str:
+    """
+    Rewrites the query locally for retrieval: collapses whitespace and strips greetings
+    and polite phrases, which only dilute the query embedding.
+    """
+    query = " ".join(query.split())
+    return _QUERY_FILLER.sub("", query) or query
+
+
+async def retrieve(
+    state: GraphState, config: RunnableConfig
+) -> Dict[str, List[BaseMessage]]:
+    """
+    Retrieves the context of the query without asking the LLM for a tool call.
+    The retrieval is recorded as a retriever tool call with its result, the same
+    messages as in the tool-calling flow, so the answering prompt does not change.
+    """
+    messages = state.messages
+
+    query = state.query
+    if base_settings.rag.QUERY_REWRITING_ENABLED:
+        query = _rewrite_query(query)
+
+    tool_call = {
+        "name": retriever.name,
+        "args": {"query": query},
+        "id": f"call_{uuid.uuid4().hex}",
+        "type": "tool_call",
+    }
+    messages.append(AIMessage(content="", tool_calls=[tool_call]))
+
+    tool_message = await retriever.ainvoke(tool_call, config=config)
+    if not tool_message.content:
+        tool_message.content = ""
+    messages.append(tool_message)
+    await _emit_context(tool_messages=[tool_message], config=config)
+
+    return {"messages": messages}
 
-            if not tool_message.content:
-                tool_message.content = ""
 
-            messages.append(tool_message)
+async def answer(
+    state: GraphState, config: RunnableConfig
+) -> Dict[str, List[BaseMessage]]:
+    """
+    Generates the final answer, streaming its tokens to the clients of the graph events.
+    """
+    messages = state.messages
 
-        final_response = await llm.ainvoke(messages)
-        messages.append(final_response)
+    response = None
+    async for chunk in llm.astream(messages, config=config):
+        response = chunk if response is None else response + chunk
+    messages.append(message_chunk_to_message(response))
 
     return {"messages": messages}
+
+
+def _embed_query_and_get_version(query: str) -> Tuple[List[float], int]:
+    embedding = retrieval_service.embed_query(query)
+
+    with get_session() as session:
+        version = DBOperations(session=session).get_corpus_version()
+
+    return embedding, version
+
+
+async def lookup_answer(state: GraphState) -> Dict[str, Any]:
+    """
+    Answers the query from the semantic answer cache, if a similar query
+    has already been answered for the current corpus version.
+    """
+    if not base_settings.rag.ANSWER_CACHE_ENABLED:
+        return {}
+
+    embedding, version = await asyncio.to_thread(
+        _embed_query_and_get_version, state.query
+    )
+    answer = answer_cache.get(embedding=embedding, version=version)
+    if answer is None:
+        return {"answer_cache_version": version}
+
+    messages = state.messages
+    messages.append(AIMessage(content=answer))
+    return {"messages": messages, "cached_answer": True}
+
+
+def route_after_lookup(state: GraphState) -> str:
+    return "__end__" if state.cached_answer else "answer"
+
+
+async def store_answer(state: GraphState) -> Dict[str, Any]:
+    """
+    Stores the final answer in the semantic answer cache, tagged with
+    the corpus version read before answering.
+    """
+    answer = state.messages[-1] if state.messages else None
+
+    if (
+        base_settings.rag.ANSWER_CACHE_ENABLED
+        and state.answer_cache_version is not None
+        and isinstance(answer, AIMessage)
+        and answer.content
+        and not answer.tool_calls
+    ):
+        embedding = await asyncio.to_thread(retrieval_service.embed_query, state.query)
+        answer_cache.add(
+            embedding=embedding,
+            answer=answer.content,
+            version=state.answer_cache_version,
+        )
+
+    return {}
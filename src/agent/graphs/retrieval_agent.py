@@ -0,0 +1,32 @@
+from agent.graphs.states import GraphState, GraphInputState, GraphOutputState
+from agent.graphs.nodes import (
+    parse_to_messages,
+    lookup_answer,
+    route_after_lookup,
+    retrieve,
+    answer,
+    store_answer,
+)
+
+from langgraph.graph import StateGraph
+
+workflow = StateGraph(GraphState, input=GraphInputState, output=GraphOutputState)
+
+workflow.add_node(parse_to_messages.__name__, parse_to_messages)
+workflow.add_node(lookup_answer.__name__, lookup_answer)
+workflow.add_node(retrieve.__name__, retrieve)
+workflow.add_node(answer.__name__, answer)
+workflow.add_node(store_answer.__name__, store_answer)
+
+workflow.add_edge("__start__", parse_to_messages.__name__)
+workflow.add_edge(parse_to_messages.__name__, lookup_answer.__name__)
+workflow.add_conditional_edges(
+    lookup_answer.__name__,
+    route_after_lookup,
+    {"answer": retrieve.__name__, "__end__": "__end__"},
+)
+workflow.add_edge(retrieve.__name__, answer.__name__)
+workflow.add_edge(answer.__name__, store_answer.__name__)
+workflow.add_edge(store_answer.__name__, "__end__")
+
+retrieval_agent = workflow.compile()
@@ -19,7 +19,8 @@ GraphOutputState.model_rebuild()
 
 
 class GraphState(GraphInputState, GraphOutputState):
-    pass
+    cached_answer: bool = False
+    answer_cache_version: int | None = None
 
 
 GraphState.model_rebuild()
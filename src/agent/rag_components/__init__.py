@@ -1,5 +1,17 @@
 from .llm import llm
 from .prompt import chat_prompt
-from .tools import tools, tools_map
+from .tools import tools, tools_map, retriever
+from .retrieval import RetrievalService, retrieval_service
+from .answer_cache import SemanticAnswerCache, answer_cache
 
-__all__ = [llm, chat_prompt, tools, tools_map]
+__all__ = [
+    "llm",
+    "chat_prompt",
+    "tools",
+    "tools_map",
+    "retriever",
+    "RetrievalService",
+    "retrieval_service",
+    "SemanticAnswerCache",
+    "answer_cache",
+]
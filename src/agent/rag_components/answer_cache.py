@@ -0,0 +1,160 @@
+from config import base_settings
+
+from typing import Dict, List
+
+import numpy as np
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCache:
+    """
+    In-process cache of final answers keyed by query embeddings.
+
+    A query is answered from the cache if a previous query of the same corpus version
+    is at least as similar as the threshold. When the corpus version changes, all
+    answers of the previous versions are dropped, so answers never outlive the
+    documents they were based on.
+
+    Attributes:
+        similarity_threshold (float): The minimum cosine similarity of a cache hit.
+        max_entries (int): The maximum number of cached answers.
+        ttl_seconds (int): The number of seconds after which an answer expires.
+        version (int | None): The corpus version of the cached answers.
+        hits (int): The number of queries answered from the cache.
+        misses (int): The number of queries not found in the cache.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = base_settings.rag.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+        max_entries: int = base_settings.rag.ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = base_settings.rag.ANSWER_CACHE_TTL_SECONDS,
+    ) -> None:
+        """
+        Args:
+            similarity_threshold (float): The minimum cosine similarity of a cache hit.
+            max_entries (int): The maximum number of cached answers.
+            ttl_seconds (int): The number of seconds after which an answer expires.
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version: int | None = None
+        self.hits = 0
+        self.misses = 0
+
+        self._embeddings = np.zeros((0, 0), dtype=np.float32)
+        self._answers: List[str] = []
+        self._expires: List[float] = []
+        self._lock = threading.Lock()
+
+    def _clear(self) -> None:
+        """
+        Drops all cached answers.
+        """
+        self._embeddings = np.zeros((0, 0), dtype=np.float32)
+        self._answers = []
+        self._expires = []
+
+    def _check_version(self, version: int) -> None:
+        """
+        Drops the cached answers if they belong to another corpus version.
+        """
+        if version != self.version:
+            if self._answers:
+                logger.info(
+                    f"Corpus version changed to {version}, dropped {len(self._answers)} cached answers."
+                )
+            self._clear()
+            self.version = version
+
+    @staticmethod
+    def _normalize(embedding: List[float] | np.ndarray) -> np.ndarray:
+        """
+        Scales the embedding to unit length, so dot products are cosine similarities.
+        """
+        embedding = np.asarray(embedding, dtype=np.float32)
+        return embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+
+    def get(self, embedding: List[float] | np.ndarray, version: int) -> str | None:
+        """
+        Looks up the answer of the most similar cached query.
+
+        Args:
+            embedding (List[float] | np.ndarray): The embedding of the query.
+            version (int): The current corpus version.
+
+        Returns:
+            str | None: The cached answer, or None if no cached query is similar enough.
+        """
+        embedding = self._normalize(embedding)
+
+        with self._lock:
+            self._check_version(version)
+
+            answer = None
+            if self._answers:
+                similarities = self._embeddings @ embedding
+                similarities[np.asarray(self._expires) < time.monotonic()] = -1.0
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    answer = self._answers[best]
+
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return answer
+
+    def add(
+        self, embedding: List[float] | np.ndarray, answer: str, version: int
+    ) -> None:
+        """
+        Stores the answer of the query, evicting the oldest answers above the maximum size.
+
+        Args:
+            embedding (List[float] | np.ndarray): The embedding of the query.
+            answer (str): The final answer to the query.
+            version (int): The corpus version the answer is based on.
+        """
+        embedding = self._normalize(embedding)
+
+        with self._lock:
+            if version != self.version:
+                return
+
+            if self._answers:
+                self._embeddings = np.vstack([self._embeddings, embedding])
+            else:
+                self._embeddings = embedding[None, :]
+            self._answers.append(answer)
+            self._expires.append(time.monotonic() + self.ttl_seconds)
+
+            if len(self._answers) > self.max_entries:
+                self._embeddings = self._embeddings[-self.max_entries :]
+                self._answers = self._answers[-self.max_entries :]
+                self._expires = self._expires[-self.max_entries :]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the cache statistics.
+
+        Returns:
+            Dict[str, float]: The number of hits, misses and entries, the hit rate
+                and the corpus version of the cached answers.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._answers),
+            "version": self.version,
+        }
+
+
+answer_cache = SemanticAnswerCache()
@@ -0,0 +1,171 @@
+from operations.storages import ChromaDBOperations
+from operations.embeddings import (
+    QueryEmbeddingCache,
+    SharedEmbeddings,
+    get_embedder,
+    warm_up_embedder,
+)
+from config import base_settings
+
+from langchain_core.documents import Document
+from chromadb.errors import NotFoundError
+
+from typing import Dict, List
+
+import threading
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalService:
+    """
+    Long-lived service answering retrieval queries of the agent.
+
+    It keeps the ChromaDB operations with the shared client and the collection handle,
+    and the shared query embedder, so a query costs only its embedding and one
+    nearest-neighbour request. Embeddings of repeated queries are served from
+    the query embedding cache.
+    """
+
+    def __init__(
+        self,
+        collection: str = "documents",
+        embedder_dir: str = base_settings.app.EMBEDDER_DIR,
+    ) -> None:
+        """
+        Args:
+            collection (str): Name of the collection with the document chunks.
+            embedder_dir (str): The directory path where the embedding model is located.
+        """
+        self.collection_name = collection
+        self.embedder_dir = embedder_dir
+        self.embedder = SharedEmbeddings(embedder_dir=embedder_dir)
+        self._chroma_oper: ChromaDBOperations | None = None
+        self._query_cache: QueryEmbeddingCache | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def chroma_oper(self) -> ChromaDBOperations:
+        """
+        The ChromaDB operations of the service, connected on the first use.
+        """
+        with self._lock:
+            if self._chroma_oper is None:
+                self._chroma_oper = ChromaDBOperations(
+                    collection=self.collection_name, embedder_dir=self.embedder_dir
+                )
+            return self._chroma_oper
+
+    @property
+    def query_cache(self) -> QueryEmbeddingCache | None:
+        """
+        The query embedding cache of the service, None if the cache is disabled.
+        """
+        if not base_settings.rag.QUERY_EMBEDDING_CACHE_ENABLED:
+            return None
+
+        with self._lock:
+            if self._query_cache is None:
+                self._query_cache = QueryEmbeddingCache(
+                    model_id=f"{self.embedder_dir}:{base_settings.rag.EMBEDDER_PRECISION}",
+                    dim=get_embedder(
+                        self.embedder_dir
+                    ).get_sentence_embedding_dimension(),
+                )
+            return self._query_cache
+
+    def warm_up(self) -> None:
+        """
+        Loads the query embedder and connects to the collection before the first query.
+        """
+        warm_up_embedder(embedder_dir=self.embedder_dir)
+        self.search_sync(query="warm up", k=1)
+        logger.info(f'Retrieval service for "{self.collection_name}" is warmed up.')
+
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embeds the query, or returns its cached embedding.
+
+        Args:
+            query (str): The query to embed.
+
+        Returns:
+            List[float]: The embedding of the query.
+        """
+        query_cache = self.query_cache
+        if query_cache is None:
+            return self.embedder.embed_query(query)
+
+        return query_cache.embed(query, self.embedder.embed_query).tolist()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the statistics of the query embedding cache.
+
+        Returns:
+            Dict[str, float]: The cache statistics, empty if the cache is disabled.
+        """
+        query_cache = self.query_cache
+        return query_cache.stats() if query_cache is not None else {}
+
+    def search_sync(
+        self, query: str, k: int = 3, filters: Dict | None = None
+    ) -> List[Document]:
+        """
+        Retrieves the chunks nearest to the query.
+
+        Args:
+            query (str): The query.
+            k (int): The number of chunks to retrieve.
+            filters (Dict | None): An optional metadata filter of the chunks.
+
+        Returns:
+            List[Document]: The retrieved chunks, nearest first.
+        """
+        embedding = self.embed_query(query)
+        chroma_oper = self.chroma_oper
+
+        def query_collection() -> Dict:
+            return chroma_oper.collection.query(
+                query_embeddings=[embedding],
+                n_results=k,
+                where=filters,
+                include=["documents", "metadatas"],
+            )
+
+        try:
+            results = query_collection()
+        except NotFoundError:
+            # The collection has been recreated since the handle was created.
+            chroma_oper.collection = chroma_oper.chroma_client.get_or_create_collection(
+                name=self.collection_name
+            )
+            results = query_collection()
+
+        return [
+            Document(page_content=document, metadata=metadata or {})
+            for document, metadata in zip(
+                results["documents"][0], results["metadatas"][0]
+            )
+        ]
+
+    async def search(
+        self, query: str, k: int = 3, filters: Dict | None = None
+    ) -> List[Document]:
+        """
+        Retrieves the chunks nearest to the query without blocking the event loop.
+
+        Args:
+            query (str): The query.
+            k (int): The number of chunks to retrieve.
+            filters (Dict | None): An optional metadata filter of the chunks.
+
+        Returns:
+            List[Document]: The retrieved chunks, nearest first.
+        """
+        return await asyncio.to_thread(self.search_sync, query, k, filters)
+
+
+retrieval_service = RetrievalService()
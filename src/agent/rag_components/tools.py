@@ -1,11 +1,10 @@
-from operations.storages import ChromaDBOperations
-from config import base_settings
+from agent.rag_components.retrieval import retrieval_service
 
 from langchain_core.tools import tool
 
 
 @tool(parse_docstring=True)
-def retriever(query: str) -> str:
+async def retriever(query: str) -> str:
     """
     Retrieves relevant informations from the database based on a user-provided query.
 
@@ -15,10 +14,7 @@ def retriever(query: str) -> str:
     Returns:
         str: A text of relevant chunks retrieved from the database that match the query.
     """
-    retriever = ChromaDBOperations(
-        collection="documents", embedder_dir=base_settings.app.EMBEDDER_DIR
-    ).get_retriever(3)
-    results = retriever.invoke(query)
+    results = await retrieval_service.search(query, k=3)
     return "\n\n".join(res.page_content for res in results)
 
 
@@ -1,4 +1,11 @@
 from .db import get_session, init_db
 from .storage import init_blob_container
+from .clients import SharedClients, shared_clients
 
-__all__ = ["init_blob_container", "get_session", "init_db"]
+__all__ = [
+    "init_blob_container",
+    "get_session",
+    "init_db",
+    "SharedClients",
+    "shared_clients",
+]
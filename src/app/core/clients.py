@@ -0,0 +1,74 @@
+from azure.storage.blob import ContainerClient
+from chromadb.api import ClientAPI
+
+from .storage import init_blob_container
+from .db import engine
+
+from typing import Dict, Tuple
+
+import threading
+import chromadb
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SharedClients:
+    """
+    Process-wide, lazily created clients of the external services.
+
+    Every client keeps its own pool of keep-alive connections, so sharing one client
+    per service lets repeated requests reuse open connections instead of opening
+    new ones and repeating the TLS handshake.
+    """
+
+    def __init__(self) -> None:
+        self._blob_container: ContainerClient | None = None
+        self._chroma_clients: Dict[Tuple[str, int], ClientAPI] = {}
+        self._lock = threading.Lock()
+
+    def get_blob_container(self) -> ContainerClient:
+        """
+        Returns the shared client of the Azure Blob Storage container.
+
+        Returns:
+            ContainerClient: The client connected to the configured container.
+        """
+        with self._lock:
+            if self._blob_container is None:
+                self._blob_container = init_blob_container()
+            return self._blob_container
+
+    def get_chroma_client(self, host: str, port: int) -> ClientAPI:
+        """
+        Returns the shared ChromaDB client of the given server.
+
+        Args:
+            host (str): A host IP Address
+            port (int): A port number.
+
+        Returns:
+            ClientAPI: The client connected to the server.
+        """
+        with self._lock:
+            if (host, port) not in self._chroma_clients:
+                self._chroma_clients[(host, port)] = chromadb.HttpClient(
+                    host=host, port=port
+                )
+            return self._chroma_clients[(host, port)]
+
+    def close(self) -> None:
+        """
+        Closes the open connections of all clients and of the database engine.
+        """
+        with self._lock:
+            if self._blob_container is not None:
+                self._blob_container.close()
+                self._blob_container = None
+            self._chroma_clients.clear()
+
+        engine.dispose()
+        logger.info("Shared clients are closed.")
+
+
+shared_clients = SharedClients()
@@ -1,7 +1,9 @@
 from config import base_settings
 from sqlmodel import create_engine, Session
 
-engine = create_engine(base_settings.db.SQLALCHEMY_DATABASE_URI.get_secret_value())
+engine = create_engine(
+    base_settings.db.SQLALCHEMY_DATABASE_URI.get_secret_value(), pool_pre_ping=True
+)
 
 
 def init_db() -> None:
@@ -0,0 +1,29 @@
+from operations.storages import BlobStorageOperations, ChromaDBOperations, DBOperations
+from app.core import get_session
+
+from fastapi import Request
+
+from typing import Iterator
+
+
+def get_blob_oper(request: Request) -> BlobStorageOperations:
+    """
+    Returns the Azure Blob Storage operations created by the app lifespan.
+    """
+    return request.app.state.blob_oper
+
+
+def get_chroma_oper(request: Request) -> ChromaDBOperations:
+    """
+    Returns the ChromaDB operations created by the app lifespan.
+    """
+    return request.app.state.chroma_oper
+
+
+def get_db_oper() -> Iterator[DBOperations]:
+    """
+    Yields the PostgreSQL operations on a session from the engine connection pool,
+    and closes the session after the request.
+    """
+    with get_session() as session:
+        yield DBOperations(session=session)
@@ -1,4 +1,10 @@
-from .models import FileMetadata
-from .datatypes import Sentence, CombinedSentences, Chunk
+from .models import CorpusVersion, FileMetadata, ObjectSummary
+from .datatypes import CombinedSentences, Chunks
 
-__all__ = ["Sentence", "CombinedSentences", "Chunk", "FileMetadata"]
+__all__ = [
+    "CombinedSentences",
+    "Chunks",
+    "CorpusVersion",
+    "FileMetadata",
+    "ObjectSummary",
+]
@@ -1,77 +1,183 @@
-from dataclasses import dataclass, field
-from typing import List, Optional
+from dataclasses import dataclass, field, fields
+from typing import List
+
+import numpy as np
 
 
 @dataclass
-class Sentence:
+class CombinedSentences:
     """
-    Represents an individual sentence with an unique ID.
+    Represents all sentences of a text chunk in a columnar, array-backed form.
+
+    The sentences are stored as offsets into one text buffer, in which consecutive
+    sentences are separated by a single space, so a sentence combined with its
+    neighbours is a single slice of the buffer.
 
     Attributes:
-        id (int): A unique identifier assigned automatically.
-        sentence (str): The sentence text.
-        chunk_index (Optional[int]): The ID of the chunk it belongs to.
+        text (str): The buffer with all sentences joined by single spaces.
+        starts (np.ndarray): The start offset of each sentence in the buffer.
+        ends (np.ndarray): The end offset of each sentence in the buffer.
+        overlap (int): The number of neighbouring sentences combined with each sentence.
+        embeddings (np.ndarray): A float32 matrix with the embedding of each combined sentence.
+        cosine_distance (np.ndarray): The cosine distance of each sentence with the next one.
+        chunk_index (np.ndarray): The ID of the chunk each sentence belongs to, 0 if not assigned.
+        above_threshold (np.ndarray): If the cosine distance is in the specified percentile threshold.
     """
 
-    index: int = field(init=False)
-    sentence: str = ""
-    chunk_index: Optional[int] = None
-
-    _id_counter: int = 0
+    text: str = ""
+    starts: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    ends: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    overlap: int = 1
+    embeddings: np.ndarray = field(
+        default_factory=lambda: np.zeros((0, 0), dtype=np.float32)
+    )
+    cosine_distance: np.ndarray = field(default=None)
+    chunk_index: np.ndarray = field(default=None)
+    above_threshold: np.ndarray = field(default=None)
 
     def __post_init__(self):
-        """Automatically assign a unique ID to each new Sentence instance."""
-        self.__class__._id_counter += 1
-        self.index = self.__class__._id_counter
+        """Initialize the per-sentence arrays that were not provided."""
+        if self.cosine_distance is None:
+            self.cosine_distance = np.zeros(len(self), dtype=np.float64)
+        if self.chunk_index is None:
+            self.chunk_index = np.zeros(len(self), dtype=np.int64)
+        if self.above_threshold is None:
+            self.above_threshold = np.zeros(len(self), dtype=bool)
+
+    @classmethod
+    def from_sentences(
+        cls, sentences: List[str], overlap: int = 1
+    ) -> "CombinedSentences":
+        """
+        Builds the columnar representation from a list of sentences.
+
+        Args:
+            sentences (List[str]): A list of sentences.
+            overlap (int): The number of neighbouring sentences combined with each sentence.
+
+        Returns:
+            CombinedSentences: The sentences stored in a single text buffer.
+        """
+        lengths = np.array([len(sen) for sen in sentences], dtype=np.int64)
+        starts = np.zeros(len(sentences), dtype=np.int64)
+        starts[1:] = np.cumsum(lengths + 1)[:-1]
+
+        return cls(
+            text=" ".join(sentences),
+            starts=starts,
+            ends=starts + lengths,
+            overlap=overlap,
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """The length of each sentence."""
+        return self.ends - self.starts
+
+    def sentence(self, i: int) -> str:
+        """
+        Returns the text of a single sentence.
+
+        Args:
+            i (int): The position of the sentence.
+
+        Returns:
+            str: The sentence text.
+        """
+        return self.text[self.starts[i] : self.ends[i]]
+
+    def combined_sentence(self, i: int) -> str:
+        """
+        Returns the sentence combined with its neighbours.
+
+        Args:
+            i (int): The position of the sentence.
+
+        Returns:
+            str: The sentence combined with 'overlap' sentences on each side.
+        """
+        first = max(i - self.overlap, 0)
+        last = min(i + self.overlap, len(self) - 1)
+        return self.text[self.starts[first] : self.ends[last]]
+
+    @property
+    def combined_sentences(self) -> List[str]:
+        """The text of every sentence combined with its neighbours."""
+        return [self.combined_sentence(i) for i in range(len(self))]
 
     def __repr__(self):
-        """Custom string representation to hide _id_counter."""
-        return f"Sentence(index={self.index}, sentence={repr(self.sentence)}, chunk_index={self.chunk_index})"
+        """Custom string representation to hide the raw buffer and embeddings."""
+        return f"CombinedSentences(sentences={len(self)}, chunks={len(np.unique(self.chunk_index))})"
 
 
 @dataclass
-class CombinedSentences(Sentence):
+class Chunks:
     """
-    Represents a sentence combined with neighboring sentences for context.
+    Represents chunks of sentences in a columnar, array-backed form.
 
-    Inherits from Sentence and adds:
-        combined_sentence (str): The sentence combined with its neighbors.
-        embeddings (List[float]): A list of float values representing sentence embeddings.
-        cosine_distance (Optional[float]): The cosine distance with the next sentence.
-        above_threshold (bool): If the cosine distance is in the specified percentile threshold.
+    Attributes:
+        chunk_index (np.ndarray): The ID of each chunk.
+        size (np.ndarray): The total size of each chunk.
+        cosine_distance (np.ndarray): The cosine distance of each chunk for merging, NaN if unknown.
+        is_too_big (np.ndarray): Whether the chunk exceeds the upper size threshold.
+        is_too_small (np.ndarray): Whether the chunk is below the minimum size threshold.
     """
 
-    combined_sentence: str = ""
-    embeddings: List[float] = field(default_factory=list)
-    cosine_distance: Optional[float] = None
-    above_threshold: bool = None
-
-    _id_counter: int = 0
+    chunk_index: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    size: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    cosine_distance: np.ndarray = field(default=None)
+    is_too_big: np.ndarray = field(default=None)
+    is_too_small: np.ndarray = field(default=None)
 
     def __post_init__(self):
-        """Ensure each CombinedSentences gets its own unique index."""
-        super().__post_init__()
-
-    def __repr__(self):
-        """Custom string representation to hide _id_counter."""
-        return f"CombinedSentences(index={self.index}, sentence={repr(self.sentence)}, combined_sentence={repr(self.combined_sentence)}, embeddings={self.embeddings}, cosine_distance={self.cosine_distance}, chunk_index={self.chunk_index}, above_threshold={self.above_threshold})"
-
-
-@dataclass
-class Chunk:
-    """
-    Represents a chunk of sentences grouped together.
-
-    Attributes:
-        chunk_index (int): A unique identifier assigned automatically.
-        size (int): The total size of the chunk.
-        cosine_distance (Optional[float]): The cosine distance for merging.
-        is_too_big (Optional[bool]): Whether the chunk exceeds the upper size threshold.
-        is_too_small (Optional[bool]): Whether the chunk is below the minimum size threshold.
-    """
-
-    chunk_index: int = 0
-    size: int = 0
-    cosine_distance: Optional[float] = None
-    is_too_big: Optional[bool] = None
-    is_too_small: Optional[bool] = None
+        """Initialize the per-chunk arrays that were not provided."""
+        if self.cosine_distance is None:
+            self.cosine_distance = np.full(len(self), np.nan, dtype=np.float64)
+        if self.is_too_big is None:
+            self.is_too_big = np.zeros(len(self), dtype=bool)
+        if self.is_too_small is None:
+            self.is_too_small = np.zeros(len(self), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.chunk_index)
+
+    def take(self, positions: np.ndarray) -> "Chunks":
+        """
+        Selects chunks at the given positions.
+
+        Args:
+            positions (np.ndarray): The positions (or a boolean mask) of the chunks to select.
+
+        Returns:
+            Chunks: The selected chunks.
+        """
+        return Chunks(
+            **{f.name: getattr(self, f.name)[positions] for f in fields(self)}
+        )
+
+    def pop(self, i: int) -> None:
+        """
+        Removes the chunk at the given position.
+
+        Args:
+            i (int): The position of the chunk to remove.
+        """
+        for f in fields(self):
+            setattr(self, f.name, np.delete(getattr(self, f.name), i))
+
+    def extend(self, other: "Chunks") -> None:
+        """
+        Appends other chunks at the end.
+
+        Args:
+            other (Chunks): The chunks to append.
+        """
+        for f in fields(self):
+            setattr(
+                self,
+                f.name,
+                np.concatenate([getattr(self, f.name), getattr(other, f.name)]),
+            )
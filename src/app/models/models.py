@@ -20,3 +20,47 @@ class FileMetadata(SQLModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         title="Last Modified Timestamp",
     )
+
+
+class ObjectSummary(SQLModel, table=True):
+    """
+    Represents a cached LLM summary of a picture or a table
+
+    Attributes:
+        key (str): The SHA-256 hash of the model name and the summary request, which
+            contains the prompt with the image bytes or the table contents.
+        summary (str): The summary returned by the model.
+        created_at (datetime): The timestamp of when the summary was created.
+        last_accessed (datetime): The timestamp of when the summary was last used.
+    """
+
+    key: str = Field(primary_key=True, title="Request Hash", max_length=64)
+    summary: str = Field(title="Summary")
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        title="Created Timestamp",
+    )
+    last_accessed: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        title="Last Accessed Timestamp",
+        index=True,
+    )
+
+
+class CorpusVersion(SQLModel, table=True):
+    """
+    Represents the version of an indexed document collection, increased by every sync
+    which changes the collection
+
+    Attributes:
+        collection (str): The name of the collection.
+        version (int): The version of the collection.
+        updated_at (datetime): The timestamp of when the version was last increased.
+    """
+
+    collection: str = Field(primary_key=True, title="Collection Name", max_length=255)
+    version: int = Field(default=0, title="Version")
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        title="Updated Timestamp",
+    )
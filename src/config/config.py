@@ -1,5 +1,7 @@
 import os
 
+from typing import Dict, Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, SecretStr, BaseModel, computed_field
 
@@ -69,7 +71,50 @@ class RAGConfig(BaseModel):
         2.5, description="Scale factor for extracted image resolution"
     )
     NUMBER_OF_THREADS: int | None = Field(
-        default_factory=os.cpu_count, description="Number of CPU threads to use"
+        None,
+        description="Number of CPU threads of every PDF loader or ingestion worker, defaults to their share of the CPU count",
+    )
+
+    BLOB_DOWNLOAD_TO_DISK: bool = Field(
+        True,
+        description="Whether PDFs are streamed into temporary files instead of memory",
+    )
+    BLOB_DOWNLOAD_MAX_CONCURRENCY: int = Field(
+        4, description="Number of parallel connections used to download a single blob"
+    )
+    BLOB_DOWNLOAD_DIR: str | None = Field(
+        None,
+        description="Directory of downloaded PDFs, if None the system temp directory",
+    )
+    INGESTION_MODE: Literal["serial", "process", "pipeline"] = Field(
+        "serial",
+        description="Whether new PDFs are processed one by one, in worker processes or in a staged pipeline",
+    )
+    INGESTION_WORKERS: int | None = Field(
+        None,
+        description="Number of ingestion worker processes, defaults to CPU count // NUMBER_OF_THREADS, or CPU count // 4",
+    )
+    PIPELINE_QUEUE_SIZE: int = Field(
+        4, description="Maximum number of PDFs waiting in front of each pipeline stage"
+    )
+    PIPELINE_WORKERS: Dict[str, int] = Field(
+        default_factory=lambda: {"fetch": 4, "summarise": 2, "chunk": 2, "embed": 1},
+        description="Number of threads of each pipeline stage, 'convert' defaults to the PDF loader pool size",
+    )
+    PDF_LOADER_POOL_SIZE: int | None = Field(
+        None,
+        description="Number of warmed PDF loaders, defaults to CPU count // NUMBER_OF_THREADS, or CPU count // 4",
+    )
+    PDF_SHARD_PAGES: int | None = Field(
+        None,
+        description="Number of pages converted per shard of a large PDF, if None PDFs are not sharded",
+    )
+    CHROMA_UPSERT_BATCH_SIZE: int | None = Field(
+        None,
+        description="Number of chunks upserted in a single request, capped by the ChromaDB maximum batch size",
+    )
+    CHROMA_UPSERT_CONCURRENCY: int = Field(
+        2, description="Number of upsert batches of a document sent concurrently"
     )
 
     MIN_CHUNK_LENGTH: int = Field(300, description="Minimum length of text chunks")
@@ -77,6 +122,74 @@ class RAGConfig(BaseModel):
     PERCENTILE_THRESHOLD: int = Field(
         98, description="Percentile threshold for semantic chunk splitting"
     )
+    SUMMARY_MAX_CONCURRENCY: int = Field(
+        8, description="Maximum number of concurrent picture and table summary requests"
+    )
+    SUMMARY_CACHE_ENABLED: bool = Field(
+        True,
+        description="Whether picture and table summaries are cached in the database",
+    )
+    SUMMARY_CACHE_TTL_DAYS: int = Field(
+        90, description="Number of days after which a cached summary expires"
+    )
+    SUMMARY_CACHE_MAX_ENTRIES: int = Field(
+        50_000, description="Maximum number of summaries kept in the cache"
+    )
+
+    QUERY_EMBEDDING_CACHE_ENABLED: bool = Field(
+        True, description="Whether embeddings of retrieval queries are cached"
+    )
+    QUERY_EMBEDDING_CACHE_MAX_ENTRIES: int = Field(
+        10_000, description="Maximum number of query embeddings kept in the cache"
+    )
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = Field(
+        86_400, description="Number of seconds after which a query embedding expires"
+    )
+    QUERY_EMBEDDING_CACHE_PERSISTENCE: Literal["none", "file", "redis"] = Field(
+        "none",
+        description="Whether query embeddings are also persisted in a local file or in Redis, which requires the 'redis' package",
+    )
+    QUERY_EMBEDDING_CACHE_REDIS_URL: str | None = Field(
+        None,
+        description="URL of the Redis-compatible server persisting query embeddings",
+    )
+
+    AGENT_MODE: Literal["tool_calling", "direct_retrieval"] = Field(
+        "tool_calling",
+        description="Whether the agent asks the LLM for a retriever call or retrieves the context directly",
+    )
+    QUERY_REWRITING_ENABLED: bool = Field(
+        False,
+        description="Whether greetings and polite phrases are stripped from queries before direct retrieval",
+    )
+    ANSWER_CACHE_ENABLED: bool = Field(
+        False, description="Whether answers to similar queries are served from a cache"
+    )
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = Field(
+        0.95, description="Minimum cosine similarity of queries sharing a cached answer"
+    )
+    ANSWER_CACHE_MAX_ENTRIES: int = Field(
+        1000, description="Maximum number of answers kept in the cache"
+    )
+    ANSWER_CACHE_TTL_SECONDS: int = Field(
+        86_400, description="Number of seconds after which a cached answer expires"
+    )
+
+    EMBEDDER_DEVICE: str = Field(
+        "cpu", description="Device on which the embedding model is loaded"
+    )
+    EMBEDDER_PRECISION: Literal["float32", "float16", "bfloat16"] = Field(
+        "float32", description="Floating point precision of the embedding model"
+    )
+    EMBEDDING_BATCH_SIZE: int = Field(
+        64, description="Number of texts embedded in a single model call"
+    )
+    EMBEDDING_CACHE_ENABLED: bool = Field(
+        True, description="Whether computed embeddings are cached on disk"
+    )
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(
+        200_000, description="Maximum number of embeddings kept in the disk cache"
+    )
 
 
 class AppConfig(BaseModel):
@@ -104,6 +217,22 @@ class AppConfig(BaseModel):
         """
         return os.path.join(self.BASE_DIR, "checkpoints/BAAI/bge-small-en")
 
+    @computed_field
+    @property
+    def EMBEDDING_CACHE_DIR(self) -> str:
+        """
+        Path to embedding cache directory.
+        """
+        return os.path.join(self.BASE_DIR, "cache/embeddings")
+
+    @computed_field
+    @property
+    def QUERY_EMBEDDING_CACHE_DIR(self) -> str:
+        """
+        Path to query embedding cache directory.
+        """
+        return os.path.join(self.BASE_DIR, "cache/query_embeddings")
+
     @computed_field
     @property
     def DATA_DIR(self) -> str:
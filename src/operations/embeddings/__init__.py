@@ -0,0 +1,23 @@
+from .registry import (
+    EmbedderRegistry,
+    SharedEmbeddings,
+    embedder_registry,
+    get_embedder,
+    warm_up_embedder,
+)
+from .cache import EmbeddingCache, get_embedding_cache
+from .query_cache import QueryEmbeddingCache
+from .scheduler import EmbeddingScheduler, EmbeddingRequest
+
+__all__ = [
+    "EmbedderRegistry",
+    "EmbeddingCache",
+    "EmbeddingRequest",
+    "EmbeddingScheduler",
+    "QueryEmbeddingCache",
+    "SharedEmbeddings",
+    "embedder_registry",
+    "get_embedder",
+    "get_embedding_cache",
+    "warm_up_embedder",
+]
@@ -0,0 +1,300 @@
+from operations.embeddings.registry import get_embedder
+from config import base_settings
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import unicodedata
+import threading
+import hashlib
+import logging
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache of a single model.
+
+    Embeddings are stored in a memory-mapped float32 matrix with a fixed number of
+    slots. Next to every slot, a memory-mapped header keeps the 16-byte hash of
+    the normalized text and a checksum of the hash and the embedding, so a slot
+    torn by a crash during a write is detected on lookup and treated as a miss.
+    When the cache is full, the least recently used entries are evicted, and
+    with a TTL, entries written longer ago than the TTL are misses as well.
+
+    Attributes:
+        model_id (str): The identifier of the model the embeddings come from.
+        dim (int): The dimension of the embeddings.
+        max_entries (int): The maximum number of cached embeddings.
+        ttl_seconds (int | None): The number of seconds after which an embedding expires.
+        hits (int): The number of texts found in the cache.
+        misses (int): The number of texts not found in the cache.
+        evictions (int): The number of embeddings evicted from the cache.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        model_id: str,
+        dim: int,
+        max_entries: int = base_settings.rag.EMBEDDING_CACHE_MAX_ENTRIES,
+        ttl_seconds: int | None = None,
+    ) -> None:
+        """
+        Args:
+            cache_dir (str): The directory where caches of all models are stored.
+            model_id (str): The identifier of the model the embeddings come from.
+            dim (int): The dimension of the embeddings.
+            max_entries (int): The maximum number of cached embeddings.
+            ttl_seconds (int | None): The number of seconds after which an embedding
+                expires. If None, embeddings never expire.
+        """
+        self.model_id = model_id
+        self.dim = dim
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self.cache_dir = os.path.join(
+            cache_dir, hashlib.md5(model_id.encode()).hexdigest()
+        )
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._vectors_path = os.path.join(self.cache_dir, "vectors.f32")
+        self._headers_path = os.path.join(self.cache_dir, "headers.u8")
+        self._ticks_path = os.path.join(self.cache_dir, "ticks.i64")
+        self._written_path = os.path.join(self.cache_dir, "written.f64")
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Opens the cache files, or creates empty ones if they do not exist
+        or were written with a different configuration.
+        """
+        files = [
+            (self._vectors_path, np.float32, (self.max_entries, self.dim)),
+            (self._headers_path, np.uint8, (self.max_entries, 32)),
+            (self._ticks_path, np.int64, (self.max_entries,)),
+            (self._written_path, np.float64, (self.max_entries,)),
+        ]
+        mode = "r+"
+
+        for path, dtype, shape in files:
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            if not os.path.exists(path):
+                mode = "w+"
+            elif os.path.getsize(path) != size:
+                logger.warning(
+                    f'Embedding cache of "{self.model_id}" has a different shape, rebuilding it.'
+                )
+                mode = "w+"
+
+        self._vectors, self._headers, self._ticks, self._written = (
+            np.memmap(path, dtype=dtype, mode=mode, shape=shape)
+            for path, dtype, shape in files
+        )
+
+        self._slots: Dict[bytes, int] = {
+            self._headers[slot, :16].tobytes(): int(slot)
+            for slot in np.flatnonzero(self._ticks)
+        }
+        self._clock = int(self._ticks.max())
+
+    @staticmethod
+    def _checksum(key: bytes, embedding: np.ndarray) -> bytes:
+        """
+        Hashes the key together with the embedding stored under it.
+
+        Args:
+            key (bytes): The 16-byte hash of the normalized text.
+            embedding (np.ndarray): The float32 embedding of the text.
+
+        Returns:
+            bytes: A 16-byte digest of the key and the embedding.
+        """
+        return hashlib.blake2b(key + embedding.tobytes(), digest_size=16).digest()
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        """
+        Hashes the normalized text.
+
+        Args:
+            text (str): The text to hash.
+
+        Returns:
+            bytes: A 16-byte digest of the normalized text.
+        """
+        normalized = unicodedata.normalize("NFC", " ".join(text.split()))
+        return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
+    def get(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Looks up the embeddings of the texts.
+
+        Args:
+            texts (List[str]): A list of texts to look up.
+
+        Returns:
+            Tuple[np.ndarray, List[int]]: A float32 matrix with one row per text, filled for
+                the cached texts, and a list of positions of the texts missing in the cache.
+        """
+        embeddings = np.empty((len(texts), self.dim), dtype=np.float32)
+        found, keys, slots, missing = [], [], [], []
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = self._key(text)
+                slot = self._slots.get(key)
+                if slot is None:
+                    missing.append(i)
+                else:
+                    found.append(i)
+                    keys.append(key)
+                    slots.append(slot)
+
+            if slots:
+                vectors = np.asarray(self._vectors[slots])
+                checksums = self._headers[slots, 16:]
+                valid = [
+                    checksum.tobytes() == self._checksum(key, vector)
+                    for key, vector, checksum in zip(keys, vectors, checksums)
+                ]
+                if self.ttl_seconds is not None:
+                    expired = self._written[slots] < time.time() - self.ttl_seconds
+                else:
+                    expired = np.zeros(len(slots), dtype=bool)
+
+                for position, (i, key, slot) in enumerate(zip(found, keys, slots)):
+                    if not valid[position]:
+                        logger.warning(
+                            f'Embedding cache of "{self.model_id}" has a corrupted slot {slot}, dropping it.'
+                        )
+                    elif expired[position]:
+                        valid[position] = False
+                    else:
+                        continue
+
+                    self._slots.pop(key, None)
+                    self._ticks[slot] = 0
+                    missing.append(i)
+
+                if not all(valid):
+                    found = [i for i, is_valid in zip(found, valid) if is_valid]
+                    slots = [slot for slot, is_valid in zip(slots, valid) if is_valid]
+                    vectors = vectors[valid]
+                    missing.sort()
+
+                embeddings[found] = vectors
+                self._ticks[slots] = np.arange(
+                    self._clock + 1, self._clock + 1 + len(slots)
+                )
+                self._clock += len(slots)
+
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        return embeddings, missing
+
+    def put(self, texts: List[str], embeddings: np.ndarray) -> None:
+        """
+        Stores the embeddings of the texts, evicting the least recently used entries if needed.
+
+        Args:
+            texts (List[str]): A list of embedded texts.
+            embeddings (np.ndarray): A matrix with one embedding per text.
+        """
+        with self._lock:
+            new_entries: Dict[bytes, int] = {}
+            for i, text in enumerate(texts):
+                key = self._key(text)
+                if key not in self._slots:
+                    new_entries[key] = i
+
+            keys = list(new_entries)[-self.max_entries :]
+            if not keys:
+                return
+
+            slots = np.argpartition(self._ticks, len(keys) - 1)[: len(keys)]
+            for slot in slots:
+                if self._ticks[slot]:
+                    del self._slots[self._headers[slot, :16].tobytes()]
+                    self.evictions += 1
+
+            vectors = np.asarray(
+                embeddings[[new_entries[key] for key in keys]], dtype=np.float32
+            )
+            headers = b"".join(
+                key + self._checksum(key, vector) for key, vector in zip(keys, vectors)
+            )
+            self._vectors[slots] = vectors
+            self._headers[slots] = np.frombuffer(headers, dtype=np.uint8).reshape(
+                -1, 32
+            )
+            self._ticks[slots] = np.arange(self._clock + 1, self._clock + 1 + len(keys))
+            self._written[slots] = time.time()
+            self._clock += len(keys)
+            self._slots.update({key: int(slot) for key, slot in zip(keys, slots)})
+
+    def save(self) -> None:
+        """
+        Flushes the changed pages of the embeddings, slot headers, ticks and write times to disk.
+        A slot left inconsistent by a crash fails its checksum and is never returned.
+        """
+        with self._lock:
+            self._vectors.flush()
+            self._headers.flush()
+            self._ticks.flush()
+            self._written.flush()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the cache statistics.
+
+        Returns:
+            Dict[str, float]: The number of hits, misses, evictions and entries, and the hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._slots),
+        }
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(
+    embedder_dir: str = base_settings.app.EMBEDDER_DIR,
+    cache_dir: str = base_settings.app.EMBEDDING_CACHE_DIR,
+) -> EmbeddingCache:
+    """
+    Returns the process-wide embedding cache of the model.
+
+    Args:
+        embedder_dir (str): The directory path where the embedding model is located.
+        cache_dir (str): The directory where caches of all models are stored.
+
+    Returns:
+        EmbeddingCache: The shared embedding cache.
+    """
+    model_id = f"{embedder_dir}:{base_settings.rag.EMBEDDER_PRECISION}"
+
+    with _caches_lock:
+        if model_id not in _caches:
+            _caches[model_id] = EmbeddingCache(
+                cache_dir=cache_dir,
+                model_id=model_id,
+                dim=get_embedder(embedder_dir).get_sentence_embedding_dimension(),
+            )
+        return _caches[model_id]
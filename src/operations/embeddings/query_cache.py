@@ -0,0 +1,245 @@
+from operations.embeddings.cache import EmbeddingCache
+from config import base_settings
+
+from collections import OrderedDict
+from typing import Callable, Dict, Literal, Tuple
+
+import numpy as np
+import unicodedata
+import threading
+import hashlib
+import logging
+import time
+import re
+
+logger = logging.getLogger(__name__)
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+
+class _FileStore:
+    """
+    Persists query embeddings in a memory-mapped 'EmbeddingCache' on local disk,
+    expiring them after the TTL.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        model_id: str,
+        dim: int,
+        max_entries: int,
+        ttl_seconds: int,
+    ):
+        self.cache = EmbeddingCache(
+            cache_dir=cache_dir,
+            model_id=model_id,
+            dim=dim,
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+        )
+
+    def get(self, key: str) -> np.ndarray | None:
+        embeddings, missing = self.cache.get([key])
+        return None if missing else embeddings[0]
+
+    def put(self, key: str, embedding: np.ndarray) -> None:
+        self.cache.put([key], embedding[None, :])
+        self.cache.save()
+
+
+class _RedisStore:
+    """
+    Persists query embeddings as float32 bytes in a Redis-compatible server,
+    expiring them after the TTL.
+    """
+
+    def __init__(self, url: str, model_id: str, ttl_seconds: int):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                'QUERY_EMBEDDING_CACHE_PERSISTENCE="redis" requires the "redis" package. '
+                'Install it with "uv sync --extra redis", or set the persistence to "file" or "none".'
+            ) from e
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = f"query-embedding:{hashlib.md5(model_id.encode()).hexdigest()}:"
+        self.ttl_seconds = ttl_seconds
+
+    def _redis_key(self, key: str) -> str:
+        return self.prefix + hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> np.ndarray | None:
+        value = self.client.get(self._redis_key(key))
+        return None if value is None else np.frombuffer(value, dtype=np.float32)
+
+    def put(self, key: str, embedding: np.ndarray) -> None:
+        self.client.set(
+            self._redis_key(key),
+            np.asarray(embedding, dtype=np.float32).tobytes(),
+            ex=self.ttl_seconds,
+        )
+
+
+class QueryEmbeddingCache:
+    """
+    In-process LRU cache of query embeddings with a TTL, optionally backed by
+    a local file or a Redis-compatible server, so the cache survives restarts
+    and can be shared by many app instances.
+
+    Queries are normalized before they are looked up and embedded, so queries
+    differing only in letter case, whitespace or trailing punctuation share
+    one embedding.
+
+    Attributes:
+        model_id (str): The identifier of the model the embeddings come from.
+        max_entries (int): The maximum number of embeddings kept in memory.
+        ttl_seconds (int): The number of seconds after which an embedding expires.
+        hits (int): The number of queries found in memory.
+        persisted_hits (int): The number of queries found only in the persistent store.
+        misses (int): The number of queries embedded by the model.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        dim: int,
+        max_entries: int = base_settings.rag.QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = base_settings.rag.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+        persistence: Literal[
+            "none", "file", "redis"
+        ] = base_settings.rag.QUERY_EMBEDDING_CACHE_PERSISTENCE,
+    ) -> None:
+        """
+        Args:
+            model_id (str): The identifier of the model the embeddings come from.
+            dim (int): The dimension of the embeddings.
+            max_entries (int): The maximum number of embeddings kept in memory.
+            ttl_seconds (int): The number of seconds after which an embedding expires.
+            persistence (Literal["none", "file", "redis"]): Where the embeddings are
+                persisted besides the memory.
+        """
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: OrderedDict[str, Tuple[float, np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persisted_hits = 0
+        self.misses = 0
+
+        if persistence == "file":
+            self._store = _FileStore(
+                cache_dir=base_settings.app.QUERY_EMBEDDING_CACHE_DIR,
+                model_id=model_id,
+                dim=dim,
+                max_entries=max_entries,
+                ttl_seconds=ttl_seconds,
+            )
+        elif persistence == "redis":
+            self._store = _RedisStore(
+                url=base_settings.rag.QUERY_EMBEDDING_CACHE_REDIS_URL,
+                model_id=model_id,
+                ttl_seconds=ttl_seconds,
+            )
+        else:
+            self._store = None
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        Normalizes the query text.
+
+        Args:
+            query (str): The query to normalize.
+
+        Returns:
+            str: The query in NFKC form and lower case, with collapsed whitespace
+                and without trailing punctuation.
+        """
+        query = unicodedata.normalize("NFKC", query).casefold()
+        return _TRAILING_PUNCTUATION.sub("", " ".join(query.split()))
+
+    def _get(self, key: str) -> np.ndarray | None:
+        """
+        Returns the unexpired embedding from memory, marking it as recently used.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _put(self, key: str, embedding: np.ndarray) -> None:
+        """
+        Stores the embedding in memory, evicting the least recently used ones.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def embed(self, query: str, embed: Callable[[str], np.ndarray]) -> np.ndarray:
+        """
+        Returns the cached embedding of the normalized query, embedding it on a miss.
+
+        Args:
+            query (str): The query to embed.
+            embed (Callable[[str], np.ndarray]): The function embedding the normalized query.
+
+        Returns:
+            np.ndarray: The float32 embedding of the query.
+        """
+        key = self.normalize(query)
+
+        embedding = self._get(key)
+        if embedding is not None:
+            self.hits += 1
+            return embedding
+
+        embedding = None
+        if self._store is not None:
+            try:
+                embedding = self._store.get(key)
+            except Exception as e:
+                logger.warning(f"Query embedding store is unavailable: {e}")
+
+        if embedding is not None:
+            self.persisted_hits += 1
+        else:
+            self.misses += 1
+            embedding = np.asarray(embed(key), dtype=np.float32)
+            if self._store is not None:
+                try:
+                    self._store.put(key, embedding)
+                except Exception as e:
+                    logger.warning(f"Query embedding store is unavailable: {e}")
+
+        self._put(key, embedding)
+        return embedding
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the cache statistics.
+
+        Returns:
+            Dict[str, float]: The number of hits, persisted hits, misses and entries,
+                and the hit rate.
+        """
+        lookups = self.hits + self.persisted_hits + self.misses
+        return {
+            "hits": self.hits,
+            "persisted_hits": self.persisted_hits,
+            "misses": self.misses,
+            "hit_rate": (
+                (self.hits + self.persisted_hits) / lookups if lookups else 0.0
+            ),
+            "entries": len(self._entries),
+        }
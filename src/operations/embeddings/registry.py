@@ -0,0 +1,160 @@
+from config import base_settings
+
+from langchain_core.embeddings import Embeddings
+from sentence_transformers import SentenceTransformer
+
+from typing import Dict, List, Tuple
+
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmbedderRegistry:
+    """
+    Thread-safe, process-wide registry of loaded embedding models.
+
+    Each model is loaded from disk once per (model directory, device, precision)
+    key and then shared by every ingestion and retrieval path in the process.
+    """
+
+    def __init__(self) -> None:
+        self._embedders: Dict[Tuple[str, str, str], SentenceTransformer] = {}
+        self._lock = threading.Lock()
+
+    def _load(
+        self, embedder_dir: str, device: str, precision: str
+    ) -> SentenceTransformer:
+        """
+        Loads the embedding model from disk.
+
+        Args:
+            embedder_dir (str): The directory path where the embedding model is located.
+            device (str): The device on which the model is placed.
+            precision (str): The floating point precision of the model weights.
+
+        Returns:
+            SentenceTransformer: The loaded embedding model.
+        """
+        logger.info(
+            f'Loading embedding model "{embedder_dir}" (device={device}, precision={precision})'
+        )
+        return SentenceTransformer(
+            embedder_dir, device=device, model_kwargs={"torch_dtype": precision}
+        )
+
+    def get(
+        self,
+        embedder_dir: str,
+        device: str | None = None,
+        precision: str | None = None,
+    ) -> SentenceTransformer:
+        """
+        Returns the shared embedding model, loading it on the first request.
+
+        Args:
+            embedder_dir (str): The directory path where the embedding model is located.
+            device (str | None): The device on which the model is placed.
+                If None, the configured device is used.
+            precision (str | None): The floating point precision of the model weights.
+                If None, the configured precision is used.
+
+        Returns:
+            SentenceTransformer: The shared embedding model.
+        """
+        key = (
+            embedder_dir,
+            device or base_settings.rag.EMBEDDER_DEVICE,
+            precision or base_settings.rag.EMBEDDER_PRECISION,
+        )
+
+        embedder = self._embedders.get(key)
+        if embedder is not None:
+            return embedder
+
+        with self._lock:
+            if key not in self._embedders:
+                self._embedders[key] = self._load(*key)
+            return self._embedders[key]
+
+    def clear(self) -> None:
+        """
+        Drops all loaded models from the registry.
+        """
+        with self._lock:
+            self._embedders.clear()
+
+
+embedder_registry = EmbedderRegistry()
+
+
+def get_embedder(
+    embedder_dir: str = base_settings.app.EMBEDDER_DIR,
+    device: str | None = None,
+    precision: str | None = None,
+) -> SentenceTransformer:
+    """
+    Returns the process-wide embedding model for the given key.
+
+    Args:
+        embedder_dir (str): The directory path where the embedding model is located.
+        device (str | None): The device on which the model is placed.
+        precision (str | None): The floating point precision of the model weights.
+
+    Returns:
+        SentenceTransformer: The shared embedding model.
+    """
+    return embedder_registry.get(
+        embedder_dir=embedder_dir, device=device, precision=precision
+    )
+
+
+def warm_up_embedder(embedder_dir: str = base_settings.app.EMBEDDER_DIR) -> None:
+    """
+    Loads the embedding model and runs a single encode, so the first request
+    does not pay for the model initialization.
+
+    Args:
+        embedder_dir (str): The directory path where the embedding model is located.
+    """
+    get_embedder(embedder_dir=embedder_dir).encode("warm up")
+    logger.info(f'Embedding model "{embedder_dir}" is warmed up.')
+
+
+class SharedEmbeddings(Embeddings):
+    """
+    LangChain embeddings backed by the process-wide embedder registry.
+    """
+
+    def __init__(self, embedder_dir: str = base_settings.app.EMBEDDER_DIR) -> None:
+        """
+        Args:
+            embedder_dir (str): The directory path where the embedding model is located.
+        """
+        self.embedder_dir = embedder_dir
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds a list of documents.
+
+        Args:
+            texts (List[str]): A list of texts to embed.
+
+        Returns:
+            List[List[float]]: A list of embeddings, one for each text.
+        """
+        texts = [text.replace("\n", " ") for text in texts]
+        return get_embedder(self.embedder_dir).encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embeds a single query.
+
+        Args:
+            text (str): The query to embed.
+
+        Returns:
+            List[float]: The embedding of the query.
+        """
+        return self.embed_documents([text])[0]
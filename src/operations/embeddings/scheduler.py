@@ -0,0 +1,178 @@
+from operations.embeddings.registry import get_embedder
+from operations.embeddings.cache import EmbeddingCache, get_embedding_cache
+from config import base_settings
+
+from typing import List, Tuple
+
+import numpy as np
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingRequest:
+    """
+    A handle to the embeddings of texts submitted to an 'EmbeddingScheduler'.
+    The embeddings become available once the scheduler is flushed.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Args:
+            size (int): The number of submitted texts.
+        """
+        self.size = size
+        self._embeddings: np.ndarray | None = None
+
+    @property
+    def done(self) -> bool:
+        """
+        Whether the embeddings have already been computed.
+        """
+        return self._embeddings is not None
+
+    def result(self) -> np.ndarray:
+        """
+        Returns the embeddings in the order the texts were submitted.
+
+        Returns:
+            np.ndarray: A float32 matrix with one row per submitted text.
+        """
+        if self._embeddings is None:
+            raise RuntimeError("Embeddings are not ready, flush the scheduler first.")
+        return self._embeddings
+
+
+class EmbeddingScheduler:
+    """
+    Collects texts from many callers (sections, documents) and embeds them together
+    in length-sorted micro-batches, so the model never encodes a single string at a time.
+
+    Attributes:
+        embedder_dir (str): The directory path where the embedding model is located.
+        batch_size (int): The number of texts encoded in a single model call.
+        use_cache (bool): Whether embeddings are looked up in the disk cache before encoding.
+    """
+
+    def __init__(
+        self,
+        embedder_dir: str = base_settings.app.EMBEDDER_DIR,
+        batch_size: int = base_settings.rag.EMBEDDING_BATCH_SIZE,
+        use_cache: bool = base_settings.rag.EMBEDDING_CACHE_ENABLED,
+    ) -> None:
+        """
+        Args:
+            embedder_dir (str): The directory path where the embedding model is located.
+            batch_size (int): The number of texts encoded in a single model call.
+            use_cache (bool): Whether embeddings are looked up in the disk cache before encoding.
+        """
+        self.embedder_dir = embedder_dir
+        self.batch_size = batch_size
+        self.use_cache = use_cache
+        self._pending: List[Tuple[EmbeddingRequest, List[str]]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """
+        The number of submitted texts waiting to be embedded.
+        """
+        return sum(request.size for request, _ in self._pending)
+
+    @property
+    def cache(self) -> EmbeddingCache | None:
+        """
+        The disk cache of the embedder, or None if caching is disabled.
+        """
+        if not self.use_cache:
+            return None
+        return get_embedding_cache(embedder_dir=self.embedder_dir)
+
+    def submit(self, texts: List[str]) -> EmbeddingRequest:
+        """
+        Queues texts for embedding without running the model.
+
+        Args:
+            texts (List[str]): A list of texts to embed.
+
+        Returns:
+            EmbeddingRequest: A handle resolved on the next flush.
+        """
+        request = EmbeddingRequest(size=len(texts))
+        with self._lock:
+            self._pending.append((request, list(texts)))
+        return request
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeds texts in length-sorted batches and restores their original order.
+
+        Args:
+            texts (List[str]): A list of texts to embed.
+
+        Returns:
+            np.ndarray: A float32 matrix with one row per text.
+        """
+        embedder = get_embedder(self.embedder_dir)
+        embeddings = np.empty(
+            (len(texts), embedder.get_sentence_embedding_dimension()), dtype=np.float32
+        )
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start : start + self.batch_size]
+            embeddings[batch] = embedder.encode(
+                [texts[i] for i in batch],
+                batch_size=len(batch),
+                convert_to_numpy=True,
+            )
+
+        return embeddings
+
+    def flush(self) -> None:
+        """
+        Embeds all pending texts and resolves their requests.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        if not pending:
+            return
+
+        texts = [text for _, request_texts in pending for text in request_texts]
+        cache = self.cache
+
+        if cache is None:
+            embeddings = self._encode(texts)
+            missing = texts
+        else:
+            embeddings, missing_ids = cache.get(texts)
+            missing = [texts[i] for i in missing_ids]
+            if missing:
+                embeddings[missing_ids] = self._encode(missing)
+                cache.put(missing, embeddings[missing_ids])
+                cache.save()
+
+        logger.info(
+            f"Embedded {len(missing)} of {len(texts)} texts from {len(pending)} requests."
+        )
+
+        offset = 0
+        for request, _ in pending:
+            request._embeddings = embeddings[offset : offset + request.size]
+            offset += request.size
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeds texts immediately, together with everything already pending.
+
+        Args:
+            texts (List[str]): A list of texts to embed.
+
+        Returns:
+            np.ndarray: A float32 matrix with one row per text.
+        """
+        request = self.submit(texts)
+        self.flush()
+        return request.result()
@@ -1,6 +1,13 @@
 from .chromadb_operations import ChromaDBOperations
 from .sql_db_operations import DBOperations
 from .azure_blob_storage_operations import BlobStorageOperations
+from .summary_cache import SummaryCache
 from .utils import list_files
 
-__all__ = ["ChromaDBOperations", "DBOperations", "BlobStorageOperations", "list_files"]
+__all__ = [
+    "ChromaDBOperations",
+    "DBOperations",
+    "BlobStorageOperations",
+    "SummaryCache",
+    "list_files",
+]
@@ -1,21 +1,28 @@
-from app.core import init_blob_container
+from app.core import shared_clients
+from config import base_settings
 
-from azure.storage.blob import BlobProperties
+from azure.storage.blob import BlobProperties, ContainerClient
 
 from io import BytesIO
 from typing import List
 
+import tempfile
+import os
 import hashlib
 
 
 class BlobStorageOperations:
     """Provides methods for interacting with Azure Blob Storage"""
 
-    def __init__(self) -> None:
+    def __init__(self, client: ContainerClient | None = None) -> None:
         """
         Initializes a connection to the blob container.
+
+        Args:
+            client (ContainerClient | None): The container client to use.
+                If None, the process-wide shared client is used.
         """
-        self.client = init_blob_container()
+        self.client = client or shared_clients.get_blob_container()
 
     def list_file_metadatas(self) -> List[BlobProperties]:
         """
@@ -27,22 +34,62 @@ class BlobStorageOperations:
         blob_list = self.client.list_blobs()
         return list(blob_list)
 
-    def download_blob(self, blob_name: str) -> BytesIO:
+    def download_blob(
+        self,
+        blob_name: str,
+        max_concurrency: int = base_settings.rag.BLOB_DOWNLOAD_MAX_CONCURRENCY,
+    ) -> BytesIO:
         """
         Downloades a blob from the container and returns it as a byte stream.
+        The chunks are written directly into the stream, without an intermediate copy.
 
         Args:
             blob_name (str): The name of the blob to download.
+            max_concurrency (int): The number of parallel connections used for the download.
 
         Returns:
             BytesIO: A byte stream containing the blob data.
         """
         blob_client = self.client.get_blob_client(blob=blob_name)
-        pdf = blob_client.download_blob()
-        pdf = pdf.readall()
-        pdf = BytesIO(pdf)
+        pdf = BytesIO()
+        blob_client.download_blob(max_concurrency=max_concurrency).readinto(pdf)
+        pdf.seek(0)
         return pdf
 
+    def download_blob_to_file(
+        self,
+        blob_name: str,
+        max_concurrency: int = base_settings.rag.BLOB_DOWNLOAD_MAX_CONCURRENCY,
+        directory: str | None = base_settings.rag.BLOB_DOWNLOAD_DIR,
+    ) -> str:
+        """
+        Streams a blob from the container into a temporary file, chunk by chunk,
+        so the blob is never held in memory as a whole. The caller is responsible
+        for removing the file.
+
+        Args:
+            blob_name (str): The name of the blob to download.
+            max_concurrency (int): The number of parallel connections used for the download.
+            directory (str | None): The directory of the temporary file.
+                If None, the system temporary directory is used.
+
+        Returns:
+            str: The path to the temporary file.
+        """
+        blob_client = self.client.get_blob_client(blob=blob_name)
+        with tempfile.NamedTemporaryFile(
+            suffix=".pdf", dir=directory, delete=False
+        ) as file:
+            try:
+                blob_client.download_blob(max_concurrency=max_concurrency).readinto(
+                    file
+                )
+            except BaseException:
+                file.close()
+                os.remove(file.name)
+                raise
+        return file.name
+
     def delete_blob(self, blob_name: str) -> None:
         """
         Deletes a blob from the container, including any snapshots if they exist.
@@ -1,12 +1,18 @@
 from langchain_core.vectorstores.base import VectorStoreRetriever
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
 from chromadb.errors import InvalidArgumentError
+from chromadb.api import ClientAPI
+from chromadb.api.types import GetResult
 
-from typing import List, Tuple, Dict
+from operations.embeddings import SharedEmbeddings
+from app.core import shared_clients
+from config import base_settings
 
-import chromadb
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+import numpy as np
 import logging
 import hashlib
 
@@ -21,6 +27,7 @@ class ChromaDBOperations:
         port: int = 8800,
         collection: str = "documents",
         embedder_dir: str = "BAAI/bge-small-en",
+        client: ClientAPI | None = None,
     ) -> None:
         """
         Args:
@@ -28,12 +35,17 @@ class ChromaDBOperations:
             port (int): A port number.
             collection (str): Name of the collection to store documents inside ChromaDB.
             embedder_name (str): The directory path where the embedding model is located.
+            client (ClientAPI | None): The ChromaDB client to use.
+                If None, the process-wide shared client of the server is used.
         """
         self.collection_name = collection
-        self.chroma_client = chromadb.HttpClient(host=host, port=port)
+        self.chroma_client = client or shared_clients.get_chroma_client(
+            host=host, port=port
+        )
         self.collection = self.chroma_client.get_or_create_collection(name=collection)
+        self._max_batch_size: int | None = None
 
-        self.embedder = HuggingFaceEmbeddings(model_name=embedder_dir)
+        self.embedder = SharedEmbeddings(embedder_dir=embedder_dir)
 
     def get_retriever(self, k: int = 1) -> VectorStoreRetriever:
         """
@@ -51,70 +63,181 @@ class ChromaDBOperations:
             embedding_function=self.embedder,
         ).as_retriever(search_kwargs={"k": k})
 
+    def iterate_pages(
+        self,
+        include: Sequence[str] = ("documents", "metadatas"),
+        page_size: int = 1000,
+        where: Dict | None = None,
+    ) -> Iterator[GetResult]:
+        """
+        Pages through the collection with limit and offset, fetching only the requested fields.
+        The pages are consistent only if the collection is not modified while iterating.
+
+        Args:
+            include (Sequence[str]): The fields to fetch, out of 'documents', 'metadatas'
+                and 'embeddings'. The IDs are always fetched.
+            page_size (int): The number of chunks fetched in a single request.
+            where (Dict | None): An optional metadata filter.
+
+        Yields:
+            GetResult: The next page of the collection.
+        """
+        offset = 0
+        while True:
+            page = self.collection.get(
+                include=list(include), limit=page_size, offset=offset, where=where
+            )
+            if page["ids"]:
+                yield page
+
+            if len(page["ids"]) < page_size:
+                return
+            offset += page_size
+
+    def iterate_documents(
+        self,
+        include: Sequence[str] = ("documents", "metadatas"),
+        page_size: int = 1000,
+        where: Dict | None = None,
+    ) -> Iterator[Dict]:
+        """
+        Streams the documents of the collection one by one, holding a single page in memory.
+
+        Args:
+            include (Sequence[str]): The fields to fetch, out of 'documents', 'metadatas'
+                and 'embeddings'. The IDs are always fetched.
+            page_size (int): The number of chunks fetched in a single request.
+            where (Dict | None): An optional metadata filter.
+
+        Yields:
+            Dict: A document with the key 'id' and the keys 'document', 'metadata'
+                and 'embedding' of the requested fields.
+        """
+        keys = {
+            "documents": "document",
+            "metadatas": "metadata",
+            "embeddings": "embedding",
+        }
+
+        for page in self.iterate_pages(
+            include=include, page_size=page_size, where=where
+        ):
+            for i, chunk_id in enumerate(page["ids"]):
+                document = {"id": chunk_id}
+                for field in include:
+                    document[keys[field]] = page[field][i]
+                yield document
+
+    def iterate_embeddings(
+        self, page_size: int = 1000, where: Dict | None = None
+    ) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """
+        Streams the embeddings of the collection as NumPy blocks, one per page.
+
+        Args:
+            page_size (int): The number of chunks fetched in a single request.
+            where (Dict | None): An optional metadata filter.
+
+        Yields:
+            Tuple[List[str], np.ndarray]: The IDs of the chunks of the page and a float32
+                matrix with their embeddings.
+        """
+        for page in self.iterate_pages(
+            include=("embeddings",), page_size=page_size, where=where
+        ):
+            yield page["ids"], np.asarray(page["embeddings"], dtype=np.float32)
+
     def get_all_documents(self) -> List[Dict]:
         """
-        Returns a list of all documents in the collection.
+        Returns a list of all documents in the collection. For large collections
+        'iterate_documents' streams them instead of holding all of them in memory.
 
         Returns:
-            List[Dict]: A list of dictionaries, each representing a document with keys like 'id', 'documents','metadatas' and 'embeddings'.
-        """
-        results = self.collection.get(include=["documents", "metadatas", "embeddings"])
-
-        documents = []
-        for i in range(len(results["ids"])):
-            documents.append(
-                {
-                    "id": results["ids"][i],
-                    "document": (
-                        results["documents"][i] if "documents" in results else None
-                    ),
-                    "metedata": (
-                        results["metadatas"][i] if "metadatas" in results else None
-                    ),
-                    "embedding": (
-                        results["embeddings"][i] if "embeddings" in results else None
-                    ),
-                }
-            )
-        return documents
+            List[Dict]: A list of dictionaries, each representing a document with keys 'id', 'document', 'metadata' and 'embedding'.
+        """
+        return list(
+            self.iterate_documents(include=("documents", "metadatas", "embeddings"))
+        )
+
+    def get_upsert_batch_size(self) -> int:
+        """
+        Returns the number of chunks upserted in a single request: the configured size,
+        capped by the maximum batch size reported by the server.
+
+        Returns:
+            int: The batch size.
+        """
+        if self._max_batch_size is None:
+            self._max_batch_size = self.chroma_client.get_max_batch_size()
+
+        batch_size = base_settings.rag.CHROMA_UPSERT_BATCH_SIZE or self._max_batch_size
+        return min(batch_size, self._max_batch_size)
 
     def add_chunks(
         self,
-        embeddings: List[List[float]],
+        embeddings: np.ndarray | List[List[float]],
         chunks: List[str],
         content_md5,
+        max_concurrency: int = base_settings.rag.CHROMA_UPSERT_CONCURRENCY,
     ) -> None:
         """
-        Adds already prepared chunks to ChromaDB.
+        Upserts already prepared chunks to ChromaDB, in batches no larger than the maximum
+        batch size of the server. Up to 'max_concurrency' batches are sent concurrently.
+
+        Chunk IDs are unique per file, so the same text in two files is stored twice,
+        and a repeated text within one file is stored once.
 
         Args:
-            embeddings (List[str]): A list of embeddings applied on chunks.
+            embeddings (np.ndarray | List[List[float]]): The embeddings applied on chunks.
             chunks (List[str]): A list of extracted text chunks.
             content_md5 (str): The MD5 hash of the context ot the file to store in chunk metadata.
+            max_concurrency (int): The maximum number of batches sent concurrently.
         """
 
         def _generate_chunk_id(chunk: str) -> str:
             """
-            Generates an unique ID for a text chunk using a MD5 hash.
+            Generates an unique ID for a text chunk of the file using a MD5 hash.
 
             Args:
                 chunk (str): The text chunk to hash.
 
             Returns:
-                str: The hexadecimal MD5 hash of the chunk.
+                str: The hexadecimal MD5 hash of the file hash and the chunk.
             """
-            return hashlib.md5(chunk.encode()).hexdigest()
+            return hashlib.md5(f"{content_md5}:{chunk}".encode()).hexdigest()
+
+        chunk_ids = {}
+        for position, chunk in enumerate(chunks):
+            chunk_ids.setdefault(_generate_chunk_id(chunk), position)
+
+        ids = list(chunk_ids)
+        positions = list(chunk_ids.values())
+        embeddings = np.asarray(embeddings, dtype=np.float32)[positions]
+        documents = [chunks[position] for position in positions]
+        batch_size = self.get_upsert_batch_size()
+
+        def upsert(start: int) -> None:
+            batch_ids = ids[start : start + batch_size]
+            self.collection.upsert(
+                ids=batch_ids,
+                embeddings=embeddings[start : start + batch_size],
+                documents=documents[start : start + batch_size],
+                metadatas=[{"content_md5": content_md5} for _ in batch_ids],
+            )
 
-        chunk_ids = [_generate_chunk_id(chunk) for chunk in chunks]
-        metadatas = [{"content_md5": content_md5} for _ in chunks]
+        starts = range(0, len(ids), batch_size)
+        if max_concurrency > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(max_concurrency, len(starts))
+            ) as executor:
+                list(executor.map(upsert, starts))
+        else:
+            for start in starts:
+                upsert(start)
 
-        self.collection.add(
-            ids=chunk_ids,
-            embeddings=embeddings,
-            documents=chunks,
-            metadatas=metadatas,
+        logger.info(
+            f"Successfully upserted {len(ids)} chunks to the database in {len(starts)} batches."
         )
-        logger.info("Successfully added chunks to the database.")
 
     def remove_collection(self) -> None:
         """
@@ -132,13 +255,18 @@ class ChromaDBOperations:
 
         Args:
             ids_to_delete (List[str]): List of chunk IDs to delete.
-                If nothing provided, it will delete all of the chunks from the collection.
+                If nothing provided, the collection is dropped and created again empty,
+                without fetching the IDs of its chunks.
         """
-        try:
-            if ids_to_delete is None:
-                all_chunks = self.collection.get(include=["metadatas"])
-                ids_to_delete = all_chunks.get("ids", [])
+        if ids_to_delete is None:
+            self.remove_collection()
+            self.collection = self.chroma_client.get_or_create_collection(
+                name=self.collection_name
+            )
+            logger.info(f'Recreated empty collection: "{self.collection_name}"')
+            return
 
+        try:
             self.collection.delete(ids=ids_to_delete)
             logger.info(f"Successfully removed {len(ids_to_delete)} chunks")
 
@@ -147,38 +275,56 @@ class ChromaDBOperations:
                 f'No chunk IDs found in collection "{self.collection_name}". Nothing to delete.'
             )
 
-    def find_md5_to_delete(self, md5_to_keep: List[str]) -> Tuple[List[str], List[str]]:
+    def remove_chunks_by_md5(
+        self, content_md5s: Iterable[str], page_size: int = 100
+    ) -> None:
+        """
+        Deletes all chunks of the given files with metadata filters evaluated by the server,
+        so no chunks are transferred. The hashes are sent in pages of 'page_size'.
+
+        Args:
+            content_md5s (Iterable[str]): The MD5 hashes of the files whose chunks are deleted.
+            page_size (int): The maximum number of hashes in a single filter.
+        """
+        content_md5s = sorted(content_md5s)
+
+        for start in range(0, len(content_md5s), page_size):
+            page = content_md5s[start : start + page_size]
+            self.collection.delete(where={"content_md5": {"$in": page}})
+
+        if content_md5s:
+            logger.info(f"Removed chunks of {len(content_md5s)} files.")
+
+    def find_md5_to_delete(
+        self, md5_to_keep: Set[str], page_size: int = 1000
+    ) -> Tuple[List[str], List[str]]:
         """
         Identifies outdated chunks in the collection by compairing their metadata's content_md5
-        against a provided list of hashes to retain.
+        against a provided set of hashes to retain. It scans the whole collection in pages
+        of 'page_size' chunks, so it is meant for repairs, not for regular syncs.
+
         Args:
-            md5_to_keep List[str]: A list of MD5 hashes to retain.
+            md5_to_keep Set[str]: A set of MD5 hashes to retain.
+            page_size (int): The number of chunks fetched in a single request.
 
         Returns:
             Tuple[List[str], List[str]]:
              - A list of chunk IDs to delete from the collection.
              - A list of MD5 hashes to remove from the database.
         """
-        all_chunks = self.collection.get(include=["metadatas"])
-
-        all_md5s = [
-            metadata.get("content_md5") for metadata in all_chunks.get("metadatas", [])
-        ]
-
-        ids_to_delete = [
-            all_chunks.get("ids")[i]
-            for i, content_md5 in enumerate(all_md5s)
-            if content_md5 not in md5_to_keep
-        ]
+        ids_to_delete = []
+        md5_to_delete = set()
 
-        md5_to_delete = [
-            content_md5
-            for content_md5 in all_md5s
-            if content_md5 and content_md5 not in md5_to_keep
-        ]
+        for page in self.iterate_pages(include=("metadatas",), page_size=page_size):
+            for chunk_id, metadata in zip(page["ids"], page["metadatas"]):
+                content_md5 = (metadata or {}).get("content_md5")
+                if content_md5 not in md5_to_keep:
+                    ids_to_delete.append(chunk_id)
+                    if content_md5:
+                        md5_to_delete.add(content_md5)
 
         if not ids_to_delete and not md5_to_delete:
             logger.info("All chunks are up to date. No deletions needed.")
         else:
             logger.info(f"Found {len(ids_to_delete)} outdated chunks to delete.")
-        return ids_to_delete, md5_to_delete
+        return ids_to_delete, list(md5_to_delete)
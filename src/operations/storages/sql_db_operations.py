@@ -1,7 +1,9 @@
-from app.models import FileMetadata
+from app.models import CorpusVersion, FileMetadata
 
-from sqlmodel import Session, delete, select
-from datetime import datetime
+from sqlmodel import Session, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, Iterable
+from datetime import datetime, timezone
 
 import logging
 
@@ -78,6 +80,59 @@ class DBOperations:
                 select(FileMetadata).where(FileMetadata.name == name)
             ).first()
 
+    def get_file_names(self) -> Dict[str, str]:
+        """
+        Retrieves the names of all files in a single query.
+
+        Returns:
+            Dict[str, str]: The file names keyed by the MD5 hashes of the file contents.
+        """
+        rows = self.session.exec(
+            select(FileMetadata.content_md5, FileMetadata.name)
+        ).all()
+        return {content_md5: name for content_md5, name in rows}
+
+    def rename_file_metadatas(self, names: Dict[str, str]) -> None:
+        """
+        Updates the names of files in a single transaction. The files are first moved
+        to temporary names derived from their MD5 hashes, so swapped names and chains
+        of renames never collide with a name not yet released.
+
+        Args:
+            names (Dict[str, str]): The new file names keyed by the MD5 hashes of the file contents.
+        """
+        if not names:
+            return
+
+        self.session.exec(
+            update(FileMetadata)
+            .where(FileMetadata.content_md5.in_(list(names)))
+            .values(name="~renaming~" + FileMetadata.content_md5)
+        )
+        for content_md5, name in names.items():
+            self.session.exec(
+                update(FileMetadata)
+                .where(FileMetadata.content_md5 == content_md5)
+                .values(name=name)
+            )
+        self.session.commit()
+
+    def delete_file_metadatas(self, content_md5s: Iterable[str]) -> None:
+        """
+        Deletes the metadata of many files in a single statement.
+
+        Args:
+            content_md5s (Iterable[str]): The MD5 hashes of the file contents.
+        """
+        content_md5s = list(content_md5s)
+        if not content_md5s:
+            return
+
+        self.session.exec(
+            delete(FileMetadata).where(FileMetadata.content_md5.in_(content_md5s))
+        )
+        self.session.commit()
+
     def delete_file_metadata(self, content_md5: bytes) -> None:
         """
         Deletes file's metadata by its MD5 hash.
@@ -90,3 +145,43 @@ class DBOperations:
             return
         self.session.delete(file_metadata)
         self.session.commit()
+
+    def get_corpus_version(self, collection: str = "documents") -> int:
+        """
+        Retrieves the version of the collection.
+
+        Args:
+            collection (str): The name of the collection.
+
+        Returns:
+            int: The version of the collection, 0 if it has never been changed.
+        """
+        corpus_version = self.session.get(CorpusVersion, collection)
+        return corpus_version.version if corpus_version else 0
+
+    def increase_corpus_version(self, collection: str = "documents") -> int:
+        """
+        Increases the version of the collection after its documents have changed.
+        The version is upserted in a single statement, so concurrent syncs never race
+        on the creation of the first version.
+
+        Args:
+            collection (str): The name of the collection.
+
+        Returns:
+            int: The new version of the collection.
+        """
+        now = datetime.now(timezone.utc)
+        statement = (
+            insert(CorpusVersion)
+            .values(collection=collection, version=1, updated_at=now)
+            .on_conflict_do_update(
+                index_elements=[CorpusVersion.collection],
+                set_={"version": CorpusVersion.version + 1, "updated_at": now},
+            )
+            .returning(CorpusVersion.version)
+        )
+        version = self.session.exec(statement).scalar_one()
+        self.session.commit()
+        logger.info(f'Collection "{collection}" is now at version {version}.')
+        return version
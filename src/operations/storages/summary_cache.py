@@ -0,0 +1,194 @@
+from app.models import ObjectSummary
+from config import base_settings
+
+from sqlmodel import Session, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import threading
+import hashlib
+import logging
+import json
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryCache:
+    """
+    Handles the cache of picture and table summaries stored in the PostgreSQL database.
+
+    Summaries are keyed by a hash of the model name and the summary request, so a
+    changed image, table, prompt or model never reuses an old summary. Summaries
+    expire after a TTL, and the least recently used ones are evicted when the cache
+    grows above its maximum size.
+
+    Attributes:
+        hits (int): The number of summaries found in the cache.
+        misses (int): The number of summaries not found in the cache.
+        total_hits (int): The number of summaries found by all caches of the process.
+        total_misses (int): The number of summaries not found by all caches of the process.
+    """
+
+    total_hits = 0
+    total_misses = 0
+    _totals_lock = threading.Lock()
+
+    def __init__(
+        self,
+        session: Session,
+        ttl_days: int = base_settings.rag.SUMMARY_CACHE_TTL_DAYS,
+        max_entries: int = base_settings.rag.SUMMARY_CACHE_MAX_ENTRIES,
+    ) -> None:
+        """
+        Args:
+            session: (Session): Active SQLModel session connected to the database.
+            ttl_days (int): The number of days after which a cached summary expires.
+            max_entries (int): The maximum number of summaries kept in the cache.
+        """
+        self.session = session
+        self.ttl = timedelta(days=ttl_days)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def create_key(message_content: List[Dict[str, Any]] | str, model: str) -> str:
+        """
+        Hashes the summary request.
+
+        Args:
+            message_content (List[Dict[str, Any]] | str): The message content sent to the model,
+                with the prompt and the image or the table contents.
+            model (str): The name of the model.
+
+        Returns:
+            str: The SHA-256 hex digest of the request.
+        """
+        request = json.dumps([model, message_content], sort_keys=True)
+        return hashlib.sha256(request.encode()).hexdigest()
+
+    def get_summaries(self, keys: List[str]) -> Dict[str, str]:
+        """
+        Retrieves the cached summaries, which have not expired yet.
+
+        Args:
+            keys (List[str]): The keys of the summary requests.
+
+        Returns:
+            Dict[str, str]: The found summaries keyed by their request keys.
+        """
+        if not keys:
+            return {}
+
+        now = datetime.now(timezone.utc)
+        rows = self.session.exec(
+            select(ObjectSummary).where(
+                ObjectSummary.key.in_(keys),
+                ObjectSummary.created_at >= now - self.ttl,
+            )
+        ).all()
+        summaries = {row.key: row.summary for row in rows}
+
+        if summaries:
+            self.session.exec(
+                update(ObjectSummary)
+                .where(ObjectSummary.key.in_(list(summaries)))
+                .values(last_accessed=now)
+            )
+            self.session.commit()
+
+        hits = len(summaries)
+        misses = len(set(keys) - set(summaries))
+        self.hits += hits
+        self.misses += misses
+        with SummaryCache._totals_lock:
+            SummaryCache.total_hits += hits
+            SummaryCache.total_misses += misses
+        return summaries
+
+    def add_summaries(self, summaries: Dict[str, str]) -> None:
+        """
+        Upserts the summaries and evicts expired and least recently used ones.
+        Summaries stored concurrently under the same key are overwritten, not duplicated.
+
+        Args:
+            summaries (Dict[str, str]): The summaries keyed by their request keys.
+        """
+        if not summaries:
+            return
+
+        now = datetime.now(timezone.utc)
+        statement = insert(ObjectSummary).values(
+            [
+                {
+                    "key": key,
+                    "summary": summary,
+                    "created_at": now,
+                    "last_accessed": now,
+                }
+                for key, summary in summaries.items()
+            ]
+        )
+        self.session.exec(
+            statement.on_conflict_do_update(
+                index_elements=[ObjectSummary.key],
+                set_={
+                    "summary": statement.excluded.summary,
+                    "created_at": statement.excluded.created_at,
+                    "last_accessed": statement.excluded.last_accessed,
+                },
+            )
+        )
+        self.session.commit()
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Deletes the expired summaries and the least recently used ones above the maximum size.
+        """
+        now = datetime.now(timezone.utc)
+        self.session.exec(
+            delete(ObjectSummary).where(ObjectSummary.created_at < now - self.ttl)
+        )
+
+        least_recently_used = (
+            select(ObjectSummary.key)
+            .order_by(ObjectSummary.last_accessed.desc())
+            .offset(self.max_entries)
+        )
+        self.session.exec(
+            delete(ObjectSummary).where(ObjectSummary.key.in_(least_recently_used))
+        )
+        self.session.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the cache statistics.
+
+        Returns:
+            Dict[str, float]: The number of hits and misses, and the hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    @classmethod
+    def total_stats(cls) -> Dict[str, float]:
+        """
+        Returns the statistics of all summary caches of the process.
+
+        Returns:
+            Dict[str, float]: The number of hits and misses, and the hit rate.
+        """
+        with cls._totals_lock:
+            hits, misses = cls.total_hits, cls.total_misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
@@ -5,13 +5,20 @@ from operations.storages import (
     ChromaDBOperations,
     DBOperations,
     BlobStorageOperations,
+    SummaryCache,
 )
-from upload_pdfs import handle_pdfs
-from app.core import get_session
+from operations.embeddings import warm_up_embedder
+from upload_pdfs import handle_pdfs, get_ingestion_stats
+from upload_pdfs.uploader import warm_up_pdf_loaders
+from app.dependencies import get_blob_oper, get_chroma_oper, get_db_oper
+from app.core import shared_clients
+from agent.rag_components import retrieval_service, answer_cache
 from agent.graphs import agent
 
-from fastapi import FastAPI, UploadFile
+from fastapi import Depends, FastAPI, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from langserve import add_routes
+from contextlib import asynccontextmanager
 
 logging.basicConfig(
     format="%(asctime)s | %(levelname)s | [%(filename)s:%(lineno)d] | %(message)s",
@@ -20,25 +27,40 @@ logging.basicConfig(
     force=True,
 )
 
-app = FastAPI(debug=True, version="1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Loads shared, long-lived resources once, before the app starts serving requests,
+    and closes the shared client connections on shutdown.
+    """
+    warm_up_embedder()
+    warm_up_pdf_loaders()
+    app.state.blob_oper = BlobStorageOperations()
+    app.state.chroma_oper = ChromaDBOperations()
+    retrieval_service.warm_up()
+    yield
+    shared_clients.close()
+
+
+app = FastAPI(debug=True, version="1.0", lifespan=lifespan)
 add_routes(app, agent)
 
 
 @app.post("/remove_all_data")
-async def remove_all_data():
+async def remove_all_data(
+    blob_oper: BlobStorageOperations = Depends(get_blob_oper),
+    chroma_oper: ChromaDBOperations = Depends(get_chroma_oper),
+    db_oper: DBOperations = Depends(get_db_oper),
+):
     """
     Remove whole data stored in: Azure Blob Storage, ChromaDB and PostgreSQL.
     """
     try:
-        blob_oper = BlobStorageOperations()
         blob_oper.delete_all_blobs()
-
-        chroma_oper = ChromaDBOperations()
         chroma_oper.remove_chunks()
-
-        session = get_session()
-        db_oper = DBOperations(session=session)
         db_oper.clear_table()
+        db_oper.increase_corpus_version()
     except Exception as e:
         return {
             "status": "failed",
@@ -52,7 +74,9 @@ async def remove_all_data():
 
 
 @app.post("/remove_pdf")
-async def remove_pdf(file_name: str):
+async def remove_pdf(
+    file_name: str, blob_oper: BlobStorageOperations = Depends(get_blob_oper)
+):
     """
     Remove the specified PDF from the Azure Blob Storage.
 
@@ -60,7 +84,6 @@ async def remove_pdf(file_name: str):
     **file_name (str):** The name of the file that has to be deleted.
     """
     try:
-        blob_oper = BlobStorageOperations()
         blob_oper.delete_blob(file_name)
     except Exception as e:
         return {
@@ -75,7 +98,9 @@ async def remove_pdf(file_name: str):
 
 
 @app.post("/add_pdf")
-async def add_pdf(file: UploadFile):
+async def add_pdf(
+    file: UploadFile, blob_oper: BlobStorageOperations = Depends(get_blob_oper)
+):
     """
     Add PDF to the Azure Blob Storage. If in database is already a file
     with the same content or name, it will not add the current file.
@@ -90,7 +115,6 @@ async def add_pdf(file: UploadFile):
                 "status": "failed",
                 "message": "The uploaded file is not a valid PDF.",
             }
-        blob_oper = BlobStorageOperations()
         message = blob_oper.add_blob(file.filename, content)
 
     except Exception as e:
@@ -111,7 +135,7 @@ async def sync_data():
     Synchronizes ChromaDB and PostgreSQL based on changes in PDFs in Azure Blob Storage.
     """
     try:
-        handle_pdfs()
+        await run_in_threadpool(handle_pdfs)
     except Exception as e:
         return {
             "status": "failed",
@@ -124,5 +148,30 @@ async def sync_data():
     }
 
 
+@app.get("/sync_stats")
+async def sync_stats():
+    """
+    Returns the throughput and queue depth of every stage of the running or the last
+    pipelined synchronization, and the hit rate of the summary cache.
+    """
+    return {
+        "status": "success",
+        "stages": get_ingestion_stats(),
+        "summary_cache": SummaryCache.total_stats(),
+    }
+
+
+@app.get("/retrieval_stats")
+async def retrieval_stats():
+    """
+    Returns the hit rates of the query embedding cache and the semantic answer cache.
+    """
+    return {
+        "status": "success",
+        "query_embedding_cache": retrieval_service.stats(),
+        "answer_cache": answer_cache.stats(),
+    }
+
+
 if __name__ == "__main__":
     uvicorn.run(app="serve:app", host="127.0.0.1", port=8000, reload=True)
@@ -1,3 +1,3 @@
-from .extract_from_pdf import handle_pdfs
+from .extract_from_pdf import handle_pdfs, get_ingestion_stats
 
-__all__ = ["handle_pdfs"]
+__all__ = ["handle_pdfs", "get_ingestion_stats"]
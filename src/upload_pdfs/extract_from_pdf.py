@@ -1,6 +1,6 @@
 from upload_pdfs.handle_data.text.chunking.markdown import MarkdownSplitter
 from upload_pdfs.handle_data.text.chunking.recursive_semantic import (
-    recursive_semantic_chunking,
+    split_into_semantic_chunks,
 )
 
 from operations.storages import (
@@ -8,84 +8,487 @@ from operations.storages import (
     BlobStorageOperations,
     DBOperations,
 )
+from operations.embeddings import (
+    EmbeddingScheduler,
+    EmbeddingRequest,
+    warm_up_embedder,
+)
 from upload_pdfs.handle_data import PreprocessPDF
+from upload_pdfs.uploader import PdfLoaderPool, pdf_loader_pool, split_cpu_budget
+from upload_pdfs.sync_plan import create_sync_plan
+from upload_pdfs.pipeline import IngestionPipeline
 from app.core import get_session
 
 from config import base_settings
 
+from azure.storage.blob import BlobProperties
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
 from io import BytesIO
 
+import multiprocessing
+import threading
+import numpy as np
+import logging
+import torch
+import os
+
+logger = logging.getLogger(__name__)
 
-def _handle_pdf(pdf: BytesIO, content_md5: str, embedder_dir: str) -> None:
+
+def _chunk_pdf(
+    preprocess_pdf: PreprocessPDF, scheduler: EmbeddingScheduler
+) -> List[str]:
     """
-    Performs recursive semantic chunking on a PDF document and adds embedded chunks to the database.
+    Performs recursive semantic chunking on a converted PDF document.
+    The markdown sections are streamed through the splitters, without assembling the whole text.
 
     Args:
-        pdf (BytesIO): The PDF file stored in bytes.
-        content_md5 (str): The MD5 hash of the context ot the file.
-        embedder_dir (str): The directory path where the embedding model is located.
+        preprocess_pdf (PreprocessPDF): The converted PDF document.
+        scheduler (EmbeddingScheduler): The scheduler used to embed the sentence windows.
+
+    Returns:
+        List[str]: A list of extracted text chunks.
     """
-    preprocess_pdf = PreprocessPDF(pdf=pdf)
-    markdown_text = preprocess_pdf.preprocess()
-    print("\nPreprocessed PDF, text_size:", len(markdown_text))
+    sections = preprocess_pdf.iterate_sections()
 
     markdown_splitter = MarkdownSplitter(base_settings.rag.MIN_CHUNK_LENGTH)
-    chunks = markdown_splitter.apply_markdown_chunking(markdown_text=markdown_text)
-    print("\nMarkdown splitted, num chunks:", len(chunks))
+    markdown_chunks = markdown_splitter.iterate_markdown_chunking(sections=sections)
 
-    chunks, embeddings = recursive_semantic_chunking(
-        chunks_before_processing=chunks,
-        embedder_dir=embedder_dir,
+    chunks = split_into_semantic_chunks(
+        chunks_before_processing=markdown_chunks,
+        scheduler=scheduler,
         percentage=base_settings.rag.PERCENTILE_THRESHOLD,
         min_size=base_settings.rag.MIN_CHUNK_LENGTH,
         max_size=base_settings.rag.MAX_CHUNK_LENGTH,
     )
     print("\nRecursive-semantic splitted, num chunks:", len(chunks))
 
-    chroma_oper = ChromaDBOperations()
+    return chunks
+
+
+def _handle_pdf(
+    pdf: BytesIO | str,
+    scheduler: EmbeddingScheduler,
+    loader_pool: PdfLoaderPool = pdf_loader_pool,
+) -> Tuple[List[str], EmbeddingRequest]:
+    """
+    Performs recursive semantic chunking on a PDF document and submits its chunks for embedding.
+
+    Args:
+        pdf (BytesIO | str): The PDF file stored in bytes, or the path to the PDF file.
+        scheduler (EmbeddingScheduler): The scheduler shared by all documents in the sync.
+        loader_pool (PdfLoaderPool): The pool of loaders converting the PDF.
+
+    Returns:
+        Tuple[List[str], EmbeddingRequest]: A list of extracted text chunks and
+            the request resolving to their embeddings.
+    """
+    try:
+        preprocess_pdf = PreprocessPDF(pdf=pdf, loader_pool=loader_pool)
+    finally:
+        _remove_downloaded_pdf(pdf)
+    chunks = _chunk_pdf(preprocess_pdf=preprocess_pdf, scheduler=scheduler)
+
+    return chunks, scheduler.submit(chunks)
+
+
+def _download_pdf(blob_oper: BlobStorageOperations, blob_name: str) -> BytesIO | str:
+    """
+    Downloads a PDF into a temporary file, or into memory if downloads to disk are disabled.
+
+    Args:
+        blob_oper (BlobStorageOperations): The Azure Blob Storage operations instance.
+        blob_name (str): The name of the blob to download.
+
+    Returns:
+        BytesIO | str: The PDF file stored in bytes, or the path to the temporary file.
+    """
+    if base_settings.rag.BLOB_DOWNLOAD_TO_DISK:
+        return blob_oper.download_blob_to_file(blob_name)
+    return blob_oper.download_blob(blob_name)
+
+
+def _remove_downloaded_pdf(pdf: BytesIO | str) -> None:
+    """
+    Removes the temporary file of a downloaded PDF.
+
+    Args:
+        pdf (BytesIO | str): The PDF file stored in bytes, or the path to the temporary file.
+    """
+    if isinstance(pdf, str) and os.path.exists(pdf):
+        os.remove(pdf)
+
+
+def _store_pdf(
+    blob: BlobProperties,
+    content_md5: str,
+    chunks: List[str],
+    embeddings: np.ndarray,
+    chroma_oper: ChromaDBOperations,
+    db_oper: DBOperations,
+) -> None:
+    """
+    Adds chunks of a PDF to ChromaDB and records its metadata.
+
+    Args:
+        blob (BlobProperties): The blob of the PDF.
+        content_md5 (str): The MD5 hash of the PDF.
+        chunks (List[str]): The extracted text chunks.
+        embeddings (np.ndarray): The embeddings of the chunks.
+        chroma_oper (ChromaDBOperations): The ChromaDB operations instance.
+        db_oper (DBOperations): The PostgreSQL operations instance.
+    """
     chroma_oper.add_chunks(
-        embeddings=embeddings, chunks=chunks, content_md5=content_md5
+        embeddings=embeddings,
+        chunks=chunks,
+        content_md5=content_md5,
+    )
+    db_oper.create_file_metadata(
+        name=blob.name,
+        content_md5=content_md5,
+        last_modified=blob.last_modified,
     )
 
 
-def handle_pdfs() -> None:
+def _store_embedded_pdfs(
+    pending: List[Tuple[BlobProperties, str, List[str], EmbeddingRequest]],
+    chroma_oper: ChromaDBOperations,
+    db_oper: DBOperations,
+) -> None:
     """
-    Handles processing PDFs, performing semantic chunking and removing outdated chunks.
+    Adds chunks of the PDFs whose embeddings are ready to ChromaDB and records their metadata.
+    Stored PDFs are removed from the pending list.
+
+    Args:
+        pending (List[Tuple[BlobProperties, str, List[str], EmbeddingRequest]]): Processed PDFs
+            waiting for their embeddings: blob, MD5 hash, chunks and embedding request.
+        chroma_oper (ChromaDBOperations): The ChromaDB operations instance.
+        db_oper (DBOperations): The PostgreSQL operations instance.
     """
-    blob_oper = BlobStorageOperations()
-    blob_list = blob_oper.list_file_metadatas()
+    for item in [item for item in pending if item[3].done]:
+        blob, content_md5, chunks, request = item
+        _store_pdf(
+            blob=blob,
+            content_md5=content_md5,
+            chunks=chunks,
+            embeddings=request.result(),
+            chroma_oper=chroma_oper,
+            db_oper=db_oper,
+        )
+        pending.remove(item)
 
-    session = get_session()
-    db_oper = DBOperations(session=session)
-    md5_to_keep = []
 
-    for blob in blob_list:
-        content_md5 = blob.content_settings.content_md5.hex()
+def _ingest_serially(
+    new_blobs: List[Tuple[BlobProperties, str]],
+    blob_oper: BlobStorageOperations,
+    chroma_oper: ChromaDBOperations,
+    db_oper: DBOperations,
+) -> None:
+    """
+    Processes the new PDFs one after another in the current process.
 
-        if not db_oper.get_file_metadata(content_md5):
-            pdf = blob_oper.download_blob(blob.name)
-            _handle_pdf(
-                pdf=pdf,
-                content_md5=content_md5,
-                embedder_dir=base_settings.app.EMBEDDER_DIR,
+    Chunks of consecutive PDFs are embedded together: the chunks of one document
+    are batched with the sentence windows of the next one. If a PDF fails,
+    the documents processed before it are still embedded and stored.
+
+    Args:
+        new_blobs (List[Tuple[BlobProperties, str]]): The blobs to process with their MD5 hashes.
+        blob_oper (BlobStorageOperations): The Azure Blob Storage operations instance.
+        chroma_oper (ChromaDBOperations): The ChromaDB operations instance.
+        db_oper (DBOperations): The PostgreSQL operations instance.
+    """
+    scheduler = EmbeddingScheduler(embedder_dir=base_settings.app.EMBEDDER_DIR)
+    pending = []
+
+    try:
+        for blob, content_md5 in new_blobs:
+            pdf = _download_pdf(blob_oper=blob_oper, blob_name=blob.name)
+            chunks, request = _handle_pdf(pdf=pdf, scheduler=scheduler)
+            pending.append((blob, content_md5, chunks, request))
+
+            _store_embedded_pdfs(
+                pending=pending, chroma_oper=chroma_oper, db_oper=db_oper
             )
+    finally:
+        # Documents already chunked are stored, even if a later document fails.
+        scheduler.flush()
+        _store_embedded_pdfs(pending=pending, chroma_oper=chroma_oper, db_oper=db_oper)
+
+
+_worker_blob_oper: BlobStorageOperations | None = None
+_worker_loader_pool: PdfLoaderPool | None = None
+
+
+def _init_ingestion_worker(threads: int) -> None:
+    """
+    Loads the converter and the embedder of an ingestion worker process once,
+    limiting the worker to its share of the CPU budget.
+
+    Args:
+        threads (int): The number of CPU threads of the worker.
+    """
+    global _worker_blob_oper, _worker_loader_pool
 
-            db_oper.create_file_metadata(
-                name=blob.name,
+    torch.set_num_threads(threads)
+
+    _worker_blob_oper = BlobStorageOperations()
+    _worker_loader_pool = PdfLoaderPool(size=1, threads=threads)
+    _worker_loader_pool.warm_up()
+    warm_up_embedder()
+
+
+def _ingest_in_worker(blob_name: str) -> Tuple[List[str], np.ndarray]:
+    """
+    Downloads, chunks and embeds a single PDF inside an ingestion worker process.
+
+    Args:
+        blob_name (str): The name of the blob to process.
+
+    Returns:
+        Tuple[List[str], np.ndarray]: The extracted text chunks and their embeddings.
+    """
+    scheduler = EmbeddingScheduler(
+        embedder_dir=base_settings.app.EMBEDDER_DIR, use_cache=False
+    )
+    pdf = _download_pdf(blob_oper=_worker_blob_oper, blob_name=blob_name)
+    chunks, request = _handle_pdf(
+        pdf=pdf, scheduler=scheduler, loader_pool=_worker_loader_pool
+    )
+    scheduler.flush()
+    return chunks, request.result()
+
+
+def _ingest_in_processes(
+    new_blobs: List[Tuple[BlobProperties, str]],
+    chroma_oper: ChromaDBOperations,
+    db_oper: DBOperations,
+    workers: int,
+    threads: int,
+) -> None:
+    """
+    Processes the new PDFs in parallel worker processes, each with its own converter
+    and embedder. The results are written to ChromaDB and PostgreSQL only by the
+    calling process, one PDF at a time, as the workers finish them.
+
+    Args:
+        new_blobs (List[Tuple[BlobProperties, str]]): The blobs to process with their MD5 hashes.
+        chroma_oper (ChromaDBOperations): The ChromaDB operations instance.
+        db_oper (DBOperations): The PostgreSQL operations instance.
+        workers (int): The number of worker processes.
+        threads (int): The number of CPU threads of every worker.
+    """
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_ingestion_worker,
+        initargs=(threads,),
+    )
+
+    try:
+        futures = {
+            executor.submit(_ingest_in_worker, blob.name): (blob, content_md5)
+            for blob, content_md5 in new_blobs
+        }
+        for future in as_completed(futures):
+            blob, content_md5 = futures[future]
+            chunks, embeddings = future.result()
+            _store_pdf(
+                blob=blob,
                 content_md5=content_md5,
-                last_modified=blob.last_modified,
+                chunks=chunks,
+                embeddings=embeddings,
+                chroma_oper=chroma_oper,
+                db_oper=db_oper,
+            )
+            logger.info(f'Stored "{blob.name}", num chunks: {len(chunks)}.')
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pipeline: IngestionPipeline | None = None
+
+
+def _ingest_in_pipeline(
+    new_blobs: List[Tuple[BlobProperties, str]],
+    blob_oper: BlobStorageOperations,
+    chroma_oper: ChromaDBOperations,
+    db_oper: DBOperations,
+) -> None:
+    """
+    Processes the new PDFs in a pipeline of stages connected by bounded queues:
+    fetch, convert, summarise, chunk, embed and upsert. Each stage runs its own
+    threads, so downloads, conversion, LLM calls and embedding of different PDFs overlap.
+    The upsert stage has a single thread, so ChromaDB and PostgreSQL are written
+    one PDF at a time.
+
+    Args:
+        new_blobs (List[Tuple[BlobProperties, str]]): The blobs to process with their MD5 hashes.
+        blob_oper (BlobStorageOperations): The Azure Blob Storage operations instance.
+        chroma_oper (ChromaDBOperations): The ChromaDB operations instance.
+        db_oper (DBOperations): The PostgreSQL operations instance.
+    """
+    global _pipeline
+
+    workers = base_settings.rag.PIPELINE_WORKERS
+    schedulers = threading.local()
+
+    def get_scheduler() -> EmbeddingScheduler:
+        if not hasattr(schedulers, "scheduler"):
+            schedulers.scheduler = EmbeddingScheduler(
+                embedder_dir=base_settings.app.EMBEDDER_DIR
             )
+        return schedulers.scheduler
+
+    def fetch(
+        item: Tuple[BlobProperties, str],
+    ) -> Tuple[BlobProperties, str, BytesIO | str]:
+        blob, content_md5 = item
+        return (
+            blob,
+            content_md5,
+            _download_pdf(blob_oper=blob_oper, blob_name=blob.name),
+        )
+
+    def convert(
+        item: Tuple[BlobProperties, str, BytesIO | str],
+    ) -> Tuple[BlobProperties, str, PreprocessPDF]:
+        blob, content_md5, pdf = item
+        try:
+            return blob, content_md5, PreprocessPDF(pdf=pdf, pdf_name=blob.name)
+        finally:
+            _remove_downloaded_pdf(pdf)
+
+    def summarise(
+        item: Tuple[BlobProperties, str, PreprocessPDF],
+    ) -> Tuple[BlobProperties, str, PreprocessPDF]:
+        item[2].summarize_pictures_and_tables()
+        return item
+
+    def chunk(
+        item: Tuple[BlobProperties, str, PreprocessPDF],
+    ) -> Tuple[BlobProperties, str, List[str]]:
+        blob, content_md5, preprocess_pdf = item
+        return (
+            blob,
+            content_md5,
+            _chunk_pdf(preprocess_pdf=preprocess_pdf, scheduler=get_scheduler()),
+        )
 
-        md5_to_keep.append(content_md5)
+    def embed(
+        item: Tuple[BlobProperties, str, List[str]],
+    ) -> Tuple[BlobProperties, str, List[str], np.ndarray]:
+        blob, content_md5, chunks = item
+        return blob, content_md5, chunks, get_scheduler().encode(chunks)
 
-    chroma_oper = ChromaDBOperations()
-    ids_to_delete, md5_to_delete = chroma_oper.find_md5_to_delete(
-        md5_to_keep=md5_to_keep
+    def upsert(item: Tuple[BlobProperties, str, List[str], np.ndarray]) -> None:
+        blob, content_md5, chunks, embeddings = item
+        _store_pdf(
+            blob=blob,
+            content_md5=content_md5,
+            chunks=chunks,
+            embeddings=embeddings,
+            chroma_oper=chroma_oper,
+            db_oper=db_oper,
+        )
+
+    _pipeline = (
+        IngestionPipeline(queue_size=base_settings.rag.PIPELINE_QUEUE_SIZE)
+        .add_stage("fetch", fetch, workers.get("fetch", 1))
+        .add_stage(
+            "convert",
+            convert,
+            workers.get("convert", pdf_loader_pool.size),
+            discard=lambda item: _remove_downloaded_pdf(item[2]),
+        )
+        .add_stage("summarise", summarise, workers.get("summarise", 1))
+        .add_stage("chunk", chunk, workers.get("chunk", 1))
+        .add_stage("embed", embed, workers.get("embed", 1))
+        .add_stage("upsert", upsert, 1)
     )
+    _pipeline.run(new_blobs)
+
+
+def get_ingestion_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Returns the per-stage throughput and queue depth of the running
+    or the last ingestion pipeline.
+
+    Returns:
+        Dict[str, Dict[str, float]]: The statistics keyed by the stage name,
+            empty if no pipeline has been run.
+    """
+    if _pipeline is None:
+        return {}
+    return _pipeline.stats()
+
+
+def handle_pdfs() -> None:
+    """
+    Handles processing PDFs, performing semantic chunking and removing outdated chunks.
+
+    The blob listing is diffed against the ingested files once, and the resulting sync plan
+    is applied: removed files are deleted, renamed ones are renamed, and new PDFs are
+    processed one by one, in worker processes if the ingestion mode is 'process',
+    or in a staged pipeline if it is 'pipeline'. If any document has been added
+    or removed, the version of the corpus is increased, even if the sync fails midway.
+    """
+    blob_oper = BlobStorageOperations()
+    blob_list = blob_oper.list_file_metadatas()
+
+    with get_session() as session:
+        db_oper = DBOperations(session=session)
+        chroma_oper = ChromaDBOperations()
+
+        plan = create_sync_plan(blobs=blob_list, known_files=db_oper.get_file_names())
+        plan.log()
+
+        try:
+            # Chunks of added files are left only by an interrupted sync, and are replaced.
+            chroma_oper.remove_chunks_by_md5(
+                plan.removed | {content_md5 for _, content_md5 in plan.added}
+            )
+            db_oper.delete_file_metadatas(plan.removed)
+            db_oper.rename_file_metadatas(plan.renamed)
 
-    if ids_to_delete:
-        chroma_oper.remove_chunks(ids_to_delete)
+            new_blobs = plan.added
+            workers, threads = split_cpu_budget(base_settings.rag.INGESTION_WORKERS)
+            workers = min(workers, len(new_blobs))
+            if (
+                base_settings.rag.INGESTION_MODE == "process"
+                and workers <= 1
+                and len(new_blobs) > 1
+            ):
+                logger.warning(
+                    "The CPU budget fits a single ingestion worker, processing PDFs serially. "
+                    "Set INGESTION_WORKERS or NUMBER_OF_THREADS to use worker processes."
+                )
 
-    if md5_to_delete:
-        for md5 in md5_to_delete:
-            db_oper.delete_file_metadata(content_md5=md5)
+            if base_settings.rag.INGESTION_MODE == "pipeline":
+                _ingest_in_pipeline(
+                    new_blobs=new_blobs,
+                    blob_oper=blob_oper,
+                    chroma_oper=chroma_oper,
+                    db_oper=db_oper,
+                )
+            elif base_settings.rag.INGESTION_MODE == "process" and workers > 1:
+                _ingest_in_processes(
+                    new_blobs=new_blobs,
+                    chroma_oper=chroma_oper,
+                    db_oper=db_oper,
+                    workers=workers,
+                    threads=threads,
+                )
+            else:
+                _ingest_serially(
+                    new_blobs=new_blobs,
+                    blob_oper=blob_oper,
+                    chroma_oper=chroma_oper,
+                    db_oper=db_oper,
+                )
+        finally:
+            if plan.added or plan.removed:
+                # A fresh session, so a failed flush of the sync session cannot
+                # hide the original error behind a PendingRollbackError.
+                with get_session() as version_session:
+                    DBOperations(session=version_session).increase_corpus_version()
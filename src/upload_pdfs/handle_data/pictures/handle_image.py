@@ -1,6 +1,7 @@
-from upload_pdfs.utils import summarize_object
 from docling_core.types.doc import PictureItem
 
+from typing import Dict, List
+
 
 class HandlePictures:
 
@@ -10,8 +11,8 @@ class HandlePictures:
             return True
         return False
 
-    def _summarize_picture(self, image_url: str) -> str:
-        content = [
+    def _create_summary_content(self, image_url: str) -> List[Dict[str, str]]:
+        return [
             {
                 "type": "text",
                 "text": "Describe the content of this image in 1-2 sentences.",
@@ -21,14 +22,12 @@ class HandlePictures:
                 "image_url": {"url": image_url},
             },
         ]
-        return summarize_object(content)
-        # return "Summary of some image"
 
-    def handle_picture_data(self, image: PictureItem) -> str:
+    def get_summary_content(self, image: PictureItem) -> List[Dict[str, str]] | None:
         too_small = self._check_if_picture_not_too_small(
             image.image.size.width, image.image.size.height
         )
 
         if too_small:
-            return ""
-        return self._summarize_picture(str(image.image.uri))
+            return None
+        return self._create_summary_content(str(image.image.uri))
@@ -1,37 +1,55 @@
 from upload_pdfs.handle_data.pictures import HandlePictures
 from upload_pdfs.handle_data.tables import HandleTables
 
-from upload_pdfs.utils import from_bytes_to_document_stream
-from upload_pdfs.uploader import PdfLoader
+from upload_pdfs.utils import summarize_objects_in_background
+from upload_pdfs.uploader import PdfLoaderPool, pdf_loader_pool, load_document
 
+from docling_core.types.doc import DocItem
+
+from concurrent.futures import Future
+from typing import Dict, Iterator, List, Tuple
 from io import BytesIO
 
 
 class PreprocessPDF:
 
-    def __init__(self, pdf: BytesIO, pdf_name: str = "") -> None:
-        loader = PdfLoader()
-        formated_pdf = from_bytes_to_document_stream(pdf=pdf, pdf_name=pdf_name)
-        self.document = loader.load_pdf(formated_pdf)
-        self.doc_items = list(self.document.iterate_items())
+    def __init__(
+        self,
+        pdf: BytesIO | str,
+        pdf_name: str = "",
+        loader_pool: PdfLoaderPool = pdf_loader_pool,
+    ) -> None:
+        self.document = load_document(
+            pdf=pdf, pdf_name=pdf_name, loader_pool=loader_pool
+        )
         self.table_oper = HandleTables()
         self.picture_oper = HandlePictures()
+        self._summaries: Dict[str, Future] | None = None
 
-    def _check_if_next_element_for_current_is_caption(self, actual_id: int) -> bool:
-        next_id = actual_id + 1
+    def _iterate_items_with_next(self) -> Iterator[Tuple[DocItem, DocItem | None]]:
+        element = None
 
-        if next_id < len(self.doc_items):
-            return self.doc_items[next_id][0].label == "caption"
+        for next_element, _ in self.document.iterate_items():
+            if element is not None:
+                yield element, next_element
+            element = next_element
 
-        return False
+        if element is not None:
+            yield element, None
 
-    def _check_if_neccessary_to_add_new_lines(self, actual_id: int) -> bool:
-        next_id = actual_id + 1
+    def _check_if_next_element_for_current_is_caption(
+        self, next_element: DocItem | None
+    ) -> bool:
+        if next_element is not None:
+            return next_element.label == "caption"
+
+        return False
 
-        if next_id < len(self.doc_items):
-            if self.doc_items[actual_id][0].label == "text" and self.doc_items[next_id][
-                0
-            ].label in [
+    def _check_if_neccessary_to_add_new_lines(
+        self, element: DocItem, next_element: DocItem | None
+    ) -> bool:
+        if next_element is not None:
+            if element.label == "text" and next_element.label in [
                 "list_item",
                 "picture",
                 "table",
@@ -39,26 +57,99 @@ class PreprocessPDF:
                 return True
         return False
 
-    def preprocess(self) -> str:
+    def _submit_summaries(self) -> Dict[str, Future]:
+        """
+        Collects all pictures and tables of the document and starts summarizing them
+        concurrently in the background, unless already started.
+
+        Returns:
+            Dict[str, Future]: The futures of the summaries keyed by the reference
+                of their element.
+        """
+        if self._summaries is not None:
+            return self._summaries
+
+        references: List[str] = []
+        contents = []
+
+        for element, _ in self.document.iterate_items():
+            if element.label == "picture":
+                content = self.picture_oper.get_summary_content(image=element)
+            elif element.label == "table":
+                content = self.table_oper.get_summary_content(table=element)
+            else:
+                continue
+
+            if content is not None:
+                references.append(element.self_ref)
+                contents.append(content)
+
+        self._summaries = dict(
+            zip(references, summarize_objects_in_background(message_contents=contents))
+        )
+        return self._summaries
+
+    def summarize_pictures_and_tables(self) -> Dict[str, str]:
+        """
+        Summarizes all pictures and tables of the document concurrently and waits
+        for the summaries. The summaries are kept for the markdown generation.
+
+        Returns:
+            Dict[str, str]: The summaries keyed by the reference of their element.
+        """
+        return {
+            reference: future.result()
+            for reference, future in self._submit_summaries().items()
+        }
+
+    def _iterate_section_items(
+        self,
+    ) -> Iterator[List[Tuple[DocItem, DocItem | None]]]:
+        """
+        Groups the elements with their next elements into sections,
+        each starting with its section header.
+        """
+        section_items: List[Tuple[DocItem, DocItem | None]] = []
+
+        for element, next_element in self._iterate_items_with_next():
+            if element.label == "section_header" and section_items:
+                yield section_items
+                section_items = []
+            section_items.append((element, next_element))
+
+        if section_items:
+            yield section_items
+
+    def _section_to_markdown(
+        self,
+        section_items: List[Tuple[DocItem, DocItem | None]],
+        summaries: Dict[str, str],
+    ) -> str:
+        """
+        Converts the elements of a section into markdown, placing the summaries
+        of pictures and tables in order.
+        """
         caption_check = False
-        markdown_text = ""
+        section_parts: List[str] = []
         text_from_element = ""
 
-        for i, (element, _) in enumerate(self.doc_items):
+        for element, next_element in section_items:
             label = element.label
-            add_new_line = self._check_if_neccessary_to_add_new_lines(i)
+            add_new_line = self._check_if_neccessary_to_add_new_lines(
+                element, next_element
+            )
 
             if label == "picture":
-                text_from_element = (
-                    f"`{self.picture_oper.handle_picture_data(image=element)}`\n\n"
+                text_from_element = f"`{summaries.get(element.self_ref, '')}`\n\n"
+                caption_check = self._check_if_next_element_for_current_is_caption(
+                    next_element
                 )
-                caption_check = self._check_if_next_element_for_current_is_caption(i)
 
             elif label == "table":
-                text_from_element = (
-                    f"`{self.table_oper.handle_tabular_data(table=element)}`\n\n"
+                text_from_element = f"`{summaries.get(element.self_ref, '')}`\n\n"
+                caption_check = self._check_if_next_element_for_current_is_caption(
+                    next_element
                 )
-                caption_check = self._check_if_next_element_for_current_is_caption(i)
 
             elif label == "caption":
                 text_from_element = f"\n***{element.text}***\n\n{text_from_element}"
@@ -77,7 +168,33 @@ class PreprocessPDF:
                 text_from_element = f"{text_from_element}\n\n"
 
             if not caption_check:
-                markdown_text += text_from_element
+                section_parts.append(text_from_element)
                 text_from_element = ""
 
-        return markdown_text
+        return "".join(section_parts)
+
+    def iterate_sections(self) -> Iterator[str]:
+        """
+        Converts the document into markdown lazily, yielding every section
+        as soon as the next section header is reached. All pictures and tables
+        are summarized in one concurrent batch started up front, and every section
+        waits only for the summaries of its own pictures and tables, so the first
+        sections reach the chunking before the later ones are summarized.
+
+        Yields:
+            str: The markdown text of a section, starting with its header.
+        """
+        futures = self._submit_summaries()
+
+        for section_items in self._iterate_section_items():
+            summaries = {
+                element.self_ref: futures[element.self_ref].result()
+                for element, _ in section_items
+                if element.self_ref in futures
+            }
+            yield self._section_to_markdown(
+                section_items=section_items, summaries=summaries
+            )
+
+    def preprocess(self) -> str:
+        return "".join(self.iterate_sections())
@@ -1,4 +1,3 @@
-from upload_pdfs.utils import summarize_object
 from docling_core.types.doc import TableItem
 
 import pandas as pd
@@ -16,19 +15,17 @@ class HandleTables:
         pd.set_option("future.no_silent_downcasting", True)
         return df.replace("", np.nan).isna().all().all()
 
-    def _summarize_table(self, df: pd.DataFrame) -> str:
+    def _create_summary_content(self, df: pd.DataFrame) -> str:
 
         def convert_to_markdown(df: pd.DataFrame) -> str:
             return df.to_markdown()
 
-        message_content = f"Summarize the following table up to 8 sentences (can be shorter): {convert_to_markdown(df)}"
-        return summarize_object(message_content)
-        # return "summary of some table"
+        return f"Summarize the following table up to 8 sentences (can be shorter): {convert_to_markdown(df)}"
 
-    def handle_tabular_data(self, table: TableItem) -> str:
+    def get_summary_content(self, table: TableItem) -> str | None:
         df = self._convert_to_df(table=table)
 
         if self._check_if_df_is_empty(df=df):
-            return ""
+            return None
 
-        return self._summarize_table(df=df)
+        return self._create_summary_content(df=df)
@@ -1,6 +1,6 @@
 from langchain_text_splitters.markdown import MarkdownHeaderTextSplitter
 
-from typing import List
+from typing import Iterable, Iterator, List
 
 
 class MarkdownSplitter:
@@ -12,10 +12,7 @@ class MarkdownSplitter:
             ("###", "Section 2"),
         ]
 
-    def apply_markdown_chunking(self, markdown_text: str) -> List[str]:
-        if len(markdown_text) / 2 < self.chunk_min_length:
-            return [markdown_text]
-
+    def _split_by_headers(self, markdown_text: str) -> List[str]:
         splitter = MarkdownHeaderTextSplitter(
             headers_to_split_on=self.headers_to_split_on
         )
@@ -32,3 +29,39 @@ class MarkdownSplitter:
             results.append(chunk_content)
 
         return results
+
+    def apply_markdown_chunking(self, markdown_text: str) -> List[str]:
+        if len(markdown_text) / 2 < self.chunk_min_length:
+            return [markdown_text]
+
+        return self._split_by_headers(markdown_text=markdown_text)
+
+    def iterate_markdown_chunking(self, sections: Iterable[str]) -> Iterator[str]:
+        """
+        Splits markdown sections lazily, as they are produced.
+
+        Sections are buffered only until the text is long enough to be split, then every
+        section is split on its own. A text that stays too short is yielded as a whole.
+
+        Args:
+            sections (Iterable[str]): The markdown sections, each starting with its header.
+
+        Yields:
+            str: The chunks of the markdown text.
+        """
+        buffered: List[str] = []
+        buffered_length = 0
+        sections = iter(sections)
+
+        for section in sections:
+            buffered.append(section)
+            buffered_length += len(section)
+            if buffered_length / 2 >= self.chunk_min_length:
+                break
+        else:
+            yield "".join(buffered)
+            return
+
+        yield from self._split_by_headers(markdown_text="".join(buffered))
+        for section in sections:
+            yield from self._split_by_headers(markdown_text=section)
@@ -1,3 +1,6 @@
-from .recursive_semantic_chunking import recursive_semantic_chunking
+from .recursive_semantic_chunking import (
+    recursive_semantic_chunking,
+    split_into_semantic_chunks,
+)
 
-__all__ = ["recursive_semantic_chunking"]
+__all__ = ["recursive_semantic_chunking", "split_into_semantic_chunks"]
@@ -2,151 +2,195 @@ from upload_pdfs.handle_data.text.chunking.recursive_semantic.operations.utils i
     reset_chunk_index,
 )
 
-from app.models import CombinedSentences, Chunk
+from app.models import CombinedSentences, Chunks
 
 from typing import List, Tuple
 
+import numpy as np
 
-class EnhanceChunkSize:
-    """Class for enhancing chunk size."""
 
-    def _handle_boundary_chunks(
-        self,
-        combined_sentences: List[CombinedSentences],
-        chunks: List[Chunk],
-        min_size: int = 300,
-    ) -> Tuple[List[CombinedSentences], List[Chunk]]:
+class ChunkSpans:
+    """
+    Doubly linked list of chunks, in which every node covers a contiguous span
+    of the original chunks. Merging two neighbouring nodes only unlinks one node,
+    so no chunk is moved and no sentence is relabelled until the merging is done.
+
+    Attributes:
+        size (List[int]): The total size of each node.
+        cosine_distance (List[float]): The cosine distance of each node for merging.
+        is_too_small (List[bool]): Whether the node is below the minimum size threshold.
+        start (List[int]): The position of the first original chunk covered by each node.
+        prev (List[int]): The previous node of each node, -1 for the head.
+        next (List[int]): The next node of each node, -1 for the tail.
+        head (int): The first node, -1 if the list is empty.
+        tail (int): The last node, -1 if the list is empty.
+        count (int): The number of nodes left in the list.
+    """
+
+    def __init__(self, chunks: Chunks) -> None:
         """
-        Merges boundary chunks with their neighbors if their size is to small.
+        Args:
+            chunks (Chunks): The 'Chunks' of a text chunk, one node per chunk.
+        """
+        n = len(chunks)
+        self.size: List[int] = chunks.size.tolist()
+        self.cosine_distance: List[float] = chunks.cosine_distance.tolist()
+        self.is_too_small: List[bool] = chunks.is_too_small.tolist()
+        self.start: List[int] = list(range(n))
+        self.prev: List[int] = list(range(-1, n - 1))
+        self.next: List[int] = list(range(1, n)) + [-1] if n else []
+        self.head: int = 0 if n else -1
+        self.tail: int = n - 1
+        self.count: int = n
+
+    def merge(self, node: int, target: int, min_size: int = 300) -> None:
+        """
+        Merges the node into its neighbouring target node and unlinks it.
 
         Args:
-            combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects.
-            chunks (List[Chunk]): A list of 'Chunk' objects.
-            max_size (int): The minimum size for a chunk.
+            node (int): The node to merge.
+            target (int): The previous or next node of 'node'.
+            min_size (int): The minimum size for a chunk.
+        """
+        self.size[target] += self.size[node]
+        if self.size[target] >= min_size:
+            self.is_too_small[target] = False
+
+        if target == self.next[node]:
+            self.start[target] = self.start[node]
+
+        prev, next = self.prev[node], self.next[node]
+        if prev == -1:
+            self.head = next
+        else:
+            self.next[prev] = next
+        if next == -1:
+            self.tail = prev
+        else:
+            self.prev[next] = prev
+        self.count -= 1
+
+    def nodes(self) -> List[int]:
+        """
+        Returns the nodes left in the list, from head to tail.
 
         Returns:
-            Tuple[List[CombinedSentences], List[Chunk]]: The updatet list of 'CombinedSentences' with
-                updated chunks indices, along with un updated list of 'Chunk' objects after merging.
+            List[int]: The positions of the original chunks kept as nodes.
         """
-        while True:
-            if not chunks or len(chunks) <= 1:
-                break
+        nodes = []
+        node = self.head
+        while node != -1:
+            nodes.append(node)
+            node = self.next[node]
+        return nodes
 
-            boundary_indexes = [0, -1]
-            merged = False
-
-            for id in boundary_indexes:
-                if chunks[id].is_too_small:
-                    if id == 0:
-                        neighbour = 1
-                    else:
-                        neighbour = -2
-
-                    future_chunk = chunks[neighbour].chunk_index
-                    for x in range(len(combined_sentences)):
-                        if combined_sentences[x].chunk_index == chunks[id].chunk_index:
-                            combined_sentences[x].chunk_index = future_chunk
-
-                    chunks[neighbour].size += chunks[id].size
-                    if id == -1:
-                        chunks[neighbour].cosine_distance = chunks[
-                            neighbour
-                        ].cosine_distance
-
-                    if chunks[neighbour].size >= min_size:
-                        chunks[neighbour].is_too_small = False
-
-                    chunks.pop(id)
-                    merged = True
-                    break
-            if not merged:
-                break
 
-        return combined_sentences, chunks
+class EnhanceChunkSize:
+    """Class for enhancing chunk size."""
 
-    def _handle_interior_chunks(
-        self,
-        combined_sentences: List[CombinedSentences],
-        chunks: List[Chunk],
-        min_size: int = 300,
-    ) -> Tuple[List[CombinedSentences], List[Chunk]]:
+    def _handle_boundary_chunks(self, spans: ChunkSpans, min_size: int = 300) -> None:
         """
-        Merges interior chunks with their neighbors based on cosine distance. The neighbor with the lower
-        cosine distance will be connected to the current chunk.
+        Merges boundary chunks with their neighbors if their size is to small.
 
         Args:
-            combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects.
-            chunks (List[Chunk]): A list of 'Chunk' objects.
-            max_size (int): The minimum size for a chunk.
+            spans (ChunkSpans): The linked list of chunks of the text chunk.
+            min_size (int): The minimum size for a chunk.
+        """
+        while spans.count > 1:
+            if spans.is_too_small[spans.head]:
+                spans.merge(
+                    node=spans.head, target=spans.next[spans.head], min_size=min_size
+                )
+            elif spans.is_too_small[spans.tail]:
+                spans.merge(
+                    node=spans.tail, target=spans.prev[spans.tail], min_size=min_size
+                )
+            else:
+                break
 
-        Returns:
-            Tuple[List[CombinedSentences], List[Chunk]]: The updatet list of 'CombinedSentences' with
-                updated chunks indices, along with un updated list of 'Chunk' objects after merging.
+    def _handle_interior_chunks(self, spans: ChunkSpans, min_size: int = 300) -> None:
         """
-        i = 0
-        while i < len(chunks):
+        Merges interior chunks with their neighbors based on cosine distance. The neighbor with the lower
+        cosine distance will be connected to the current chunk.
 
-            if chunks[i].is_too_small:
-                if chunks[i - 1].cosine_distance <= chunks[i + 1].cosine_distance:
-                    neighbour = -1
+        Args:
+            spans (ChunkSpans): The linked list of chunks of the text chunk.
+            min_size (int): The minimum size for a chunk.
+        """
+        node = spans.head
+        while node != -1 and spans.count > 1:
+            prev, next = spans.prev[node], spans.next[node]
+
+            if spans.is_too_small[node]:
+                if next == -1 or (
+                    prev != -1
+                    and spans.cosine_distance[prev] <= spans.cosine_distance[next]
+                ):
+                    spans.merge(node=node, target=prev, min_size=min_size)
+                    spans.cosine_distance[prev] = spans.cosine_distance[node]
                 else:
-                    neighbour = 1
-
-                merged_id = i + neighbour
-
-                for x in range(len(combined_sentences)):
-                    if combined_sentences[x].chunk_index == chunks[i].chunk_index:
-                        combined_sentences[x].chunk_index = chunks[
-                            merged_id
-                        ].chunk_index
-
-                chunks[merged_id].size += chunks[i].size
+                    spans.merge(node=node, target=next, min_size=min_size)
 
-                if chunks[merged_id].size >= min_size:
-                    chunks[merged_id].is_too_small = False
-
-                if neighbour == -1:
-                    chunks[merged_id].cosine_distance = chunks[i].cosine_distance
-                chunks.pop(i)
-
-            else:
-                i += 1
-
-        return combined_sentences, chunks
+            node = next
 
     def enhance_size(
         self,
-        combined_sentences: List[CombinedSentences],
-        chunks: List[Chunk],
+        combined_sentences: CombinedSentences,
+        chunks: Chunks,
         min_size: int = 300,
-    ) -> Tuple[List[CombinedSentences], List[Chunk]]:
+    ) -> Tuple[CombinedSentences, Chunks]:
         """
         Checks each chunk's size. If the size is too small, it will connect the chunk with its neighbor.
 
+        The chunks are merged on a linked list of chunk spans, and the sentences are
+        relabelled once at the end, with the label of the span covering their chunk.
+
         Args:
-            combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects.
-            chunks (List[Chunk]): A list of 'Chunk' objects.
+            combined_sentences (CombinedSentences): The 'CombinedSentences' of a text chunk.
+            chunks (Chunks): The 'Chunks' of the text chunk.
             min_size (int): The minimum size for a chunk.
 
         Returns:
-            Tuple[List[CombinedSentences], List[Chunk]]: The updatet list of 'CombinedSentences' with
-                updated chunks indices, along with un updated list of 'Chunk' objects after merging.
+            Tuple[CombinedSentences, Chunks]: The updatet 'CombinedSentences' with
+                updated chunks indices, along with the updated 'Chunks' after merging.
         """
-        distances = {}
-
-        for sen in combined_sentences:
-            distances[sen.chunk_index] = sen.cosine_distance
-
-        for chunk in chunks:
-            chunk.is_too_small = chunk.size < min_size
-            chunk.cosine_distance = distances[chunk.chunk_index]
+        distances = dict(
+            zip(
+                combined_sentences.chunk_index.tolist(),
+                combined_sentences.cosine_distance.tolist(),
+            )
+        )
 
-        combined_sentences, chunks = self._handle_boundary_chunks(
-            combined_sentences=combined_sentences, chunks=chunks, min_size=min_size
+        chunks.is_too_small = chunks.size < min_size
+        chunks.cosine_distance = np.array(
+            [distances[index] for index in chunks.chunk_index.tolist()],
+            dtype=np.float64,
         )
-        combined_sentences, chunks = self._handle_interior_chunks(
-            combined_sentences=combined_sentences, chunks=chunks, min_size=min_size
+
+        spans = ChunkSpans(chunks=chunks)
+        self._handle_boundary_chunks(spans=spans, min_size=min_size)
+        self._handle_interior_chunks(spans=spans, min_size=min_size)
+
+        nodes = np.array(spans.nodes(), dtype=np.int64)
+        starts = np.array(spans.start, dtype=np.int64)[nodes]
+
+        sorter = np.argsort(chunks.chunk_index, kind="stable")
+        positions = sorter[
+            np.searchsorted(
+                chunks.chunk_index, combined_sentences.chunk_index, sorter=sorter
+            )
+        ]
+        owners = nodes[np.searchsorted(starts, positions, side="right") - 1]
+        combined_sentences.chunk_index = chunks.chunk_index[owners]
+
+        chunks = Chunks(
+            chunk_index=chunks.chunk_index[nodes],
+            size=np.array(spans.size, dtype=chunks.size.dtype)[nodes],
+            cosine_distance=np.array(spans.cosine_distance, dtype=np.float64)[nodes],
+            is_too_big=chunks.is_too_big[nodes],
+            is_too_small=np.array(spans.is_too_small, dtype=bool)[nodes],
         )
+
         combined_sentences, chunks = reset_chunk_index(
             combined_sentences=combined_sentences, chunks=chunks
         )
@@ -1,9 +1,10 @@
-from app.models import Sentence, CombinedSentences
-from sklearn.metrics.pairwise import cosine_distances
+from app.models import CombinedSentences
+from operations.embeddings import EmbeddingScheduler
 
-from sentence_transformers import SentenceTransformer
 from typing import List
 
+import numpy as np
+
 import re
 
 
@@ -16,115 +17,131 @@ class PrepareForSemanticChunking:
         overlap (int): The number of overlapping sentences to consider.
     """
 
-    def __init__(self, embedder_dir: str) -> None:
+    def __init__(
+        self, embedder_dir: str, scheduler: EmbeddingScheduler | None = None
+    ) -> None:
         """
         Args:
             embedder_dir (str): The directory path where the embedding model is located.
-
+            scheduler (EmbeddingScheduler | None): The scheduler used to batch embeddings.
+                If None, a new scheduler is created for the embedder.
         """
         self.embedder_dir = embedder_dir
+        self.scheduler = scheduler or EmbeddingScheduler(embedder_dir=embedder_dir)
         self.pattern: re.Pattern[str] = r"(?<=[.!?])\s+"
         self.overlap: int = 1
 
-    def _preprocess_data(self, text: str) -> List[Sentence]:
+    def _preprocess_data(self, text: str) -> List[str]:
         """
-        Splits the text into sentences based on punctation marks and converts them into 'Sentence' objects.
+        Splits the text into sentences based on punctation marks.
 
         Args:
             text (str): Chunk of text already splitted by markdown splitter.
 
         Returns:
-            List[Sentence]: A list of 'Sentence' objects.
+            List[str]: A list of sentences.
         """
         text = text.replace("\n", " ")
-        splited_sentences = re.split(pattern=self.pattern, string=text)
-        sentences = [Sentence(sen) for sen in splited_sentences]
-        return sentences
+        return re.split(pattern=self.pattern, string=text)
 
-    def _connect_sentences(self, sentences: List[Sentence]) -> List[CombinedSentences]:
+    def _connect_sentences(self, sentences: List[str]) -> CombinedSentences:
         """
         Connects sentences based on overlapping content.
 
         Args:
-            sentences (List[Sentence]): A list of Sentence objects.
+            sentences (List[str]): A list of sentences.
         Returns:
-            List[CombinedSentences]: A list of CombinedSentences objects.
+            CombinedSentences: The sentences stored in a single text buffer,
+                combined with 'overlap' neighbours on each side.
         """
-        combined_sentences = []
-
-        for i in range(len(sentences)):
-            combined_sentence_text = ""
-
-            for j in range(i - self.overlap, i):
-                if j >= 0:
-                    combined_sentence_text += f"{sentences[j].sentence} "
-
-            combined_sentence_text += sentences[i].sentence
-
-            for j in range(i + 1, i + 1 + self.overlap):
-                if j < len(sentences):
-                    combined_sentence_text += f" {sentences[j].sentence}"
-
-            combined_sentences.append(
-                CombinedSentences(
-                    sentence=sentences[i].sentence,
-                    combined_sentence=combined_sentence_text,
-                    chunk_index=sentences[i].chunk_index,
-                )
-            )
-
-        return combined_sentences
+        return CombinedSentences.from_sentences(
+            sentences=sentences, overlap=self.overlap
+        )
 
     def _apply_embeddings(
         self,
-        combined_sentences: List[CombinedSentences],
-    ) -> List[CombinedSentences]:
+        combined_sentences: CombinedSentences,
+        embeddings: np.ndarray,
+    ) -> CombinedSentences:
         """
-        Applies embedding on the text of combined sentences.
+        Normalizes already computed embeddings and applies them on the combined sentences.
 
         Args:
-            combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects.
+            combined_sentences (CombinedSentences): The 'CombinedSentences' of a text chunk.
+            embeddings (np.ndarray): A matrix of embeddings of the combined sentences texts.
 
         Returns:
-            List[CombinedSentences]: A list of 'CombinedSentences' objects with
-                embeddings src.applied to each combined sentence.
+            CombinedSentences: The 'CombinedSentences' with a matrix of L2-normalized
+                float32 embeddings of the combined sentences.
         """
-        embedder = SentenceTransformer(self.embedder_dir)
-
-        for i in range(len(combined_sentences)):
-            combined_sentences[i].embeddings = embedder.encode(
-                combined_sentences[i].combined_sentence
-            ).tolist()
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        combined_sentences.embeddings = embeddings / norms
 
         return combined_sentences
 
     def _compare_vectors(
         self,
-        combined_sentences: List[CombinedSentences],
-    ) -> List[CombinedSentences]:
+        combined_sentences: CombinedSentences,
+    ) -> CombinedSentences:
         """
         Compares the cosine distance between consecutive sentence embeddings.
+        All distances are computed at once from the normalized embedding matrix.
 
         Args:
-            combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects.
+            combined_sentences (CombinedSentences): The 'CombinedSentences' of a text chunk.
 
         Returns:
-            List[CombinedSentences]: A list of 'CombinedSentences' objects with cosine distances
+            CombinedSentences: The 'CombinedSentences' with cosine distances
                 computed between each pair of consecutive sentences.
         """
-        for i in range(len(combined_sentences) - 1):
-            current_embedding = combined_sentences[i].embeddings
-            next_embedding = combined_sentences[i + 1].embeddings
-            distance = cosine_distances([current_embedding], [next_embedding])[0][0]
-
-            combined_sentences[i].cosine_distance = distance
+        embeddings = combined_sentences.embeddings
+        similarities = np.einsum("ij,ij->i", embeddings[:-1], embeddings[1:])
+        distances = np.clip(1 - similarities, 0, 2)
 
-        combined_sentences[-1].cosine_distance = distance
+        combined_sentences.cosine_distance[:-1] = distances
+        combined_sentences.cosine_distance[-1] = distances[-1]
         return combined_sentences
 
-    def prepare_for_recursive_semantic_chunking(
-        self, text: str
-    ) -> List[CombinedSentences]:
+    def split_into_combined_sentences(self, text: str) -> CombinedSentences:
+        """
+        Splits the chunk of text into sentences and connects them with overlap.
+        Texts with at most three sentences are kept as a single sentence.
+
+        Args:
+            text (str): Chunk of text already splitted by markdown splitter.
+
+        Returns:
+            CombinedSentences: The 'CombinedSentences' of the text, without embeddings.
+        """
+        sentences = self._preprocess_data(text=text)
+        if len(sentences) <= 3:
+            return self._connect_sentences(sentences=[" ".join(sentences)])
+
+        return self._connect_sentences(sentences=sentences)
+
+    def apply_distances(
+        self, combined_sentences: CombinedSentences, embeddings: np.ndarray
+    ) -> CombinedSentences:
+        """
+        Applies embeddings on the combined sentences and calculates cosine distances
+        between consecutive embedding vectors.
+
+        Args:
+            combined_sentences (CombinedSentences): The 'CombinedSentences' of a text chunk.
+            embeddings (np.ndarray): A matrix of embeddings of the combined sentences texts.
+
+        Returns:
+            CombinedSentences: The 'CombinedSentences' with cosine distances
+                computed between each pair of consecutive sentences.
+        """
+        combined_sentences = self._apply_embeddings(
+            combined_sentences=combined_sentences, embeddings=embeddings
+        )
+        return self._compare_vectors(combined_sentences=combined_sentences)
+
+    def prepare_for_recursive_semantic_chunking(self, text: str) -> CombinedSentences:
         """
         Prepares the document for recursive semantic chunking by:
         1. Splitting the chunk of text into sentences.
@@ -136,23 +153,14 @@ class PrepareForSemanticChunking:
             text (str): Chunk of text already splitted by markdown splitter.
 
         Returns:
-            List[CombinedSentences]: A list of 'CombinedSentences' objects with cosine distances
+            CombinedSentences: The 'CombinedSentences' with cosine distances
                 computed between each pair of consecutive sentences.
         """
-        sentences = self._preprocess_data(text=text)
-        if len(sentences) <= 3:
-            return [
-                CombinedSentences(
-                    combined_sentence=" ".join(sen.sentence for sen in sentences)
-                )
-            ]
+        combined_sentences = self.split_into_combined_sentences(text=text)
+        if len(combined_sentences) <= 3:
+            return combined_sentences
 
-        combined_sentences = self._connect_sentences(sentences=sentences)
-        combined_sentences = self._apply_embeddings(
-            combined_sentences=combined_sentences
-        )
-        combined_sentences = self._compare_vectors(
-            combined_sentences=combined_sentences
+        embeddings = self.scheduler.encode(combined_sentences.combined_sentences)
+        return self.apply_distances(
+            combined_sentences=combined_sentences, embeddings=embeddings
         )
-
-        return combined_sentences
@@ -1,7 +1,4 @@
-from upload_pdfs.handle_data.text.chunking.recursive_semantic.operations.utils import (
-    reset_chunk_index,
-)
-from app.models import CombinedSentences, Chunk
+from app.models import CombinedSentences, Chunks
 
 from typing import List, Tuple
 
@@ -9,165 +6,157 @@ import numpy as np
 
 
 class ReduceChunkSize:
-    """Class for reducing chunks sizes"""
+    """
+    Class for reducing chunks sizes
+
+    Attributes:
+        max_threshold_steps (int): The maximum number of times the percentile threshold
+            is lowered, before the split falls back to the largest cosine distance.
+    """
+
+    max_threshold_steps: int = 1000
 
     def _calculate_percentile(
-        self, combined_sentences: List[CombinedSentences], percentage: int = 98
+        self, distances: np.ndarray, percentage: int = 98
     ) -> float:
         """
         Calculates the specified percentile of cosine distances
 
         Args:
-            combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects.
+            distances (np.ndarray): The cosine distances of the sentences.
             percentage (int): The percentile to calculate.
 
         Returns:
             float: The q-th percentile of the cosine distances.
         """
-        if not combined_sentences:
+        if not len(distances):
             return None
 
-        distances = [sen.cosine_distance for sen in combined_sentences]
-
         threshold = np.percentile(distances, percentage)
         return threshold
 
     def _sentences_above_threshold(
-        self, combined_sentences: List[CombinedSentences], threshold: float
-    ) -> List[CombinedSentences]:
+        self, distances: np.ndarray, threshold: float
+    ) -> np.ndarray:
         """
-        Marks sentences with a cosine distance above the given threshold as 'is_above_percentile'.
+        Marks sentences with a cosine distance above the given threshold. The last sentence
+        is never marked. If no sentence reaches the threshold, it is lowered by 1% until
+        the largest cosine distance crosses it.
 
         Args:
-            combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects.
+            distances (np.ndarray): The cosine distances of the sentences of a single chunk.
             threshold (float): The cosine distance threshold for marking sentences.
 
         Returns:
-            List[CombinedSentences]: A list of 'CombinedSentences' objects with 'is_above_percentile' marked.
+            np.ndarray: A boolean array marking sentences above the threshold.
         """
-        check_list = []
-
-        for i, sentence in enumerate(combined_sentences):
-            sentence.is_above_percentile = (
-                True
-                if sentence.cosine_distance >= threshold
-                and i < len(combined_sentences) - 1
-                else False
-            )
-            check_list.append(sentence.is_above_percentile)
+        above_threshold = np.zeros(len(distances), dtype=bool)
+        if len(distances) < 2:
+            return above_threshold
 
-        if True not in check_list:
-            return self._sentences_above_threshold(
-                combined_sentences=combined_sentences, threshold=threshold * 0.99
-            )
+        candidates = distances[:-1]
+        max_distance = candidates.max()
+
+        steps = 0
+        while threshold > max_distance and steps < self.max_threshold_steps:
+            threshold = threshold * 0.99
+            steps += 1
 
-        return combined_sentences
+        if threshold > max_distance:
+            threshold = max_distance
 
-    def _assign_chunks(
+        above_threshold[:-1] = candidates >= threshold
+        return above_threshold
+
+    def _split_ranges(
         self,
-        combined_sentences: List[CombinedSentences],
+        distances: np.ndarray,
+        cumulative_sizes: np.ndarray,
+        percentage: int,
         max_size: int,
-        chunk_index: int = None,
-    ) -> Tuple[List[CombinedSentences], List[Chunk]]:
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Assign chunk indices to the sentences, and creates chunks based on the 'is_above_percentile' condition.
+        Recursively splits the sentences at high cosine distance points, until every range
+        of sentences fits in the maximum size or consists of a single sentence.
 
         Args:
-            combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects.
+            distances (np.ndarray): The cosine distances of the sentences.
+            cumulative_sizes (np.ndarray): The cumulative lengths of the sentences, starting with 0.
+            percentage (int): The percentile to calculate.
             max_size (int): The maximum size for a chunk.
-            chunk_index (int): The starting index for chunks.
 
         Returns:
-            Tuple[List[CombinedSentences], List[Chunk]]: The updatet list of 'CombinedSentences' with
-                assigned chunk indices, along with a list of 'Chunk' objects representing the created chunks.
+            Tuple[np.ndarray, np.ndarray]: The sorted start positions of the final ranges,
+                along with the marks of sentences after which a range was split.
         """
-        chunk_size = 0
-        chunks = []
-
-        if not chunk_index:
-            chunk_index = 0
-
-        for i, sen in enumerate(combined_sentences):
-            combined_sentences[i].chunk_index = chunk_index
-            chunk_size += len(sen.sentence)
-
-            if sen.is_above_percentile or i == len(combined_sentences) - 1:
-                chunks.append(
-                    Chunk(
-                        chunk_index=chunk_index,
-                        size=chunk_size,
-                        is_too_big=True if chunk_size > max_size else False,
-                    )
-                )
-                chunk_size = 0
-                chunk_index += 1
+        above_threshold = np.zeros(len(distances), dtype=bool)
+        starts: List[int] = []
+        ranges = [(0, len(distances))]
 
-        return combined_sentences, chunks
+        while ranges:
+            start, stop = ranges.pop()
+            range_distances = distances[start:stop]
+
+            threshold = self._calculate_percentile(
+                distances=range_distances, percentage=percentage
+            )
+            marks = self._sentences_above_threshold(
+                distances=range_distances, threshold=threshold
+            )
+            above_threshold[start:stop] = marks
+
+            edges = np.concatenate(([start], start + np.flatnonzero(marks) + 1, [stop]))
+            range_sizes = cumulative_sizes[edges[1:]] - cumulative_sizes[edges[:-1]]
+            too_big = (range_sizes > max_size) & (np.diff(edges) > 1)
+
+            starts.extend(edges[:-1][~too_big].tolist())
+            ranges.extend(
+                zip(edges[:-1][too_big].tolist(), edges[1:][too_big].tolist())
+            )
+
+        return np.sort(np.array(starts, dtype=np.int64)), above_threshold
 
     def reduce_size(
         self,
-        combined_sentences=List[CombinedSentences],
+        combined_sentences: CombinedSentences,
         percentage: int = 98,
         max_size: int = 1000,
-    ) -> Tuple[List[CombinedSentences], List[Chunk]]:
+    ) -> Tuple[CombinedSentences, Chunks]:
         """
         Splits the chunks if their size is too large.
 
+        The sentences are first split at the percentile of all cosine distances, and
+        every resulting range that is still too large is split again at the percentile
+        of its own cosine distances. Ranges are handled as contiguous slices of the
+        sentence arrays, so no sentence is moved or relabelled more than once per split.
+
         Args:
-            combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects.
+            combined_sentences (CombinedSentences): The 'CombinedSentences' of a text chunk.
             percentage (int): The percentile to calculate.
             max_size (int): The maximum size for a chunk.
 
         Returns:
-            Tuple[List[CombinedSentences], List[Chunk]]: The updatet list of 'CombinedSentences' with
-                updated chunks indices, along with un updated list of 'Chunk' objects containing the new chunks.
+            Tuple[CombinedSentences, Chunks]: The updatet 'CombinedSentences' with
+                updated chunks indices, along with the 'Chunks' containing the new chunks.
         """
-        threshold = self._calculate_percentile(
-            combined_sentences=combined_sentences, percentage=percentage
-        )
-        combined_sentences = self._sentences_above_threshold(
-            combined_sentences=combined_sentences, threshold=threshold
-        )
-        combined_sentences, chunks = self._assign_chunks(
-            combined_sentences=combined_sentences, max_size=max_size
+        cumulative_sizes = np.concatenate(([0], np.cumsum(combined_sentences.sizes)))
+
+        starts, combined_sentences.above_threshold = self._split_ranges(
+            distances=combined_sentences.cosine_distance,
+            cumulative_sizes=cumulative_sizes,
+            percentage=percentage,
+            max_size=max_size,
         )
 
-        sub_sentences = []
-        i = 0
-        while i < len(chunks):
-            if chunks[i].is_too_big:
-                sub_sentences = []
-                sub_indexes = []
-
-                for j in range(len(combined_sentences)):
-                    if combined_sentences[j].chunk_index == chunks[i].chunk_index:
-                        sub_sentences.append(combined_sentences[j])
-                        sub_indexes.append(j)
-
-                threshold = self._calculate_percentile(
-                    combined_sentences=sub_sentences, percentage=percentage
-                )
-                sub_sentences = self._sentences_above_threshold(
-                    combined_sentences=sub_sentences, threshold=threshold
-                )
-                last_index = np.max([ch.chunk_index for ch in chunks])
-                sub_sentences, sub_chunks = self._assign_chunks(
-                    combined_sentences=sub_sentences,
-                    max_size=max_size,
-                    chunk_index=last_index + 1,
-                )
-                chunks.pop(i)
-                chunks.extend(sub_chunks)
-
-                for x in range(len(sub_indexes)):
-                    combined_sentences.pop(sub_indexes[x])
-                    combined_sentences.insert(sub_indexes[x], sub_sentences[x])
-
-            else:
-                i += 1
-
-        combined_sentences, chunks = reset_chunk_index(
-            combined_sentences=combined_sentences, chunks=chunks
+        stops = np.append(starts[1:], len(combined_sentences))
+        chunk_sizes = cumulative_sizes[stops] - cumulative_sizes[starts]
+        chunk_indexes = np.arange(1, len(starts) + 1, dtype=np.int64)
+
+        combined_sentences.chunk_index = np.repeat(chunk_indexes, stops - starts)
+        chunks = Chunks(
+            chunk_index=chunk_indexes,
+            size=chunk_sizes,
+            is_too_big=chunk_sizes > max_size,
         )
 
         return combined_sentences, chunks
@@ -1,6 +1,6 @@
-from app.models import CombinedSentences, Chunk
+from app.models import CombinedSentences, Chunks
+from operations.embeddings import EmbeddingScheduler
 
-from sentence_transformers import SentenceTransformer
 from typing import List, Tuple
 
 import matplotlib.pyplot as plt
@@ -8,77 +8,70 @@ import numpy as np
 
 
 def reset_chunk_index(
-    combined_sentences: List[CombinedSentences], chunks: List[Chunk] = None
-) -> List[CombinedSentences] | Tuple[List[CombinedSentences], List[Chunk]]:
+    combined_sentences: CombinedSentences, chunks: Chunks = None
+) -> CombinedSentences | Tuple[CombinedSentences, Chunks]:
     """
     Reassigns chunk indexes sequentially, without changing the sentence order.
 
     Args:
-        combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects.
-        chunks (List[Chunk]): A list of 'Chunk' objects.
+        combined_sentences (CombinedSentences): The 'CombinedSentences' of a text chunk.
+        chunks (Chunks): The 'Chunks' of the text chunk.
 
     Returns:
-        List[CombinedSentences]: The updated list with chunk indices reassigned in a sequential order.
-        Tuple[List[CombinedSentences], List[Chunk]]: If 'chunks' is provided, returns the updated sentence
-        list along with the updated chunk list.
+        CombinedSentences: The updated 'CombinedSentences' with chunk indices reassigned in a sequential order.
+        Tuple[CombinedSentences, Chunks]: If 'chunks' is provided, returns the updated sentences
+        along with the updated chunks.
     """
-    equivalents = {}
-    new_chunk_index = 1
+    old_indexes, first_positions, inverse = np.unique(
+        combined_sentences.chunk_index, return_index=True, return_inverse=True
+    )
+    equivalents = np.empty(len(old_indexes), dtype=np.int64)
+    equivalents[np.argsort(first_positions)] = np.arange(1, len(old_indexes) + 1)
 
-    for sen in combined_sentences:
-        old_index = sen.chunk_index
-        if old_index not in equivalents:
-            equivalents[old_index] = new_chunk_index
-            new_chunk_index += 1
-        sen.chunk_index = equivalents[old_index]
+    combined_sentences.chunk_index = equivalents[inverse.reshape(-1)]
 
-    if chunks:
-        for chunk in chunks:
-            chunk.chunk_index = equivalents[chunk.chunk_index]
-
-        chunks.sort(key=lambda chunk: chunk.chunk_index)
+    if chunks is not None:
+        chunks.chunk_index = equivalents[
+            np.searchsorted(old_indexes, chunks.chunk_index)
+        ]
+        chunks = chunks.take(np.argsort(chunks.chunk_index, kind="stable"))
 
         return combined_sentences, chunks
 
     return combined_sentences
 
 
-def extract_chunks(combined_sentences: List[CombinedSentences]) -> List[str]:
+def extract_chunks(combined_sentences: CombinedSentences) -> List[str]:
     """
-    Extracts sentences from a list of 'CombinedSentences' objects and groups them into chunks
+    Extracts sentences from the 'CombinedSentences' and groups them into chunks
     based on their chunk index.
 
     Args:
-        combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects.
+        combined_sentences (CombinedSentences): The 'CombinedSentences' of a text chunk.
 
     Returns:
         List[str]: A list of chunks, where each chunk is a string of concatenated sentences
         sharing the same chunk index.
     """
-    extracted_chunks = []
-    chunk = ""
-    current_chunk = combined_sentences[0].chunk_index
-
-    if not current_chunk:
-        return [sen.combined_sentence for sen in combined_sentences]
+    chunk_index = combined_sentences.chunk_index
 
-    for i in range(len(combined_sentences)):
-        if current_chunk != combined_sentences[i].chunk_index:
-            if len(chunk) > 0:
-                extracted_chunks.append(chunk.strip())
-            chunk = ""
+    if not chunk_index[0]:
+        return combined_sentences.combined_sentences
 
-        chunk += " " + combined_sentences[i].sentence
-        current_chunk = combined_sentences[i].chunk_index
+    chunk_starts = np.flatnonzero(
+        np.concatenate(([True], chunk_index[1:] != chunk_index[:-1]))
+    )
+    chunk_ends = np.concatenate((chunk_starts[1:], [len(chunk_index)])) - 1
 
-    if len(chunk) > 0:
-        extracted_chunks.append(chunk.strip())
+    text = combined_sentences.text
+    starts = combined_sentences.starts[chunk_starts]
+    ends = combined_sentences.ends[chunk_ends]
 
-    return extracted_chunks
+    return [text[start:end].strip() for start, end in zip(starts, ends)]
 
 
 def visualize_chunks(
-    combined_sentences: List[CombinedSentences],
+    combined_sentences: CombinedSentences,
     save_path: str,
     percentile: float = None,
 ) -> None:
@@ -86,15 +79,14 @@ def visualize_chunks(
     Visualizes the cosine distance between consecutive sentences and highlights chunks areas.
 
     Args:
-        combined_sentences (List[CombinedSentences]): A list of 'CombinedSentences' objects containing
+        combined_sentences (CombinedSentences): The 'CombinedSentences' containing
             'cosine_distance' values and chunk identifiers.
         save_path (str): The file path to save the generated plot.
         percentile (float): A cosine distance percentile to display as a horizontal red line.
     """
     x_array = range(1, len(combined_sentences) + 1)
-    distances = [
-        combined_sentences[i].cosine_distance for i in range(len(combined_sentences))
-    ]
+    distances = combined_sentences.cosine_distance
+    chunk_index = combined_sentences.chunk_index
     max_y = np.max(distances)
 
     plt.plot(x_array, distances, color="blue", label="Cosine Distances")
@@ -104,14 +96,11 @@ def visualize_chunks(
     colors = ["blue", "green", "red", "pink", "yellow", "brown", "purple"]
 
     start_index = 0
-    current_chunk = combined_sentences[0].chunk_index
+    current_chunk = chunk_index[0]
     chunk_count = 0
 
     for x in range(len(combined_sentences)):
-        if (
-            x == len(combined_sentences) - 1
-            or combined_sentences[x + 1].chunk_index != current_chunk
-        ):
+        if x == len(combined_sentences) - 1 or chunk_index[x + 1] != current_chunk:
 
             plt.axvspan(
                 start_index,
@@ -127,7 +116,7 @@ def visualize_chunks(
                 rotation="vertical",
             )
             if x < len(combined_sentences) - 1:
-                current_chunk = combined_sentences[x + 1].chunk_index
+                current_chunk = chunk_index[x + 1]
 
             start_index = x + 1
             chunk_count += 1
@@ -142,21 +131,22 @@ def visualize_chunks(
     plt.close()
 
 
-def sentences_embedding(sentences: List[str], embedder_dir: str) -> List[List[float]]:
+def sentences_embedding(
+    sentences: List[str],
+    embedder_dir: str,
+    scheduler: EmbeddingScheduler | None = None,
+) -> List[List[float]]:
     """
     Generates embeddings for a list of strings using SentenceTransformer model.
 
     Args:
         sentences (List[str]): A list of strings to embed.
         embedder_dir (str): The directory path where the embedding model is located.
+        scheduler (EmbeddingScheduler | None): The scheduler used to batch embeddings.
+            If None, a new scheduler is created for the embedder.
 
     Returns:
         List[List[float]]: A list of embeddings, where each embedding is a list of floats.
     """
-    embedder = SentenceTransformer(embedder_dir)
-    embeddings = []
-
-    for sentence in sentences:
-        embeddings.append(embedder.encode(sentence).tolist())
-
-    return embeddings
+    scheduler = scheduler or EmbeddingScheduler(embedder_dir=embedder_dir)
+    return scheduler.encode(sentences).tolist()
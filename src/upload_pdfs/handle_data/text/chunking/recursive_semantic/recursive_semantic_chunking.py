@@ -1,6 +1,5 @@
 from upload_pdfs.handle_data.text.chunking.recursive_semantic.operations.utils import (
     extract_chunks,
-    sentences_embedding,
 )
 
 from upload_pdfs.handle_data.text.chunking.recursive_semantic.operations import (
@@ -8,8 +7,79 @@ from upload_pdfs.handle_data.text.chunking.recursive_semantic.operations import
     ReduceChunkSize,
     EnhanceChunkSize,
 )
+from operations.embeddings import EmbeddingScheduler
 
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
+
+
+def split_into_semantic_chunks(
+    chunks_before_processing: Iterable[str],
+    scheduler: EmbeddingScheduler,
+    percentage: int = 98,
+    min_size: int = 300,
+    max_size: int = 1000,
+) -> List[str]:
+    """
+    Performs recursive semantic chunking on a list of already preprocessed chunks,
+    without embedding the resulting chunks.
+
+    The sentence windows of all chunks are embedded together through the scheduler,
+    instead of one chunk after another. The chunks may be produced lazily, full
+    batches are embedded as soon as they are collected.
+
+    Args:
+        chunks_before_processing (Iterable[str]): The chunks for further processing.
+        scheduler (EmbeddingScheduler): The scheduler used to batch embeddings.
+        percentage (int): The percentile used for chunk size reduction.
+        min_size (int): The minimum allowable size for a chunk.
+        max_size (int): The maximum allowable size for a chunk.
+
+    Returns:
+        List[str]: A list of extracted text chunks.
+    """
+    prepare_for_chunking = PrepareForSemanticChunking(
+        embedder_dir=scheduler.embedder_dir, scheduler=scheduler
+    )
+    reduce_chunk_size = ReduceChunkSize()
+    enhance_chunk_size = EnhanceChunkSize()
+
+    prepared_chunks = []
+    for chunk in chunks_before_processing:
+        combined_sentences = prepare_for_chunking.split_into_combined_sentences(
+            text=chunk
+        )
+        request = None
+        if len(combined_sentences) > 3:
+            request = scheduler.submit(combined_sentences.combined_sentences)
+        prepared_chunks.append((combined_sentences, request))
+
+        if scheduler.pending >= scheduler.batch_size:
+            scheduler.flush()
+
+    scheduler.flush()
+
+    final_chunks: List[str] = []
+    for combined_sentences, request in prepared_chunks:
+        if request is not None:
+            combined_sentences = prepare_for_chunking.apply_distances(
+                combined_sentences=combined_sentences, embeddings=request.result()
+            )
+            combined_sentences, chunks = reduce_chunk_size.reduce_size(
+                combined_sentences=combined_sentences,
+                percentage=percentage,
+                max_size=max_size,
+            )
+
+            combined_sentences, chunks = enhance_chunk_size.enhance_size(
+                combined_sentences=combined_sentences, chunks=chunks, min_size=min_size
+            )
+
+        # if save_path:
+        #     visualize_chunks(combined_sentences=combined_sentences, save_path=save_path)
+
+        final_chunks.extend(extract_chunks(combined_sentences=combined_sentences))
+
+    return final_chunks
 
 
 def recursive_semantic_chunking(
@@ -19,6 +89,7 @@ def recursive_semantic_chunking(
     min_size: int = 300,
     max_size: int = 1000,
     save_path: str | None = "data/graphs/chunks.png",
+    scheduler: EmbeddingScheduler | None = None,
 ) -> Tuple[List[str], List[List[float]]]:
     """
     Performs recursive semantic chunking on a list of already preprocessed chunks.
@@ -41,41 +112,22 @@ def recursive_semantic_chunking(
         max_size (int): The maximum allowable size for a chunk.
         save_path (str | None): Path for the visualization of the chunking process.
             If is None, visualization will not be saved.
+        scheduler (EmbeddingScheduler | None): The scheduler used to batch embeddings.
+            If None, a new scheduler is created for the embedder.
 
     Returns:
         Tuple[List[str], List[List[float]]]: A list of extracted text chunks and
             a list of their cooresponding embeddings.
     """
-    prepare_for_chunking = PrepareForSemanticChunking(embedder_dir=embedder_dir)
-    reduce_chunk_size = ReduceChunkSize()
-    enhance_chunk_size = EnhanceChunkSize()
-
-    final_chunks: List[str] = []
-    final_embeddings: List[List[float]] = []
-    for chunk in chunks_before_processing:
-        combined_sentences = (
-            prepare_for_chunking.prepare_for_recursive_semantic_chunking(text=chunk)
-        )
+    scheduler = scheduler or EmbeddingScheduler(embedder_dir=embedder_dir)
 
-        if len(combined_sentences) > 3:
-            combined_sentences, chunks = reduce_chunk_size.reduce_size(
-                combined_sentences=combined_sentences,
-                percentage=percentage,
-                max_size=max_size,
-            )
-
-            combined_sentences, chunks = enhance_chunk_size.enhance_size(
-                combined_sentences=combined_sentences, chunks=chunks, min_size=min_size
-            )
-
-        # if save_path:
-        #     visualize_chunks(combined_sentences=combined_sentences, save_path=save_path)
-
-        extracted_chunks = extract_chunks(combined_sentences=combined_sentences)
-        embeddings = sentences_embedding(
-            sentences=extracted_chunks, embedder_dir=embedder_dir
-        )
-        final_chunks.extend(extracted_chunks)
-        final_embeddings.extend(embeddings)
+    final_chunks = split_into_semantic_chunks(
+        chunks_before_processing=chunks_before_processing,
+        scheduler=scheduler,
+        percentage=percentage,
+        min_size=min_size,
+        max_size=max_size,
+    )
+    final_embeddings = scheduler.encode(final_chunks).tolist()
 
     return final_chunks, final_embeddings
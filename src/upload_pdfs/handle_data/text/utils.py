@@ -1,6 +1,6 @@
 from typing import List
 
-from sentence_transformers import SentenceTransformer
+from operations.embeddings import EmbeddingScheduler
 
 
 def sentence_embedding(sentences: List[str], embedder_dir: str) -> List[List[float]]:
@@ -14,10 +14,4 @@ def sentence_embedding(sentences: List[str], embedder_dir: str) -> List[List[flo
     Returns:
         List[List[float]]: A list of embeddings, where each embedding is a list of floats.
     """
-    embedder = SentenceTransformer(embedder_dir)
-    embeddings = []
-
-    for sentence in sentences:
-        embeddings.append(embedder.encode(sentence).tolist())
-
-    return embeddings
+    return EmbeddingScheduler(embedder_dir=embedder_dir).encode(sentences).tolist()
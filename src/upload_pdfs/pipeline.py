@@ -0,0 +1,285 @@
+from typing import Any, Callable, Dict, Iterable, List
+
+import threading
+import logging
+import queue
+import time
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class PipelineStage:
+    """
+    A single stage of an 'IngestionPipeline', processing items from its bounded input queue.
+
+    Attributes:
+        name (str): The name of the stage.
+        func (Callable[[Any], Any]): The function applied to every item.
+        workers (int): The number of threads running the stage.
+        discard (Callable[[Any], None] | None): The function releasing the resources
+            of an item dropped before the stage processed it.
+        queue (queue.Queue): The bounded queue of items waiting for the stage.
+        processed (int): The number of items processed by the stage.
+        busy_seconds (float): The total time spent by the workers on processing items.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        workers: int,
+        queue_size: int,
+        discard: Callable[[Any], None] | None = None,
+    ) -> None:
+        """
+        Args:
+            name (str): The name of the stage.
+            func (Callable[[Any], Any]): The function applied to every item.
+            workers (int): The number of threads running the stage.
+            queue_size (int): The maximum number of items waiting for the stage.
+            discard (Callable[[Any], None] | None): The function releasing the resources
+                of an item dropped before the stage processed it.
+        """
+        self.name = name
+        self.func = func
+        self.discard = discard
+        self.workers = max(1, workers)
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self._running = self.workers
+        self._lock = threading.Lock()
+
+    def stats(self, elapsed: float) -> Dict[str, float]:
+        """
+        Returns the statistics of the stage.
+
+        Args:
+            elapsed (float): The number of seconds since the pipeline started.
+
+        Returns:
+            Dict[str, float]: The number of workers, processed items, queue depth,
+                busy time and throughput in items per second.
+        """
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "queue_depth": self.queue.qsize(),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "throughput": self.processed / elapsed if elapsed else 0.0,
+        }
+
+    def drop(self, item: Any) -> None:
+        """
+        Releases the resources of an item, which the stage will never process.
+
+        Args:
+            item (Any): The dropped item.
+        """
+        if self.discard is None or item is _END:
+            return
+
+        try:
+            self.discard(item)
+        except Exception as e:
+            logger.warning(f'Stage "{self.name}" failed to discard an item: {e}')
+
+
+class IngestionPipeline:
+    """
+    Runs items through stages connected by bounded queues. Every stage has its own
+    worker threads, and a full queue blocks the previous stage, so a slow stage
+    slows down the stages before it instead of piling up items in memory.
+
+    If any stage fails, the pipeline stops and the error is raised by 'run'. Items
+    still waiting in the queues are then passed to the 'discard' function of their stage.
+    """
+
+    def __init__(self, queue_size: int = 4) -> None:
+        """
+        Args:
+            queue_size (int): The maximum number of items waiting in front of each stage.
+        """
+        self.queue_size = queue_size
+        self.stages: List[PipelineStage] = []
+        self._started: float | None = None
+        self._finished: float | None = None
+        self._error: BaseException | None = None
+        self._abort = threading.Event()
+
+    def add_stage(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        workers: int = 1,
+        discard: Callable[[Any], None] | None = None,
+    ) -> "IngestionPipeline":
+        """
+        Appends a stage to the pipeline.
+
+        Args:
+            name (str): The name of the stage.
+            func (Callable[[Any], Any]): The function applied to every item.
+                The result is passed to the next stage.
+            workers (int): The number of threads running the stage.
+            discard (Callable[[Any], None] | None): The function releasing the resources
+                of an item dropped before the stage processed it, e.g. a temporary file.
+
+        Returns:
+            IngestionPipeline: The pipeline itself, to chain the calls.
+        """
+        self.stages.append(
+            PipelineStage(
+                name=name,
+                func=func,
+                workers=workers,
+                queue_size=self.queue_size,
+                discard=discard,
+            )
+        )
+        return self
+
+    def _put(self, stage_queue: queue.Queue, item: Any) -> bool:
+        """
+        Puts the item in the queue, waiting for free space until the pipeline is aborted.
+
+        Returns:
+            bool: Whether the item was put in the queue.
+        """
+        while not self._abort.is_set():
+            try:
+                stage_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, stage_queue: queue.Queue) -> Any:
+        """
+        Gets the next item from the queue, or the end marker if the pipeline is aborted.
+        """
+        while not self._abort.is_set():
+            try:
+                return stage_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _fail(self, stage: PipelineStage, error: BaseException) -> None:
+        """
+        Records the first error and stops all stages.
+        """
+        logger.error(f'Stage "{stage.name}" failed: {type(error).__name__}: {error}')
+        if self._error is None:
+            self._error = error
+        self._abort.set()
+
+    def _run_worker(self, position: int) -> None:
+        """
+        Processes items of the stage at the given position until its input ends.
+
+        Args:
+            position (int): The position of the stage in the pipeline.
+        """
+        stage = self.stages[position]
+        next_stage = (
+            self.stages[position + 1] if position + 1 < len(self.stages) else None
+        )
+
+        while True:
+            item = self._get(stage.queue)
+            if item is _END:
+                break
+
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                self._fail(stage, e)
+                break
+
+            with stage._lock:
+                stage.processed += 1
+                stage.busy_seconds += time.perf_counter() - start
+
+            if next_stage is not None and not self._put(next_stage.queue, result):
+                next_stage.drop(result)
+                break
+
+        with stage._lock:
+            stage._running -= 1
+            last_worker = stage._running == 0
+
+        if last_worker and next_stage is not None:
+            for _ in range(next_stage.workers):
+                self._put(next_stage.queue, _END)
+
+    def _feed(self, items: Iterable[Any]) -> None:
+        """
+        Puts the items into the first stage and marks the end of the input.
+        """
+        first_stage = self.stages[0]
+        try:
+            for item in items:
+                if not self._put(first_stage.queue, item):
+                    first_stage.drop(item)
+                    return
+        except Exception as e:
+            self._fail(first_stage, e)
+            return
+
+        for _ in range(first_stage.workers):
+            self._put(first_stage.queue, _END)
+
+    def run(self, items: Iterable[Any]) -> None:
+        """
+        Runs all items through the pipeline and waits until every stage is done.
+
+        Args:
+            items (Iterable[Any]): The items passed to the first stage.
+        """
+        self._started = time.perf_counter()
+        self._finished = None
+
+        threads = [threading.Thread(target=self._feed, args=(items,), daemon=True)]
+        for position, stage in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(
+                    target=self._run_worker,
+                    args=(position,),
+                    name=f"{stage.name}-{worker}",
+                    daemon=True,
+                )
+                for worker in range(stage.workers)
+            )
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for stage in self.stages:
+            while not stage.queue.empty():
+                stage.drop(stage.queue.get_nowait())
+
+        self._finished = time.perf_counter()
+        logger.info(f"Ingestion pipeline finished: {self.stats()}")
+
+        if self._error is not None:
+            raise self._error
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the statistics of every stage, also while the pipeline is running.
+
+        Returns:
+            Dict[str, Dict[str, float]]: The statistics keyed by the stage name.
+        """
+        if self._started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished or time.perf_counter()) - self._started
+
+        return {stage.name: stage.stats(elapsed=elapsed) for stage in self.stages}
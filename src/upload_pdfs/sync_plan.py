@@ -0,0 +1,77 @@
+from azure.storage.blob import BlobProperties
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Set, Tuple
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncPlan:
+    """
+    Represents the changes between the PDFs in Azure Blob Storage and the ingested ones.
+
+    Files are identified by the MD5 hash of their content, so a file with changed
+    content is both removed and added, and a file with the same content under
+    a new name is only renamed.
+
+    Attributes:
+        added (List[Tuple[BlobProperties, str]]): The blobs to ingest with their MD5 hashes.
+        removed (Set[str]): The MD5 hashes of the ingested files missing in the storage.
+        renamed (Dict[str, str]): The new names of the ingested files keyed by their MD5 hashes.
+        kept (Set[str]): The MD5 hashes of all files in the storage.
+    """
+
+    added: List[Tuple[BlobProperties, str]] = field(default_factory=list)
+    removed: Set[str] = field(default_factory=set)
+    renamed: Dict[str, str] = field(default_factory=dict)
+    kept: Set[str] = field(default_factory=set)
+
+    def log(self) -> None:
+        """
+        Logs the summary of the plan and the names of the changed files.
+        """
+        unchanged = len(self.kept) - len(self.added) - len(self.renamed)
+        logger.info(
+            f"Sync plan: {len(self.added)} added, {len(self.removed)} removed, "
+            f"{len(self.renamed)} renamed, {unchanged} unchanged."
+        )
+        for blob, _ in self.added:
+            logger.info(f'Sync plan: add "{blob.name}".')
+        for content_md5 in self.removed:
+            logger.info(f"Sync plan: remove {content_md5}.")
+        for content_md5, name in self.renamed.items():
+            logger.info(f'Sync plan: rename {content_md5} to "{name}".')
+
+
+def create_sync_plan(
+    blobs: Iterable[BlobProperties], known_files: Dict[str, str]
+) -> SyncPlan:
+    """
+    Diffs the blob listing against the ingested files in a single pass.
+    Blobs with the same content as an earlier blob are skipped.
+
+    Args:
+        blobs (Iterable[BlobProperties]): The blobs in the storage.
+        known_files (Dict[str, str]): The names of the ingested files keyed by their MD5 hashes.
+
+    Returns:
+        SyncPlan: The changes to apply.
+    """
+    plan = SyncPlan()
+
+    for blob in blobs:
+        content_md5 = blob.content_settings.content_md5.hex()
+        if content_md5 in plan.kept:
+            continue
+        plan.kept.add(content_md5)
+
+        if content_md5 not in known_files:
+            plan.added.append((blob, content_md5))
+        elif known_files[content_md5] != blob.name:
+            plan.renamed[content_md5] = blob.name
+
+    plan.removed = known_files.keys() - plan.kept
+    return plan
@@ -1,3 +1,18 @@
 from .uploader import PdfLoader
+from .pool import (
+    PdfLoaderPool,
+    pdf_loader_pool,
+    warm_up_pdf_loaders,
+    split_cpu_budget,
+)
+from .sharding import load_document, merge_shards
 
-__all__ = ["PdfLoader"]
+__all__ = [
+    "PdfLoader",
+    "PdfLoaderPool",
+    "pdf_loader_pool",
+    "warm_up_pdf_loaders",
+    "split_cpu_budget",
+    "load_document",
+    "merge_shards",
+]
@@ -0,0 +1,134 @@
+from upload_pdfs.uploader.uploader import PdfLoader
+from config import base_settings
+
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+
+import threading
+import logging
+import queue
+import os
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_THREADS_PER_WORKER = 4
+
+
+def split_cpu_budget(workers: int | None = None) -> Tuple[int, int]:
+    """
+    Splits the CPU budget between parallel workers, such as PDF loaders
+    or ingestion processes. Every worker runs 'NUMBER_OF_THREADS' threads if set,
+    otherwise its share of the CPU count. If the number of workers is not set,
+    as many fit in the budget as the threads of a worker allow, assuming
+    four threads per worker when 'NUMBER_OF_THREADS' is not set either.
+
+    Args:
+        workers (int | None): The configured number of workers.
+            If None, the workers are fitted in the CPU budget.
+
+    Returns:
+        Tuple[int, int]: The number of workers, at least one,
+            and the number of threads of each worker.
+    """
+    cpu_count = os.cpu_count() or 1
+    threads = base_settings.rag.NUMBER_OF_THREADS
+
+    if not workers:
+        workers = max(1, cpu_count // (threads or DEFAULT_THREADS_PER_WORKER))
+    if not threads:
+        threads = max(1, cpu_count // workers)
+
+    return workers, threads
+
+
+class PdfLoaderPool:
+    """
+    Thread-safe pool of long-lived PDF loaders.
+
+    Every loader keeps its docling converter with the loaded layout and table structure
+    models, so documents check a warmed loader out instead of building a new one.
+
+    Attributes:
+        size (int): The number of loaders in the pool.
+        threads (int): The number of CPU threads of every loader.
+    """
+
+    def __init__(self, size: int | None = None, threads: int | None = None) -> None:
+        """
+        Args:
+            size (int | None): The number of loaders in the pool.
+                If None, the pool is sized to the CPU budget.
+            threads (int | None): The number of CPU threads of every loader.
+                If None, the CPU budget is split between the loaders.
+        """
+        self.size, default_threads = split_cpu_budget(
+            size or base_settings.rag.PDF_LOADER_POOL_SIZE
+        )
+        self.threads = threads or default_threads
+        self._loaders: queue.Queue[PdfLoader] = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create_loader(self) -> PdfLoader:
+        """
+        Creates a new loader with loaded models, in a slot already reserved in the pool.
+
+        Returns:
+            PdfLoader: The warmed loader.
+        """
+        try:
+            loader = PdfLoader(number_of_threads=self.threads)
+            loader.warm_up()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+        logger.info(f"Created PDF loader {self._created} of {self.size}.")
+        return loader
+
+    def warm_up(self) -> None:
+        """
+        Creates all loaders of the pool up front.
+        """
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            self._loaders.put(self._create_loader())
+
+    @contextmanager
+    def checkout(self) -> Iterator[PdfLoader]:
+        """
+        Checks a loader out of the pool and returns it afterwards. A new loader
+        is created while the pool is not full, otherwise it waits for a free one.
+
+        Yields:
+            PdfLoader: The checked out loader.
+        """
+        try:
+            loader = self._loaders.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            loader = self._create_loader() if create else self._loaders.get()
+
+        try:
+            yield loader
+        finally:
+            self._loaders.put(loader)
+
+
+pdf_loader_pool = PdfLoaderPool()
+
+
+def warm_up_pdf_loaders() -> None:
+    """
+    Creates all loaders of the process-wide pool and loads their models.
+    """
+    pdf_loader_pool.warm_up()
+    logger.info(f"{pdf_loader_pool.size} PDF loaders are warmed up.")
@@ -0,0 +1,235 @@
+from upload_pdfs.uploader.pool import PdfLoaderPool, pdf_loader_pool
+from config import base_settings
+
+from docling_core.types.doc import ContentLayer, DocItem, TableItem
+from docling_core.types.io import DocumentStream
+from docling_core.types import DoclingDocument
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+from io import BytesIO
+
+import pypdfium2
+import tempfile
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def count_pages(pdf: BytesIO | str) -> int:
+    """
+    Counts the pages of a PDF without converting it. A stream is read in place
+    and rewound afterwards.
+
+    Args:
+        pdf (BytesIO | str): The PDF file stored in bytes, or the path to the PDF file.
+
+    Returns:
+        int: The number of pages.
+    """
+    document = pypdfium2.PdfDocument(pdf)
+    try:
+        return len(document)
+    finally:
+        document.close()
+        if not isinstance(pdf, str):
+            pdf.seek(0)
+
+
+def split_page_ranges(page_count: int, shard_pages: int) -> List[Tuple[int, int]]:
+    """
+    Splits the pages of a document into consecutive shards.
+
+    Args:
+        page_count (int): The number of pages of the document.
+        shard_pages (int): The maximum number of pages of a shard.
+
+    Returns:
+        List[Tuple[int, int]]: The first and the last page of each shard, numbered from 1.
+    """
+    return [
+        (start, min(start + shard_pages - 1, page_count))
+        for start in range(1, page_count + 1, shard_pages)
+    ]
+
+
+def _boundary_item(document: DoclingDocument, last: bool) -> DocItem | None:
+    """
+    Returns the first or the last top-level body item of the document,
+    skipping page headers, footers and other furniture.
+
+    Args:
+        document (DoclingDocument): The converted shard.
+        last (bool): Whether the last item is returned instead of the first one.
+
+    Returns:
+        DocItem | None: The boundary item, or None if the body is empty.
+    """
+    children = reversed(document.body.children) if last else document.body.children
+    for child in children:
+        item = child.resolve(document)
+        if item.content_layer == ContentLayer.BODY:
+            return item
+    return None
+
+
+def _merge_continued_table(previous: DoclingDocument, current: DoclingDocument) -> None:
+    """
+    Appends a table continued at the beginning of the current shard to the table at the end
+    of the previous shard. The continuation must have the same number of columns and no
+    caption of its own, and a repeated header row is dropped.
+
+    Args:
+        previous (DoclingDocument): The shard ending with the beginning of the table.
+        current (DoclingDocument): The shard starting with the continuation of the table.
+    """
+    table = _boundary_item(previous, last=True)
+    continuation = _boundary_item(current, last=False)
+
+    if not isinstance(table, TableItem) or not isinstance(continuation, TableItem):
+        return
+    if table.data.num_cols != continuation.data.num_cols or continuation.captions:
+        return
+
+    def header_row(item: TableItem) -> List[str]:
+        return [
+            cell.text
+            for cell in item.data.table_cells
+            if cell.start_row_offset_idx == 0 and cell.column_header
+        ]
+
+    skipped_rows = 0
+    if header_row(continuation) and header_row(continuation) == header_row(table):
+        skipped_rows = 1
+
+    row_offset = table.data.num_rows - skipped_rows
+    for cell in continuation.data.table_cells:
+        if cell.start_row_offset_idx < skipped_rows:
+            continue
+        table.data.table_cells.append(
+            cell.model_copy(
+                update={
+                    "start_row_offset_idx": cell.start_row_offset_idx + row_offset,
+                    "end_row_offset_idx": cell.end_row_offset_idx + row_offset,
+                }
+            )
+        )
+
+    table.data.num_rows += continuation.data.num_rows - skipped_rows
+    table.prov.extend(continuation.prov)
+    current.delete_items(node_items=[continuation])
+
+
+def merge_shards(shards: List[DoclingDocument]) -> DoclingDocument:
+    """
+    Merges converted shards of a document in page order. Tables continued across
+    a shard boundary are joined, and captions keep their position next to the picture
+    or table before them.
+
+    Args:
+        shards (List[DoclingDocument]): The converted shards in page order.
+
+    Returns:
+        DoclingDocument: The merged document.
+    """
+    for previous, current in zip(shards, shards[1:]):
+        _merge_continued_table(previous=previous, current=current)
+
+    document = DoclingDocument.concatenate(shards)
+    document.name = shards[0].name
+    return document
+
+
+def load_document(
+    pdf: BytesIO | str,
+    pdf_name: str = "",
+    loader_pool: PdfLoaderPool = pdf_loader_pool,
+    shard_pages: int | None = base_settings.rag.PDF_SHARD_PAGES,
+) -> DoclingDocument:
+    """
+    Converts a PDF with loaders of the pool. PDFs longer than 'shard_pages' are split into
+    page ranges converted in parallel, one per free loader, and merged back in order.
+
+    Args:
+        pdf (BytesIO | str): The PDF file stored in bytes, or the path to the PDF file.
+        pdf_name (str): The name of the PDF.
+        loader_pool (PdfLoaderPool): The pool of loaders converting the PDF.
+        shard_pages (int | None): The maximum number of pages of a shard.
+            If None, the PDF is converted at once.
+
+    Returns:
+        DoclingDocument: The converted document.
+    """
+    page_count = count_pages(pdf) if shard_pages else 0
+
+    if page_count <= (shard_pages or 0):
+        source = (
+            Path(pdf)
+            if isinstance(pdf, str)
+            else DocumentStream(name=pdf_name, stream=pdf)
+        )
+        with loader_pool.checkout() as loader:
+            return loader.load_pdf(source)
+
+    if isinstance(pdf, str):
+        return _load_shards(
+            path=pdf,
+            pdf_name=pdf_name,
+            page_count=page_count,
+            loader_pool=loader_pool,
+            shard_pages=shard_pages,
+        )
+
+    # The shards are converted concurrently and every converter needs its own stream,
+    # so the PDF is spilled once to a temporary file instead of copied per shard.
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as file:
+        with pdf.getbuffer() as content:
+            file.write(content)
+    try:
+        return _load_shards(
+            path=file.name,
+            pdf_name=pdf_name,
+            page_count=page_count,
+            loader_pool=loader_pool,
+            shard_pages=shard_pages,
+        )
+    finally:
+        os.remove(file.name)
+
+
+def _load_shards(
+    path: str,
+    pdf_name: str,
+    page_count: int,
+    loader_pool: PdfLoaderPool,
+    shard_pages: int,
+) -> DoclingDocument:
+    """
+    Converts the page ranges of a PDF file in parallel, one per free loader,
+    and merges them back in order.
+
+    Args:
+        path (str): The path to the PDF file.
+        pdf_name (str): The name of the PDF.
+        page_count (int): The number of pages of the PDF.
+        loader_pool (PdfLoaderPool): The pool of loaders converting the PDF.
+        shard_pages (int): The maximum number of pages of a shard.
+
+    Returns:
+        DoclingDocument: The converted document.
+    """
+    page_ranges = split_page_ranges(page_count=page_count, shard_pages=shard_pages)
+    logger.info(
+        f'Converting "{pdf_name}" ({page_count} pages) in {len(page_ranges)} shards.'
+    )
+
+    def convert_shard(page_range: Tuple[int, int]) -> DoclingDocument:
+        with loader_pool.checkout() as loader:
+            return loader.load_pdf(Path(path), page_range=page_range)
+
+    with ThreadPoolExecutor(max_workers=loader_pool.size) as executor:
+        shards = list(executor.map(convert_shard, page_ranges))
+
+    return merge_shards(shards)
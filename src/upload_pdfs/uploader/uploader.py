@@ -1,4 +1,6 @@
 import logging
+import sys
+import os
 from config import base_settings
 
 from docling.datamodel.pipeline_options import (
@@ -16,6 +18,9 @@ from docling_core.types import DoclingDocument
 
 from docling_ocr_onnxtr import OnnxtrOcrOptions
 
+from pathlib import Path
+from typing import Tuple
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,7 +28,7 @@ class PdfLoader:
 
     def __init__(
         self,
-        number_of_threads: int = base_settings.rag.NUMBER_OF_THREADS,
+        number_of_threads: int | None = base_settings.rag.NUMBER_OF_THREADS,
         image_resolution_scale: float = base_settings.rag.IMAGE_RESOLUTION_SCALE,
     ) -> None:
         self.textual_labels = {
@@ -40,7 +45,8 @@ class PdfLoader:
         pipeline_options = PdfPipelineOptions(
             do_ocr=True,
             accelerator_options=AcceleratorOptions(
-                num_threads=number_of_threads, device=AcceleratorDevice.CPU
+                num_threads=number_of_threads or os.cpu_count() or 1,
+                device=AcceleratorDevice.CPU,
             ),
             do_table_structure=True,
             allow_external_plugins=True,
@@ -59,9 +65,20 @@ class PdfLoader:
             }
         )
 
-    def load_pdf(self, pdf: DocumentStream) -> DoclingDocument:
+    def warm_up(self) -> None:
+        """
+        Loads the layout and table structure models of the PDF pipeline,
+        so the first conversion does not pay for the model initialization.
+        """
+        self.converter.initialize_pipeline(InputFormat.PDF)
+
+    def load_pdf(
+        self,
+        pdf: DocumentStream | Path,
+        page_range: Tuple[int, int] = (1, sys.maxsize),
+    ) -> DoclingDocument:
         try:
-            extracted_pdf = self.converter.convert(pdf)
+            extracted_pdf = self.converter.convert(pdf, page_range=page_range)
         except Exception as e:
             logger.error(f"Error while loading the pdf: {pdf.name}. Error message: {e}")
             raise e
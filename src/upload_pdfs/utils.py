@@ -1,18 +1,181 @@
 from agent.rag_components.llm import llm
+from operations.storages import SummaryCache
+from app.core import get_session
+from config import base_settings
 
 from docling_core.types.io import DocumentStream
 
 from langchain_core.messages import HumanMessage
 
-from typing import List, Dict
+from concurrent.futures import Future
+from typing import Callable, List, Dict
 from io import BytesIO
 
+import threading
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
 
 def from_bytes_to_document_stream(pdf: BytesIO, pdf_name: str) -> DocumentStream:
     return DocumentStream(name=pdf_name, stream=pdf)
 
 
-def summarize_object(message_content: List[Dict[str, str]] | str) -> str:
-    msg = HumanMessage(content=message_content)
-    response = llm.invoke([msg])
-    return "\n" + response.content
+def _summarize_with_cache(
+    message_contents: List[List[Dict[str, str]] | str],
+    summarize: Callable[
+        [List[List[Dict[str, str]] | str], Callable[[int, str], None]], List[str]
+    ],
+    on_summary: Callable[[int, str], None] | None = None,
+) -> List[str]:
+    """
+    Looks the summary requests up in the summary cache and summarizes only the missing ones.
+
+    Args:
+        message_contents (List[List[Dict[str, str]] | str]): The message content of each object.
+        summarize (Callable[[List[List[Dict[str, str]] | str], Callable[[int, str], None]], List[str]]):
+            The function summarizing the message contents missing in the cache, and calling
+            the callback with the position and the summary of every finished one.
+        on_summary (Callable[[int, str], None] | None): The function called with the position
+            and the summary of every object as soon as its summary is known.
+
+    Returns:
+        List[str]: The summaries in the order of the message contents.
+    """
+    if on_summary is None:
+
+        def on_summary(position: int, summary: str) -> None:
+            pass
+
+    if not base_settings.rag.SUMMARY_CACHE_ENABLED:
+        return summarize(message_contents, on_summary)
+
+    with get_session() as session:
+        cache = SummaryCache(session=session)
+        keys = [
+            SummaryCache.create_key(message_content=content, model=llm.model_name)
+            for content in message_contents
+        ]
+        summaries = cache.get_summaries(keys=keys)
+        for position, key in enumerate(keys):
+            if key in summaries:
+                on_summary(position, summaries[key])
+
+        missing = [
+            position for position, key in enumerate(keys) if key not in summaries
+        ]
+        new_summaries = dict(
+            zip(
+                [keys[position] for position in missing],
+                summarize(
+                    [message_contents[position] for position in missing],
+                    lambda i, summary: on_summary(missing[i], summary),
+                ),
+            )
+        )
+        cache.add_summaries(summaries=new_summaries)
+
+        stats = cache.stats()
+        logger.info(
+            f"Summary cache: {stats['hits']} hits, {stats['misses']} misses, hit rate {stats['hit_rate']:.2f}."
+        )
+
+    summaries.update(new_summaries)
+    return [summaries[key] for key in keys]
+
+
+async def asummarize_objects(
+    message_contents: List[List[Dict[str, str]] | str],
+    max_concurrency: int = base_settings.rag.SUMMARY_MAX_CONCURRENCY,
+    on_summary: Callable[[int, str], None] | None = None,
+) -> List[str]:
+    messages = [[HumanMessage(content=content)] for content in message_contents]
+    summaries = [""] * len(messages)
+    async for position, response in llm.abatch_as_completed(
+        messages, config={"max_concurrency": max_concurrency}
+    ):
+        summaries[position] = "\n" + response.content
+        if on_summary is not None:
+            on_summary(position, summaries[position])
+    return summaries
+
+
+def summarize_objects(
+    message_contents: List[List[Dict[str, str]] | str],
+    max_concurrency: int = base_settings.rag.SUMMARY_MAX_CONCURRENCY,
+    on_summary: Callable[[int, str], None] | None = None,
+) -> List[str]:
+    """
+    Summarizes many objects concurrently through the async LLM client,
+    with at most 'max_concurrency' requests in flight. Summaries already
+    in the summary cache are not requested again.
+
+    Args:
+        message_contents (List[List[Dict[str, str]] | str]): The message content of each object.
+        max_concurrency (int): The maximum number of concurrent requests.
+        on_summary (Callable[[int, str], None] | None): The function called with the position
+            and the summary of every object as soon as its summary is known.
+
+    Returns:
+        List[str]: The summaries in the order of the message contents.
+    """
+    if not message_contents:
+        return []
+
+    def summarize(
+        message_contents: List[List[Dict[str, str]] | str],
+        on_summary: Callable[[int, str], None],
+    ) -> List[str]:
+        if not message_contents:
+            return []
+
+        return asyncio.run(
+            asummarize_objects(
+                message_contents=message_contents,
+                max_concurrency=max_concurrency,
+                on_summary=on_summary,
+            )
+        )
+
+    return _summarize_with_cache(
+        message_contents=message_contents, summarize=summarize, on_summary=on_summary
+    )
+
+
+def summarize_objects_in_background(
+    message_contents: List[List[Dict[str, str]] | str],
+    max_concurrency: int = base_settings.rag.SUMMARY_MAX_CONCURRENCY,
+) -> List[Future]:
+    """
+    Starts summarizing many objects in one concurrent batch on a background thread.
+
+    Args:
+        message_contents (List[List[Dict[str, str]] | str]): The message content of each object.
+        max_concurrency (int): The maximum number of concurrent requests.
+
+    Returns:
+        List[Future]: The futures of the summaries in the order of the message contents,
+            each resolved as soon as its own summary is known.
+    """
+    futures: List[Future] = [Future() for _ in message_contents]
+    if not message_contents:
+        return futures
+
+    def run() -> None:
+        try:
+            summarize_objects(
+                message_contents=message_contents,
+                max_concurrency=max_concurrency,
+                on_summary=lambda position, summary: futures[position].set_result(
+                    summary
+                ),
+            )
+        except BaseException as e:
+            logger.error(f"Summarizing {len(futures)} objects failed: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+
+    threading.Thread(target=run, name="summarize-objects", daemon=True).start()
+    return futures
@@ -0,0 +1,158 @@
+"""
+The implementation of 'EnhanceChunkSize' before it merged chunks in a linked list,
+kept as the reference of the benchmarks.
+"""
+
+from upload_pdfs.handle_data.text.chunking.recursive_semantic.operations.utils import (
+    reset_chunk_index,
+)
+
+from app.models import CombinedSentences, Chunks
+
+from typing import Tuple
+
+import numpy as np
+
+
+class BaselineEnhanceChunkSize:
+    """Class for enhancing chunk size."""
+
+    def _handle_boundary_chunks(
+        self,
+        combined_sentences: CombinedSentences,
+        chunks: Chunks,
+        min_size: int = 300,
+    ) -> Tuple[CombinedSentences, Chunks]:
+        """
+        Merges boundary chunks with their neighbors if their size is to small.
+
+        Args:
+            combined_sentences (CombinedSentences): The 'CombinedSentences' of a text chunk.
+            chunks (Chunks): The 'Chunks' of the text chunk.
+            max_size (int): The minimum size for a chunk.
+
+        Returns:
+            Tuple[CombinedSentences, Chunks]: The updatet 'CombinedSentences' with
+                updated chunks indices, along with the updated 'Chunks' after merging.
+        """
+        while True:
+            if len(chunks) <= 1:
+                break
+
+            boundary_indexes = [0, -1]
+            merged = False
+
+            for id in boundary_indexes:
+                if chunks.is_too_small[id]:
+                    if id == 0:
+                        neighbour = 1
+                    else:
+                        neighbour = -2
+
+                    future_chunk = chunks.chunk_index[neighbour]
+                    combined_sentences.chunk_index[
+                        combined_sentences.chunk_index == chunks.chunk_index[id]
+                    ] = future_chunk
+
+                    chunks.size[neighbour] += chunks.size[id]
+
+                    if chunks.size[neighbour] >= min_size:
+                        chunks.is_too_small[neighbour] = False
+
+                    chunks.pop(id)
+                    merged = True
+                    break
+            if not merged:
+                break
+
+        return combined_sentences, chunks
+
+    def _handle_interior_chunks(
+        self,
+        combined_sentences: CombinedSentences,
+        chunks: Chunks,
+        min_size: int = 300,
+    ) -> Tuple[CombinedSentences, Chunks]:
+        """
+        Merges interior chunks with their neighbors based on cosine distance. The neighbor with the lower
+        cosine distance will be connected to the current chunk.
+
+        Args:
+            combined_sentences (CombinedSentences): The 'CombinedSentences' of a text chunk.
+            chunks (Chunks): The 'Chunks' of the text chunk.
+            max_size (int): The minimum size for a chunk.
+
+        Returns:
+            Tuple[CombinedSentences, Chunks]: The updatet 'CombinedSentences' with
+                updated chunks indices, along with the updated 'Chunks' after merging.
+        """
+        i = 0
+        while i < len(chunks):
+
+            if chunks.is_too_small[i]:
+                if chunks.cosine_distance[i - 1] <= chunks.cosine_distance[i + 1]:
+                    neighbour = -1
+                else:
+                    neighbour = 1
+
+                merged_id = i + neighbour
+
+                combined_sentences.chunk_index[
+                    combined_sentences.chunk_index == chunks.chunk_index[i]
+                ] = chunks.chunk_index[merged_id]
+
+                chunks.size[merged_id] += chunks.size[i]
+
+                if chunks.size[merged_id] >= min_size:
+                    chunks.is_too_small[merged_id] = False
+
+                if neighbour == -1:
+                    chunks.cosine_distance[merged_id] = chunks.cosine_distance[i]
+                chunks.pop(i)
+
+            else:
+                i += 1
+
+        return combined_sentences, chunks
+
+    def enhance_size(
+        self,
+        combined_sentences: CombinedSentences,
+        chunks: Chunks,
+        min_size: int = 300,
+    ) -> Tuple[CombinedSentences, Chunks]:
+        """
+        Checks each chunk's size. If the size is too small, it will connect the chunk with its neighbor.
+
+        Args:
+            combined_sentences (CombinedSentences): The 'CombinedSentences' of a text chunk.
+            chunks (Chunks): The 'Chunks' of the text chunk.
+            min_size (int): The minimum size for a chunk.
+
+        Returns:
+            Tuple[CombinedSentences, Chunks]: The updatet 'CombinedSentences' with
+                updated chunks indices, along with the updated 'Chunks' after merging.
+        """
+        distances = dict(
+            zip(
+                combined_sentences.chunk_index.tolist(),
+                combined_sentences.cosine_distance.tolist(),
+            )
+        )
+
+        chunks.is_too_small = chunks.size < min_size
+        chunks.cosine_distance = np.array(
+            [distances[index] for index in chunks.chunk_index.tolist()],
+            dtype=np.float64,
+        )
+
+        combined_sentences, chunks = self._handle_boundary_chunks(
+            combined_sentences=combined_sentences, chunks=chunks, min_size=min_size
+        )
+        combined_sentences, chunks = self._handle_interior_chunks(
+            combined_sentences=combined_sentences, chunks=chunks, min_size=min_size
+        )
+        combined_sentences, chunks = reset_chunk_index(
+            combined_sentences=combined_sentences, chunks=chunks
+        )
+        return combined_sentences, chunks
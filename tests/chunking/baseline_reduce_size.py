@@ -0,0 +1,166 @@
+"""
+The recursive implementation of 'ReduceChunkSize' before it was rewritten to split
+contiguous ranges, kept as the reference of the equivalence tests and benchmarks.
+"""
+
+from upload_pdfs.handle_data.text.chunking.recursive_semantic.operations.utils import (
+    reset_chunk_index,
+)
+from app.models import CombinedSentences, Chunks
+
+from typing import Tuple
+
+import numpy as np
+
+
+class BaselineReduceChunkSize:
+    """Class for reducing chunks sizes"""
+
+    def _calculate_percentile(
+        self, distances: np.ndarray, percentage: int = 98
+    ) -> float:
+        """
+        Calculates the specified percentile of cosine distances
+
+        Args:
+            distances (np.ndarray): The cosine distances of the sentences.
+            percentage (int): The percentile to calculate.
+
+        Returns:
+            float: The q-th percentile of the cosine distances.
+        """
+        if not len(distances):
+            return None
+
+        threshold = np.percentile(distances, percentage)
+        return threshold
+
+    def _sentences_above_threshold(
+        self, distances: np.ndarray, threshold: float
+    ) -> np.ndarray:
+        """
+        Marks sentences with a cosine distance above the given threshold.
+
+        Args:
+            distances (np.ndarray): The cosine distances of the sentences.
+            threshold (float): The cosine distance threshold for marking sentences.
+
+        Returns:
+            np.ndarray: A boolean array marking sentences above the threshold.
+        """
+        above_threshold = distances >= threshold
+        above_threshold[-1] = False
+
+        if not above_threshold.any():
+            return self._sentences_above_threshold(
+                distances=distances, threshold=threshold * 0.99
+            )
+
+        return above_threshold
+
+    def _assign_chunks(
+        self,
+        sizes: np.ndarray,
+        above_threshold: np.ndarray,
+        max_size: int,
+        chunk_index: int = None,
+    ) -> Tuple[np.ndarray, Chunks]:
+        """
+        Assign chunk indices to the sentences, and creates chunks based on the 'above_threshold' condition.
+
+        Args:
+            sizes (np.ndarray): The lengths of the sentences.
+            above_threshold (np.ndarray): A boolean array marking sentences after which a chunk ends.
+            max_size (int): The maximum size for a chunk.
+            chunk_index (int): The starting index for chunks.
+
+        Returns:
+            Tuple[np.ndarray, Chunks]: The assigned chunk index of each sentence,
+                along with the 'Chunks' representing the created chunks.
+        """
+        if not chunk_index:
+            chunk_index = 0
+
+        chunk_ends = above_threshold.copy()
+        chunk_ends[-1] = True
+        chunk_starts = np.flatnonzero(np.concatenate(([True], chunk_ends[:-1])))
+
+        sentence_chunks = np.zeros(len(sizes), dtype=np.int64)
+        sentence_chunks[1:] = np.cumsum(chunk_ends[:-1])
+        chunk_sizes = np.add.reduceat(sizes, chunk_starts)
+
+        chunks = Chunks(
+            chunk_index=chunk_index + np.arange(len(chunk_starts), dtype=np.int64),
+            size=chunk_sizes,
+            is_too_big=chunk_sizes > max_size,
+        )
+        return chunk_index + sentence_chunks, chunks
+
+    def reduce_size(
+        self,
+        combined_sentences: CombinedSentences,
+        percentage: int = 98,
+        max_size: int = 1000,
+    ) -> Tuple[CombinedSentences, Chunks]:
+        """
+        Splits the chunks if their size is too large.
+
+        Args:
+            combined_sentences (CombinedSentences): The 'CombinedSentences' of a text chunk.
+            percentage (int): The percentile to calculate.
+            max_size (int): The maximum size for a chunk.
+
+        Returns:
+            Tuple[CombinedSentences, Chunks]: The updatet 'CombinedSentences' with
+                updated chunks indices, along with the 'Chunks' containing the new chunks.
+        """
+        sizes = combined_sentences.sizes
+        distances = combined_sentences.cosine_distance
+
+        threshold = self._calculate_percentile(
+            distances=distances, percentage=percentage
+        )
+        combined_sentences.above_threshold = self._sentences_above_threshold(
+            distances=distances, threshold=threshold
+        )
+        combined_sentences.chunk_index, chunks = self._assign_chunks(
+            sizes=sizes,
+            above_threshold=combined_sentences.above_threshold,
+            max_size=max_size,
+        )
+
+        i = 0
+        while i < len(chunks):
+            if chunks.is_too_big[i]:
+                sub_indexes = np.flatnonzero(
+                    combined_sentences.chunk_index == chunks.chunk_index[i]
+                )
+
+                threshold = self._calculate_percentile(
+                    distances=distances[sub_indexes], percentage=percentage
+                )
+                combined_sentences.above_threshold[sub_indexes] = (
+                    self._sentences_above_threshold(
+                        distances=distances[sub_indexes], threshold=threshold
+                    )
+                )
+                last_index = np.max(chunks.chunk_index)
+                combined_sentences.chunk_index[sub_indexes], sub_chunks = (
+                    self._assign_chunks(
+                        sizes=sizes[sub_indexes],
+                        above_threshold=combined_sentences.above_threshold[sub_indexes],
+                        max_size=max_size,
+                        chunk_index=last_index + 1,
+                    )
+                )
+                chunks.pop(i)
+                chunks.extend(sub_chunks)
+
+            else:
+                i += 1
+
+        combined_sentences, chunks = reset_chunk_index(
+            combined_sentences=combined_sentences, chunks=chunks
+        )
+
+        return combined_sentences, chunks
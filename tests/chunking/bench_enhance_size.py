@@ -0,0 +1,88 @@
+"""
+Micro-benchmark of the linked-list merge of 'EnhanceChunkSize'. The sections are first
+split with 'ReduceChunkSize' at a low percentile, so most chunks are too small and
+have to be merged, and the merge time is reported per sentence to show how it scales.
+
+Run from the repository root:
+    PYTHONPATH=src:tests python tests/chunking/bench_enhance_size.py
+"""
+
+import conftest  # noqa: F401
+
+from upload_pdfs.handle_data.text.chunking.recursive_semantic.operations import (
+    ReduceChunkSize,
+    EnhanceChunkSize,
+)
+
+from app.models import CombinedSentences, Chunks
+
+from chunking.baseline_enhance_size import BaselineEnhanceChunkSize
+from chunking.synthetic import make_sentences, copy_sentences
+
+from functools import partial
+from typing import Callable, Tuple
+
+import numpy as np
+import time
+
+SIZES = [1_000, 5_000, 20_000, 50_000, 200_000]
+BASELINE_MAX_SIZE = 50_000
+
+
+def measure(func: Callable[[], object]) -> float:
+    """
+    Returns the wall time of the call in seconds.
+    """
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def reduced(
+    combined_sentences: CombinedSentences,
+) -> Tuple[CombinedSentences, Chunks]:
+    """
+    Splits a fresh copy of the sentences into mostly too small chunks.
+    """
+    return ReduceChunkSize().reduce_size(
+        copy_sentences(combined_sentences), percentage=50, max_size=1000
+    )
+
+
+def main() -> None:
+    print(
+        f"{'sentences':>10} {'chunks':>8} {'baseline_s':>11} {'new_s':>8} {'new_us/sentence':>16}"
+    )
+
+    for n_sentences in SIZES:
+        combined_sentences = make_sentences(
+            n_sentences=n_sentences,
+            rng=np.random.default_rng(n_sentences),
+            max_length=120,
+        )
+
+        sentences, chunks = reduced(combined_sentences)
+        new = measure(
+            partial(EnhanceChunkSize().enhance_size, sentences, chunks, min_size=800)
+        )
+
+        baseline = float("nan")
+        if n_sentences <= BASELINE_MAX_SIZE:
+            sentences, chunks = reduced(combined_sentences)
+            baseline = measure(
+                partial(
+                    BaselineEnhanceChunkSize().enhance_size,
+                    sentences,
+                    chunks,
+                    min_size=800,
+                )
+            )
+
+        print(
+            f"{n_sentences:>10} {len(chunks.chunk_index):>8} {baseline:>11.3f} "
+            f"{new:>8.4f} {new / n_sentences * 1e6:>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmarks 'ReduceChunkSize' against the recursive baseline on large synthetic sections.
+
+Run from the repository root:
+    PYTHONPATH=src:tests python tests/chunking/bench_reduce_size.py
+"""
+
+import conftest  # noqa: F401
+
+from upload_pdfs.handle_data.text.chunking.recursive_semantic.operations import (
+    ReduceChunkSize,
+)
+
+from chunking.baseline_reduce_size import BaselineReduceChunkSize
+from chunking.synthetic import make_sentences, copy_sentences
+
+from functools import partial
+from typing import Callable
+
+import numpy as np
+import time
+import sys
+
+SIZES = [1_000, 5_000, 20_000, 50_000]
+BASELINE_MAX_SIZE = 20_000
+
+
+def measure(func: Callable[[], object]) -> float:
+    """
+    Returns the wall time of the call in seconds.
+    """
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100_000))
+    print(f"{'sentences':>10} {'baseline_s':>11} {'new_s':>8} {'speedup':>8}")
+
+    for n_sentences in SIZES:
+        combined_sentences = make_sentences(
+            n_sentences=n_sentences,
+            rng=np.random.default_rng(n_sentences),
+            max_length=300,
+        )
+
+        new = measure(
+            partial(ReduceChunkSize().reduce_size, copy_sentences(combined_sentences))
+        )
+        if n_sentences <= BASELINE_MAX_SIZE:
+            baseline = measure(
+                partial(
+                    BaselineReduceChunkSize().reduce_size,
+                    copy_sentences(combined_sentences),
+                )
+            )
+            print(
+                f"{n_sentences:>10} {baseline:>11.3f} {new:>8.4f} {baseline / new:>7.1f}x"
+            )
+        else:
+            print(f"{n_sentences:>10} {'-':>11} {new:>8.4f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
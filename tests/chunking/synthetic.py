@@ -0,0 +1,46 @@
+from app.models import CombinedSentences
+
+import numpy as np
+
+
+def make_sentences(
+    n_sentences: int,
+    rng: np.random.Generator,
+    max_length: int = 400,
+    ties: bool = False,
+) -> CombinedSentences:
+    """
+    Creates a synthetic section with random sentence lengths and cosine distances.
+
+    Args:
+        n_sentences (int): The number of sentences.
+        rng (np.random.Generator): The random generator.
+        max_length (int): The maximum length of a sentence.
+        ties (bool): Whether the distances are rounded, so many of them are equal.
+
+    Returns:
+        CombinedSentences: The sentences with their cosine distances.
+    """
+    sentences = [
+        "x" * int(length) for length in rng.integers(5, max_length, n_sentences)
+    ]
+    combined_sentences = CombinedSentences.from_sentences(sentences)
+
+    distances = rng.random(n_sentences)
+    if ties:
+        distances = np.round(distances, 1)
+    distances[-1] = distances[-2]
+    combined_sentences.cosine_distance = distances
+    return combined_sentences
+
+
+def copy_sentences(combined_sentences: CombinedSentences) -> CombinedSentences:
+    """
+    Copies the sentences and their distances, without the chunk assignment.
+    """
+    return CombinedSentences(
+        text=combined_sentences.text,
+        starts=combined_sentences.starts.copy(),
+        ends=combined_sentences.ends.copy(),
+        cosine_distance=combined_sentences.cosine_distance.copy(),
+    )
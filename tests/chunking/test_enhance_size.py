@@ -0,0 +1,60 @@
+from upload_pdfs.handle_data.text.chunking.recursive_semantic.operations import (
+    ReduceChunkSize,
+    EnhanceChunkSize,
+)
+
+from chunking.baseline_enhance_size import BaselineEnhanceChunkSize
+from chunking.synthetic import make_sentences, copy_sentences
+from app.models import Chunks, CombinedSentences
+
+from typing import Tuple
+
+import numpy as np
+import pytest
+
+CHUNK_FIELDS = ["chunk_index", "size", "is_too_big", "is_too_small", "cosine_distance"]
+
+
+def reduce(
+    combined_sentences: CombinedSentences, percentage: int
+) -> Tuple[CombinedSentences, Chunks]:
+    return ReduceChunkSize().reduce_size(
+        copy_sentences(combined_sentences), percentage=percentage, max_size=1000
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_enhance_size_matches_baseline(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+
+    compared = 0
+    for _ in range(50):
+        combined_sentences = make_sentences(
+            n_sentences=int(rng.integers(4, 300)),
+            rng=rng,
+            max_length=int(rng.choice([60, 200, 400])),
+            ties=rng.random() < 0.3,
+        )
+        percentage = int(rng.choice([50, 90, 98]))
+        min_size = int(rng.choice([100, 300, 800]))
+
+        try:
+            expected, expected_chunks = BaselineEnhanceChunkSize().enhance_size(
+                *reduce(combined_sentences, percentage), min_size=min_size
+            )
+        except IndexError:
+            # The baseline fails on these inputs, so there is nothing to compare.
+            continue
+
+        actual, actual_chunks = EnhanceChunkSize().enhance_size(
+            *reduce(combined_sentences, percentage), min_size=min_size
+        )
+        compared += 1
+
+        np.testing.assert_array_equal(actual.chunk_index, expected.chunk_index)
+        for field in CHUNK_FIELDS:
+            np.testing.assert_array_equal(
+                getattr(actual_chunks, field), getattr(expected_chunks, field)
+            )
+
+    assert compared > 0
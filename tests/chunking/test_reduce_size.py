@@ -0,0 +1,73 @@
+from upload_pdfs.handle_data.text.chunking.recursive_semantic.operations import (
+    ReduceChunkSize,
+)
+
+from chunking.baseline_reduce_size import BaselineReduceChunkSize
+from chunking.synthetic import make_sentences, copy_sentences
+from app.models import CombinedSentences
+
+from typing import Iterator
+
+import numpy as np
+import pytest
+import sys
+
+CHUNK_FIELDS = ["chunk_index", "size", "is_too_big", "is_too_small", "cosine_distance"]
+
+
+@pytest.fixture
+def deep_recursion() -> Iterator[None]:
+    """
+    Raises the recursion limit for the recursive baseline.
+    """
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 10_000))
+    yield
+    sys.setrecursionlimit(limit)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_reduce_size_matches_baseline(seed: int, deep_recursion: None) -> None:
+    rng = np.random.default_rng(seed)
+
+    compared = 0
+    for _ in range(50):
+        combined_sentences = make_sentences(
+            n_sentences=int(rng.integers(4, 200)), rng=rng, ties=rng.random() < 0.3
+        )
+        percentage = int(rng.choice([90, 95, 98]))
+
+        try:
+            expected, expected_chunks = BaselineReduceChunkSize().reduce_size(
+                copy_sentences(combined_sentences), percentage=percentage, max_size=1000
+            )
+        except RecursionError:
+            # The baseline never finishes these inputs, so there is nothing to compare.
+            continue
+
+        actual, actual_chunks = ReduceChunkSize().reduce_size(
+            copy_sentences(combined_sentences), percentage=percentage, max_size=1000
+        )
+        compared += 1
+
+        np.testing.assert_array_equal(actual.chunk_index, expected.chunk_index)
+        np.testing.assert_array_equal(actual.above_threshold, expected.above_threshold)
+        for field in CHUNK_FIELDS:
+            np.testing.assert_array_equal(
+                getattr(actual_chunks, field), getattr(expected_chunks, field)
+            )
+
+    assert compared > 0
+
+
+def test_reduce_size_keeps_single_oversized_sentence() -> None:
+    sentences = ["a" * 300, "b" * 300, "c" * 5000, "d" * 300, "e" * 300]
+    combined_sentences = CombinedSentences.from_sentences(sentences)
+    combined_sentences.cosine_distance = np.array([0.1, 0.2, 0.3, 0.1, 0.1])
+
+    reduced, _ = ReduceChunkSize().reduce_size(
+        combined_sentences, percentage=98, max_size=1000
+    )
+
+    oversized_chunk = reduced.chunk_index[2]
+    assert (reduced.chunk_index == oversized_chunk).sum() == 1
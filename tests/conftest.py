@@ -0,0 +1,15 @@
+import os
+
+# The settings are validated on import, so the tests provide placeholder credentials
+# unless the environment or the .env file defines real ones.
+for key, value in {
+    "DB__POSTGRES_USER": "test",
+    "DB__POSTGRES_PASSWORD": "test",
+    "DB__POSTGRES_HOST": "localhost",
+    "DB__POSTGRES_DB": "test",
+    "AZURE__ACCOUNT_NAME": "test",
+    "AZURE__ACCOUNT_KEY": "dGVzdA==",
+    "AZURE__CONTAINER_NAME": "test",
+    "LLM__OPENAI_API_KEY": "test",
+}.items():
+    os.environ.setdefault(key, value)
@@ -0,0 +1,80 @@
+from operations.embeddings import EmbeddingCache
+
+import numpy as np
+import time
+
+
+def create_cache(cache_dir: str, max_entries: int = 4) -> EmbeddingCache:
+    return EmbeddingCache(
+        cache_dir=cache_dir, model_id="model", dim=8, max_entries=max_entries
+    )
+
+
+def test_embeddings_survive_reopening(tmp_path) -> None:
+    embeddings = np.random.default_rng(0).random((3, 8), dtype=np.float32)
+    cache = create_cache(str(tmp_path))
+    cache.put(["a", "b", "c"], embeddings)
+    cache.save()
+
+    found, missing = create_cache(str(tmp_path)).get(["c", "a", "d"])
+
+    assert missing == [2]
+    np.testing.assert_array_equal(found[:2], embeddings[[2, 0]])
+
+
+def test_least_recently_used_embeddings_are_evicted(tmp_path) -> None:
+    embeddings = np.random.default_rng(0).random((5, 8), dtype=np.float32)
+    cache = create_cache(str(tmp_path))
+    cache.put(["a", "b", "c", "d"], embeddings[:4])
+    cache.get(["a"])
+    cache.put(["e"], embeddings[4:])
+
+    found, missing = cache.get(["a", "b", "e"])
+
+    assert missing == [1]
+    assert cache.evictions == 1
+    np.testing.assert_array_equal(found[[0, 2]], embeddings[[0, 4]])
+
+
+def test_torn_slot_is_a_miss_after_reopening(tmp_path) -> None:
+    embeddings = np.random.default_rng(0).random((4, 8), dtype=np.float32)
+    cache = create_cache(str(tmp_path))
+    cache.put(["a", "b", "c", "d"], embeddings)
+    cache.save()
+
+    # A crash after an evicted slot got its new embedding, but not its new header.
+    slot = cache._slots[EmbeddingCache._key("b")]
+    cache._vectors[slot] = np.ones(8, dtype=np.float32)
+    cache._vectors.flush()
+
+    reopened = create_cache(str(tmp_path))
+    found, missing = reopened.get(["a", "b"])
+
+    assert missing == [1]
+    np.testing.assert_array_equal(found[0], embeddings[0])
+    assert reopened.get(["b"])[1] == [0]
+
+
+def test_cache_with_another_shape_is_rebuilt(tmp_path) -> None:
+    cache = create_cache(str(tmp_path))
+    cache.put(["a"], np.ones((1, 8), dtype=np.float32))
+    cache.save()
+
+    _, missing = create_cache(str(tmp_path), max_entries=8).get(["a"])
+
+    assert missing == [0]
+
+
+def test_expired_embeddings_are_misses(tmp_path, monkeypatch) -> None:
+    cache = EmbeddingCache(
+        cache_dir=str(tmp_path), model_id="model", dim=8, max_entries=4, ttl_seconds=60
+    )
+    cache.put(["a"], np.ones((1, 8), dtype=np.float32))
+
+    assert cache.get(["a"])[1] == []
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+
+    assert cache.get(["a"])[1] == [0]
+    assert cache.stats()["entries"] == 0
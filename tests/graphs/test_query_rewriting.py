@@ -0,0 +1,34 @@
+from agent.graphs.nodes import _rewrite_query
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("hello, what is RAG?", "what is RAG?"),
+        ("Hey! Can you explain   chunking?", "chunking?"),
+        ("hi please tell me about the sync plan", "about the sync plan"),
+        ("Hi, explain semantic chunking", "semantic chunking"),
+        ("hey could you help me understand embeddings", "embeddings"),
+        ("Please tell me the corpus version", "the corpus version"),
+    ],
+)
+def test_filler_is_stripped(query: str, expected: str) -> None:
+    assert _rewrite_query(query) == expected
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "hi-fi amplifiers",
+        "Hello World program",
+        "hi.fi formats",
+        "highlights of the report",
+        "hey there",
+        "hello!",
+        "please",
+    ],
+)
+def test_queries_without_filler_are_kept(query: str) -> None:
+    assert _rewrite_query(query) == query
@@ -0,0 +1,60 @@
+from upload_pdfs import extract_from_pdf
+
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+import pytest
+
+
+class FakeRequest:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.done = False
+
+    def result(self) -> np.ndarray:
+        return np.zeros((self.size, 8), dtype=np.float32)
+
+
+class FakeScheduler:
+    def __init__(self, embedder_dir: str) -> None:
+        self.requests: List[FakeRequest] = []
+
+    def submit(self, texts: List[str]) -> FakeRequest:
+        request = FakeRequest(size=len(texts))
+        self.requests.append(request)
+        return request
+
+    def flush(self) -> None:
+        for request in self.requests:
+            request.done = True
+
+
+def test_documents_before_a_failed_pdf_are_stored(monkeypatch) -> None:
+    stored = []
+
+    def handle_pdf(pdf: str, scheduler: FakeScheduler):
+        if pdf == "broken.pdf":
+            raise RuntimeError("conversion failed")
+        chunks = [f"chunk of {pdf}"]
+        return chunks, scheduler.submit(chunks)
+
+    monkeypatch.setattr(extract_from_pdf, "EmbeddingScheduler", FakeScheduler)
+    monkeypatch.setattr(
+        extract_from_pdf, "_download_pdf", lambda blob_oper, blob_name: blob_name
+    )
+    monkeypatch.setattr(extract_from_pdf, "_handle_pdf", handle_pdf)
+    monkeypatch.setattr(
+        extract_from_pdf, "_store_pdf", lambda blob, **kwargs: stored.append(blob.name)
+    )
+
+    blobs = [
+        (SimpleNamespace(name=name), name)
+        for name in ["first.pdf", "second.pdf", "broken.pdf", "last.pdf"]
+    ]
+    with pytest.raises(RuntimeError, match="conversion failed"):
+        extract_from_pdf._ingest_serially(
+            new_blobs=blobs, blob_oper=None, chroma_oper=None, db_oper=None
+        )
+
+    assert stored == ["first.pdf", "second.pdf"]
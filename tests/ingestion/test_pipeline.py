@@ -0,0 +1,36 @@
+from upload_pdfs.pipeline import IngestionPipeline
+
+import pytest
+import os
+
+
+def test_pipeline_runs_items_through_all_stages() -> None:
+    results = []
+
+    IngestionPipeline(queue_size=2).add_stage("double", lambda x: 2 * x, 2).add_stage(
+        "collect", results.append
+    ).run(range(10))
+
+    assert sorted(results) == [2 * x for x in range(10)]
+
+
+def test_aborted_pipeline_discards_queued_items(tmp_path) -> None:
+    def fetch(item: int) -> str:
+        path = os.path.join(tmp_path, f"{item}.pdf")
+        open(path, "wb").close()
+        return path
+
+    def convert(path: str) -> None:
+        os.remove(path)
+        raise RuntimeError("conversion failed")
+
+    pipeline = (
+        IngestionPipeline(queue_size=4)
+        .add_stage("fetch", fetch, 2)
+        .add_stage("convert", convert, 1, discard=os.remove)
+    )
+
+    with pytest.raises(RuntimeError, match="conversion failed"):
+        pipeline.run(range(20))
+
+    assert os.listdir(tmp_path) == []